@@ -1,6 +1,7 @@
 ﻿import pygame
 import random
 import sys
+from collections import deque
 
 # Pygame initialisieren
 pygame.init()
@@ -33,25 +34,73 @@ def message(msg, color):
     screen.blit(mesg, [WIDTH / 6, HEIGHT / 3])
 
 
+def new_food():
+    """Zufällige Position des Futters (Nahrung) auf dem Raster der Schlange."""
+    return (round(random.randrange(0, WIDTH - SNAKE_SIZE) / 10.0) * 10,
+            round(random.randrange(0, HEIGHT - SNAKE_SIZE) / 10.0) * 10)
+
+
+class SnakeBody:
+    """
+    Blöcke der Schlange als deque (Schwanz links, Kopf rechts) und Menge der belegten Positionen.
+    Beide werden nur gemeinsam verändert, die Menge enthält also immer genau die Blöcke der deque.
+    """
+
+    def __init__(self, length=1):
+        self.blocks = deque()
+        self.cells = set()
+        self.length = length
+
+    def step(self, head):
+        """
+        Bewegt die Schlange um einen Block nach `head` und gibt (frei gewordener Schwanzblock oder None,
+        Kollision mit sich selbst) zurück. Der Schwanz rückt zuerst nach, sein Feld darf der Kopf im selben
+        Schritt betreten. Bei einer Kollision wird der Kopf nicht angehängt.
+        """
+        tail = None
+        if len(self.blocks) >= self.length:
+            tail = self.blocks.popleft()
+            self.cells.discard(tail)
+        if head in self.cells:
+            return tail, True
+        self.blocks.append(head)
+        self.cells.add(head)
+        return tail, False
+
+    def grow(self):
+        """Die Schlange wird ab dem nächsten Schritt um einen Block länger."""
+        self.length += 1
+
+
 def gameLoop():
-    """Die Hauptspielschleife – steuert das gesamte Spiel."""
+    """
+    Die Hauptspielschleife – steuert das gesamte Spiel.
+
+    Die Schlange (SnakeBody) liegt als deque ihrer Blöcke (Schwanz links, Kopf rechts) vor, dazu die Menge der
+    belegten Positionen. Pro Schritt kommt ein Kopf dazu und fällt höchstens ein Schwanzblock weg, die
+    Kollision mit sich selbst ist ein Nachschlagen in der Menge. Gezeichnet werden ebenfalls nur diese
+    Blöcke (und das Futter), das Fenster wird nur an diesen Stellen aktualisiert. Die Dauer eines
+    Schritts hängt deshalb nicht von der Länge der Schlange ab.
+    """
     game_over = False
     game_close = False
 
     # Startposition der Schlange (Mittel des Fensters)
-    x1 = WIDTH / 2
-    y1 = HEIGHT / 2
+    x1 = WIDTH // 2
+    y1 = HEIGHT // 2
 
     x1_change = 0
     y1_change = 0
 
-    # Schlange als Liste der Blöcke (jede Position ein Viereck)
-    snake_List = []
-    Length_of_snake = 1
+    # Schlange als Warteschlange der Blöcke (jede Position ein Viereck) und Menge der belegten Positionen
+    snake = SnakeBody()
 
-    # Zufällige Position des Futters (Nahrung)
-    foodx = round(random.randrange(0, WIDTH - SNAKE_SIZE) / 10.0) * 10.0
-    foody = round(random.randrange(0, HEIGHT - SNAKE_SIZE) / 10.0) * 10.0
+    food = new_food()
+
+    # Einmal vollständig zeichnen, danach nur noch die geänderten Blöcke
+    screen.fill(BLACK)
+    pygame.draw.rect(screen, GREEN, [food[0], food[1], SNAKE_SIZE, SNAKE_SIZE])
+    pygame.display.update()
 
     while not game_over:
 
@@ -92,32 +141,27 @@ def gameLoop():
         # Aktualisiere die Schlange-Position
         x1 += x1_change
         y1 += y1_change
-        screen.fill(BLACK)
-        pygame.draw.rect(screen, GREEN, [foodx, foody, SNAKE_SIZE, SNAKE_SIZE])
-
-        snake_Head = []
-        snake_Head.append(x1)
-        snake_Head.append(y1)
-        snake_List.append(snake_Head)
-        if len(snake_List) > Length_of_snake:
-            del snake_List[0]
-
-        # Kollision mit sich selber
-        for x in snake_List[:-1]:
-            if x == snake_Head:
-                game_close = True
-
-        # Schlangen zeichnen
-        for block in snake_List:
-            pygame.draw.rect(screen, WHITE, [block[0], block[1], SNAKE_SIZE, SNAKE_SIZE])
-
-        pygame.display.update()
+        snake_Head = (x1, y1)
+        changed = []
+
+        # Schwanz nachrücken, Kopf anhängen; Kollision mit sich selber
+        tail, collided = snake.step(snake_Head)
+        if tail is not None:
+            rect = pygame.draw.rect(screen, GREEN if tail == food else BLACK, [tail[0], tail[1], SNAKE_SIZE, SNAKE_SIZE])
+            changed.append(rect)
+        if collided:
+            game_close = True
+        changed.append(pygame.draw.rect(screen, WHITE, [x1, y1, SNAKE_SIZE, SNAKE_SIZE]))
 
         # Nahrung "essen": Wenn der Kopf die Nahrung erreicht
-        if x1 == foodx and y1 == foody:
-            foodx = round(random.randrange(0, WIDTH - SNAKE_SIZE) / 10.0) * 10.0
-            foody = round(random.randrange(0, HEIGHT - SNAKE_SIZE) / 10.0) * 10.0
-            Length_of_snake += 1
+        if snake_Head == food:
+            food = new_food()
+            snake.grow()
+            # Futter unter der Schlange bleibt verdeckt, bis ihr Schwanz es freigibt
+            if food not in snake.cells:
+                changed.append(pygame.draw.rect(screen, GREEN, [food[0], food[1], SNAKE_SIZE, SNAKE_SIZE]))
+
+        pygame.display.update(changed)
 
         clock.tick(SNAKE_SPEED)
 
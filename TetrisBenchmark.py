@@ -0,0 +1,288 @@
+"""
+Mikro-Benchmarks für die heißen Pfade aller Tetris-Varianten.
+
+Gemessen werden move(), jede Eingabe von prInput, das Einfrieren eines Teils (freeze, samt der Regel
+der Variante), das Entfernen voller Zeilen (clear_rows, nur Varianten mit klassischen Regeln),
+remove_connected_color_if_path_exists und remove_connected_lines (Volldurchlauf), jeweils auf
+synthetischen Spielfeldern (BOARDS) in mehreren Größen von 10x20 bis 1000x2000.
+
+Vor jedem Aufruf wird das Spiel aus einem Schnappschuss wiederhergestellt (nicht mitgemessen), jeder
+Aufruf startet also im selben Zustand. Wie bei den Bots (clone) kopiert der erste Schreibzugriff eine
+geteilte Zeile. Nach dem Einsetzen des Spielfelds baut recompute_heights (ungemessen) auch die
+inkrementellen Strukturen der Varianten auf (Farbflächen von TetrisColourMatch); gemessen wird also
+deren Aktualisierung, nicht ihr Neuaufbau aus dem ganzen Raster.
+Ergebnis eines Falls ist der Median der Einzelaufrufe in Mikrosekunden.
+
+Die Ergebnisse werden als JSON-Datei (Baseline) gespeichert; compare misst dieselben Fälle erneut
+(oder liest eine zweite Datei) und meldet Fälle, die mehr als --threshold langsamer geworden sind.
+
+Beispiel:
+    python TetrisBenchmark.py run --sizes 10x20,100x200 --output baseline.json
+    python TetrisBenchmark.py compare baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+from TetrisEngine import background, Input
+from TetrisSimulator import VARIANTS, load_variant
+
+SIZES = ((10, 20), (100, 200), (1000, 2000))
+
+
+# Spielfelder: die untere Hälfte ist belegt, die obere bleibt frei, damit das Teil erscheinen und fallen kann.
+
+def empty_board(columns, rows, colors, rng):
+    """Leeres Spielfeld."""
+    return [[background] * columns for _ in range(rows)]
+
+
+def random_board(columns, rows, colors, rng):
+    """Jede Zelle der unteren Hälfte ist mit Wahrscheinlichkeit 1/2 mit einer zufälligen Farbe belegt."""
+    palette = [background] * len(colors) + list(colors)
+    return ([[background] * columns for _ in range(rows - rows // 2)] +
+            [rng.choices(palette, k=columns) for _ in range(rows // 2)])
+
+
+def nearfull_board(columns, rows, colors, rng):
+    """Untere Hälfte voll mit zufälligen Farben bis auf eine Lücke pro Zeile (keine vollen Zeilen)."""
+    board = [[background] * columns for _ in range(rows - rows // 2)]
+    for _ in range(rows // 2):
+        row = rng.choices(colors, k=columns)
+        row[rng.randrange(columns)] = background
+        board.append(row)
+    return board
+
+
+def mono_board(columns, rows, colors, rng):
+    """Untere Hälfte vollständig in einer Farbe: lauter volle Zeilen und eine riesige Farbfläche."""
+    return ([[background] * columns for _ in range(rows - rows // 2)] +
+            [[colors[0]] * columns for _ in range(rows // 2)])
+
+
+def checker_board(columns, rows, colors, rng):
+    """Untere Hälfte als Schachbrett aus zwei Farben: volle Zeilen, aber nur einzelne Zellen je Farbfläche."""
+    pair = (colors[0], colors[1])
+    return ([[background] * columns for _ in range(rows - rows // 2)] +
+            [[pair[(x + y) % 2] for x in range(columns)] for y in range(rows // 2)])
+
+
+BOARDS = {
+    'empty': empty_board,
+    'random': random_board,
+    'nearfull': nearfull_board,
+    'mono': mono_board,
+    'checker': checker_board,
+}
+
+
+# Operationen: Name -> Funktion, die für ein Spiel den zu messenden Aufruf liefert (None: nicht anwendbar).
+
+def _input_operation(input):
+    return lambda game: lambda: game.prInput(input)
+
+
+def _clear_rows_operation(game):
+    # Jede Zeile gilt als gerade beschrieben, damit auch Varianten, die nur die Zeilen des eingefrorenen
+    # Teils prüfen (TetrisBitboard), alle Zeilen auf volle Zeilen prüfen
+    touched = [(0, y) for y in range(game.rows)]
+    return lambda: game.remove_completed(touched)
+
+
+OPERATIONS = {'move': lambda game: game.move}
+OPERATIONS.update(('input:' + input.name, _input_operation(input)) for input in Input)
+OPERATIONS.update({
+    'freeze': lambda game: game.freeze,
+    'clear_rows': lambda game: None if game.colour_rules else _clear_rows_operation(game),
+    'remove_connected_color_if_path_exists': lambda game: (
+        lambda: game.remove_connected_color_if_path_exists(game.colors[0]))
+        if hasattr(game, 'remove_connected_color_if_path_exists') else None,
+    'remove_connected_lines': lambda game: game.remove_connected_lines
+        if hasattr(game, 'remove_connected_lines') else None,
+})
+
+
+def parse_size(text):
+    """'100x200' -> (100, 200)"""
+    columns, _, rows = text.partition('x')
+    return int(columns), int(rows)
+
+
+def case_key(variant, board, size, operation):
+    return f'{variant}/{board}/{size[0]}x{size[1]}/{operation}'
+
+
+def time_operation(game, operation, min_time=0.2, min_reps=5, max_reps=200):
+    """
+    Misst den Aufruf `operation` (aus OPERATIONS) auf `game`, jeweils ausgehend vom aktuellen Zustand.
+    Wiederholt wird, bis min_time Sekunden gemessen oder max_reps Aufrufe erreicht sind, mindestens
+    aber min_reps-mal. Gibt {'median_us', 'min_us', 'reps'} zurück, None wenn die Operation für die
+    Variante nicht existiert.
+    """
+    if OPERATIONS[operation](game) is None:
+        return None
+    snapshot = game.snapshot()
+    samples = []
+    total = 0.0
+    while len(samples) < min_reps or (total < min_time and len(samples) < max_reps):
+        game.restore(snapshot)
+        call = OPERATIONS[operation](game)
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        total += elapsed
+    game.restore(snapshot)
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'min_us': min(samples) * 1e6,
+        'reps': len(samples),
+    }
+
+
+def run_benchmarks(variants=None, boards=None, sizes=SIZES, operations=None, seed=0, min_time=0.2,
+                   max_reps=200, progress=None):
+    """
+    Misst alle Kombinationen aus Varianten, Spielfeldern, Größen und Operationen (Standard: alle) und gibt
+    {Schlüssel: Ergebnis} zurück, Schlüssel wie case_key. Varianten, deren Modul sich nicht laden lässt
+    (z.B. numpy fehlt), werden übersprungen. progress wird, falls angegeben, mit jedem Schlüssel und
+    Ergebnis aufgerufen.
+    """
+    results = {}
+    for variant in variants or sorted(VARIANTS):
+        try:
+            _, game_class = load_variant(variant)
+        except ImportError as error:
+            print(f'{variant}: skipped ({error})', file=sys.stderr)
+            continue
+        for size in sizes:
+            for board in boards or BOARDS:
+                columns, rows = size
+                game = game_class(columns=columns, rows=rows, seed=seed)
+                rng = random.Random(f'{seed}:{board}:{columns}x{rows}')
+                game.grid = BOARDS[board](columns, rows, game.colors, rng)
+                # Baut auch die inkrementellen Strukturen der Variante auf (z.B. die Farbflächen), ohne
+                # ein Teil einzufrieren; das Spielfeld bleibt also so, wie BOARDS es beschreibt
+                game.recompute_heights()
+                for operation in operations or OPERATIONS:
+                    result = time_operation(game, operation, min_time, max_reps=max_reps)
+                    if result is None:
+                        continue
+                    key = case_key(variant, board, size, operation)
+                    results[key] = result
+                    if progress is not None:
+                        progress(key, result)
+    return results
+
+
+def save_results(results, path):
+    """Speichert die Ergebnisse mit Angaben zur Umgebung als JSON-Datei (Baseline)."""
+    data = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=1, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def parse_key(key):
+    """Zerlegt einen Schlüssel von case_key in (Variante, Spielfeld, Größe, Operation)."""
+    variant, board, size, operation = key.split('/')
+    return variant, board, parse_size(size), operation
+
+
+def compare(baseline, current, threshold=0.25):
+    """
+    Vergleicht die Mediane zweier Ergebnisse. Gibt eine Liste (Schlüssel, alt, neu, Faktor, Status) für
+    alle Fälle zurück, die in beiden vorkommen; Status ist 'regression', wenn der Fall mehr als
+    threshold (0.25 = 25 %) langsamer ist, 'faster', wenn er um denselben Faktor schneller ist, sonst 'ok'.
+    """
+    rows = []
+    for key in sorted(baseline.keys() & current.keys()):
+        old = baseline[key]['median_us']
+        new = current[key]['median_us']
+        ratio = new / old if old else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((key, old, new, ratio, status))
+    return rows
+
+
+def _print_result(key, result):
+    print(f"{key:<70} {result['median_us']:>12.1f} us  (min {result['min_us']:.1f}, {result['reps']} reps)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mikro-Benchmarks für MehrsteinTetris')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Benchmarks messen und optional als Baseline speichern')
+    run_parser.add_argument('--variants', default=None, help='Varianten, kommagetrennt (Standard: alle)')
+    run_parser.add_argument('--boards', default=None,
+                            help='Spielfelder, kommagetrennt (%s)' % ', '.join(BOARDS))
+    run_parser.add_argument('--sizes', default=','.join(f'{c}x{r}' for c, r in SIZES),
+                            help='Größen, kommagetrennt (z.B. 10x20,100x200)')
+    run_parser.add_argument('--operations', default=None, help='Operationen, kommagetrennt (Standard: alle)')
+    run_parser.add_argument('--min-time', type=float, default=0.2, help='Messzeit pro Fall in Sekunden')
+    run_parser.add_argument('--max-reps', type=int, default=200, help='höchstens so viele Aufrufe pro Fall')
+    run_parser.add_argument('--output', default=None, help='Ergebnisse als JSON-Datei speichern')
+
+    compare_parser = commands.add_parser('compare', help='mit einer Baseline vergleichen')
+    compare_parser.add_argument('baseline', help='Baseline (JSON)')
+    compare_parser.add_argument('current', nargs='?', default=None,
+                                help='zweite Ergebnisdatei; ohne werden die Fälle der Baseline neu gemessen')
+    compare_parser.add_argument('--threshold', type=float, default=0.25,
+                                help='ab diesem Anteil langsamer gilt ein Fall als Regression')
+    compare_parser.add_argument('--min-time', type=float, default=0.2, help='Messzeit pro Fall in Sekunden')
+    compare_parser.add_argument('--max-reps', type=int, default=200, help='höchstens so viele Aufrufe pro Fall')
+    compare_parser.add_argument('--output', default=None, help='neu gemessene Ergebnisse als JSON-Datei speichern')
+    args = parser.parse_args(argv)
+
+    split = lambda text: text.split(',') if text else None
+    if args.command == 'run':
+        results = run_benchmarks(split(args.variants), split(args.boards),
+                                 [parse_size(size) for size in args.sizes.split(',')], split(args.operations),
+                                 min_time=args.min_time, max_reps=args.max_reps, progress=_print_result)
+        if args.output:
+            save_results(results, args.output)
+        return 0
+
+    baseline = load_results(args.baseline)
+    if args.current is not None:
+        current = load_results(args.current)
+    else:
+        # Nur die Fälle der Baseline neu messen
+        cases = [parse_key(key) for key in baseline]
+        current = {}
+        for variant, board, size in sorted({case[:3] for case in cases}):
+            operations = sorted({case[3] for case in cases if case[:3] == (variant, board, size)})
+            current.update(run_benchmarks([variant], [board], [size], operations,
+                                          min_time=args.min_time, max_reps=args.max_reps))
+        if args.output:
+            save_results(current, args.output)
+
+    rows = compare(baseline, current, args.threshold)
+    for key, old, new, ratio, status in rows:
+        print(f'{key:<70} {old:>12.1f} -> {new:>12.1f} us  x{ratio:5.2f}  {status}')
+    regressions = [row for row in rows if row[4] == 'regression']
+    print(f'{len(rows)} cases, {len(regressions)} regressions (threshold {args.threshold:.0%})')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+from TetrisEngine import background, Change, Input, MehrsteinTetris
+
+
+class BitboardTetris(MehrsteinTetris):
+    """
+    Variante von MehrsteinTetris mit Bitboard-Belegung.
+
+    Jede Zeile wird als Ganzzahl (Bitmaske) gespeichert: Bit x ist gesetzt, wenn die Zelle (x, y)
+    belegt ist. Die Farben liegen getrennt davon in einer kompakten Farbebene (ein bytearray pro
+    Zeile mit Indizes in die Palette, 0 = Hintergrund).
+    Kollisionen, die Erkennung voller Zeilen und das Entfernen von Zeilen sind damit Maskenoperationen.
+
+    Die Spielregeln (und damit die Spielergebnisse bei gleicher Zufallsfolge) sind identisch zu
+    MehrsteinTetris; `grid` steht weiterhin als Liste von Zeilen mit Farbnamen zur Verfügung,
+    damit playTetris und andere Verbraucher unverändert funktionieren.
+    """
+
+    def __init__(self, columns=20, rows=30, seed=None, pieces='uniform'):
+        # Palette: Index -> Farbname; Index 0 ist immer der Hintergrund.
+        self._palette = [background]
+        self._palette_index = {background: 0}
+        self._grid_cache = None
+        super().__init__(columns, rows, seed, pieces)
+        # Maske einer vollständig belegten Zeile
+        self._full = (1 << columns) - 1
+
+    @property
+    def grid(self):
+        """
+        Liefert das Raster als Liste von Zeilen mit Farbnamen (wie bei MehrsteinTetris).
+        Das Raster wird nur bei Bedarf aus der Farbebene erzeugt und bis zur nächsten
+        Änderung zwischengespeichert; es ist deshalb nur lesend zu verwenden.
+        """
+        if self._grid_cache is None:
+            palette = self._palette
+            self._grid_cache = [[palette[i] for i in row] for row in self._colours]
+        return self._grid_cache
+
+    @grid.setter
+    def grid(self, grid):
+        """Übernimmt ein Raster (Liste von Zeilen mit Farbnamen) in Masken und Farbebene."""
+        self._masks = []
+        self._colours = []
+        for row in grid:
+            mask = 0
+            colours = bytearray(len(row))
+            for x, cell in enumerate(row):
+                if cell != background:
+                    mask |= 1 << x
+                    colours[x] = self._colour_index(cell)
+            self._masks.append(mask)
+            self._colours.append(colours)
+        self._owned = set(map(id, self._colours))
+        self._grid_cache = None
+
+    def _colour_index(self, color):
+        """Gibt den Palettenindex einer Farbe zurück und nimmt neue Farben in die Palette auf."""
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self._palette)
+            self._palette.append(color)
+            self._palette_index[color] = index
+        return index
+
+    def _row(self, y):
+        """Gibt Zeile y der Farbebene zum Beschreiben zurück (Copy-on-Write wie MehrsteinTetris._row)."""
+        row = self._colours[y]
+        if id(row) not in self._owned:
+            row = self._colours[y] = row[:]
+            self._owned.add(id(row))
+        return row
+
+    def _save_board(self):
+        """Masken und Farbebene für snapshot(); die Zeilen der Farbebene werden geteilt."""
+        self._owned = set()
+        return self._masks[:], self._colours[:]
+
+    def _restore_board(self, board):
+        masks, colours = board
+        self._masks = masks[:]
+        self._colours = colours[:]
+        self._owned = set()
+        self._grid_cache = None
+
+    def fits(self, coords):
+        """Prüft, ob alle Koordinaten innerhalb des Spielfelds liegen und die Bits der Zellen frei sind."""
+        masks = self._masks
+        columns = self.columns
+        rows = self.rows
+        for (x, y) in coords:
+            if not (0 <= x < columns and 0 <= y < rows) or masks[y] >> x & 1:
+                return False
+        return True
+
+    def ended(self):
+        """Das Spiel ist beendet, wenn in der obersten Zeile ein Bit gesetzt ist."""
+        return self._masks[0] != 0
+
+    def row_occupied(self, y):
+        """Zeile y ist belegt, wenn ihre Maske ein Bit enthält; das Raster mit Farbnamen wird nicht gebraucht."""
+        return self._masks[y] != 0
+
+    def _lower_surface(self, columns=None):
+        """Aktualisiert die Säulenhöhen anhand der Bits statt über das Raster (siehe MehrsteinTetris)."""
+        masks = self._masks
+        rows = self.rows
+        heights = self.heights
+        for x in (range(self.columns) if columns is None else columns):
+            y = rows - heights[x]
+            while y < rows and not masks[y] >> x & 1:
+                y += 1
+            heights[x] = rows - y
+
+    def _lock_piece(self):
+        """Schreibt das aktuelle Teil in Masken und Farbebene (siehe MehrsteinTetris._lock_piece)."""
+        masks = self._masks
+        color = self._colour_index(self.current_color)
+        locked = []
+        for (x, y) in self._current:
+            if 0 <= x < self.columns and 0 <= y < self.rows:
+                masks[y] |= 1 << x
+                self._row(y)[x] = color
+                self.heights[x] = max(self.heights[x], self.rows - y)
+                locked.append((x, y))
+        self._grid_cache = None
+        return locked
+
+    def remove_completed(self, locked):
+        """
+        Volle Zeilen werden über den Vergleich mit der Maske einer vollen Zeile erkannt und entfernt.
+        Voll werden kann nur eine Zeile, in die gerade eingefroren wurde; nur deren Masken werden geprüft.
+        """
+        masks = self._masks
+        full = self._full
+        cleared = sorted(y for y in {y for _, y in locked} if masks[y] == full)
+        removed_lines = len(cleared)
+        if removed_lines:
+            if self.events is not None:
+                self.events.append((Change.Cleared, cleared))
+            colours = self._colours
+            keep = [y for y in range(self.rows) if masks[y] != full]
+            new_rows = [bytearray(self.columns) for _ in range(removed_lines)]
+            self._masks = [0] * removed_lines + [masks[y] for y in keep]
+            self._colours = new_rows + [colours[y] for y in keep]
+            self._owned.update(map(id, new_rows))
+            self._grid_cache = None
+            self._lower_surface()
+
+        # Score für entfernte Zeilen und das Platzieren des Teils
+        self.score += removed_lines * 100
+        self.score += 10
@@ -0,0 +1,371 @@
+"""
+Computer-Spieler für MehrsteinTetris und seine Varianten.
+
+Der PlacementBot probiert für das aktuelle Teil jede erreichbare Kombination aus Ausrichtung und
+Spalte aus, lässt das Teil auf einer Kopie des Spiels fallen (mit den Regeln der Variante) und
+bewertet das Ergebnis mit einer gewichteten Heuristik. Zurückgegeben wird die Eingabefolge für die
+beste Platzierung, die mit prInput abgespielt werden kann.
+
+Der LookaheadBot schaut zusätzlich die nächsten Teile voraus (Beam-Suche). Gleiche Spielfelder, die
+über verschiedene Zugfolgen entstehen, erkennt er am Zobrist-Hash und bewertet sie dank der
+Transpositionstabelle nur einmal.
+
+Die Bots laufen kopflos (als Policy in TetrisSimulator, z.B. --policy bot) und in den
+playTetris-Funktionen (Parameter bot).
+"""
+import random
+import time
+from collections import OrderedDict
+
+from TetrisEngine import background, Input, ROTATIONS
+
+# Gewichte der Heuristik; positive Werte belohnen, negative bestrafen.
+#  - height:     Summe der Säulenhöhen
+#  - max_height: Höhe der höchsten Spalte
+#  - holes:      leere Zellen unterhalb der Oberfläche einer Spalte
+#  - bumpiness:  Summe der Höhenunterschiede benachbarter Spalten
+#  - cleared:    entfernte Blöcke geteilt durch die Spaltenzahl (volle Zeilen bzw. Farbflächen)
+DEFAULT_WEIGHTS = {
+    'height': -0.51,
+    'max_height': 0.0,
+    'holes': -0.36,
+    'bumpiness': -0.18,
+    'cleared': 0.76,
+}
+
+# Drehfolgen, mit denen jede der vier Ausrichtungen erreicht wird
+ROTATION_SEQUENCES = [
+    [],
+    [Input.RotateLeft],
+    [Input.RotateLeft, Input.RotateLeft],
+    [Input.RotateRight],
+]
+
+
+def board_features(grid, heights):
+    """
+    Berechnet die Merkmale eines Rasters für die Heuristik.
+    Jeder belegte Block liegt auf oder unter der Oberfläche seiner Spalte, deshalb ist die Zahl der
+    Löcher die Summe der Säulenhöhen minus der Zahl der belegten Zellen.
+
+    Returns:
+        dict: height, max_height, holes und bumpiness sowie filled (Anzahl belegter Zellen)
+    """
+    rows = len(grid)
+    height = sum(heights)
+    highest = max(heights, default=0)
+    filled = sum(len(row) - row.count(background) for row in grid[rows - highest:])
+    return {
+        'height': height,
+        'max_height': highest,
+        'holes': height - filled,
+        'bumpiness': sum(abs(a - b) for a, b in zip(heights, heights[1:])),
+        'filled': filled,
+    }
+
+
+class PlacementBot:
+    """
+    Gieriger Bot, der nur das aktuelle Teil betrachtet.
+
+    Ein PlacementBot ist selbst eine Policy für TetrisSimulator: Der Aufruf bot(game, Input, rng)
+    liefert pro Tick die vollständige Eingabefolge (endet mit Input.HardDrop) für das aktuelle Teil.
+    Der Durchsatz wird in evaluated und seconds mitgezählt (siehe placements_per_second).
+    """
+
+    def __init__(self, weights=None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        # Anzahl bewerteter Platzierungen und die dafür benötigte Zeit
+        self.evaluated = 0
+        self.seconds = 0.0
+
+    def placements(self, game):
+        """
+        Zählt alle erreichbaren Platzierungen des aktuellen Teils auf.
+        Erreichbar heißt: zuerst drehen, dann nach links oder rechts schieben, dann Hard Drop, wobei
+        jeder Schritt wie in prInput nur ausgeführt wird, wenn das Ziel frei ist.
+
+        Returns:
+            list: (Eingabefolge, Landeposition) je unterschiedlicher Landeposition
+        """
+        found = {}
+        for rotations in ROTATION_SEQUENCES:
+            coords = game.current()
+            rotation = game._rotation
+            for input in rotations:
+                turned = game.rotated(coords, game._shape, rotation, 1 if input == Input.RotateLeft else -1)
+                if turned is None:
+                    break
+                coords, rotation = turned
+            else:
+                self._add_shifts(game, coords, rotations, found)
+        return [(inputs, landed) for landed, inputs in found.values()]
+
+    def _add_shifts(self, game, coords, rotations, found):
+        """Ergänzt die Platzierungen für alle Verschiebungen nach links und rechts ab `coords`."""
+        for input, dx in ((Input.Left, -1), (Input.Right, 1)):
+            shifted = coords
+            steps = 0
+            while True:
+                landed = game.ghost(shifted)
+                key = frozenset(landed)
+                if key not in found:
+                    found[key] = (landed, rotations + [input] * steps + [Input.HardDrop])
+                proposed = [(x + dx, y) for (x, y) in shifted]
+                if not game.fits(proposed):
+                    break
+                shifted = proposed
+                steps += 1
+
+    def evaluate(self, game, landed, filled=None):
+        """
+        Friert das aktuelle Teil an der Landeposition auf einer Kopie des Spiels ein und bewertet das Ergebnis.
+        `filled` ist die Anzahl belegter Zellen vor dem Einfrieren (wird sonst berechnet).
+        """
+        if filled is None:
+            filled = board_features(game.grid, game.heights)['filled']
+        return self._place(game, landed, filled)[3]
+
+    def _place(self, game, landed, filled, color=None):
+        """
+        Friert ein Teil der Farbe `color` (Standard: aktuelle Farbe) an der Landeposition auf einer Kopie
+        des Spiels ein. Gibt (Kopie, eingefrorene Zellen, Merkmale, Bewertung) zurück.
+        """
+        # Die Kopie teilt sich die Zeilen mit dem Spiel; nur die Zeilen, die freeze() ändert, werden kopiert
+        trial = game.clone()
+        trial._current = landed
+        if color is not None:
+            trial.current_color = color
+        # freeze() erzeugt kein neues Teil und verbraucht deshalb keine Zufallszahlen
+        locked = trial.freeze()
+        features = board_features(trial.grid, trial.heights)
+        features['cleared'] = (filled + len(locked) - features['filled']) / game.columns
+        value = sum(weight * features[name] for name, weight in self.weights.items())
+        self.evaluated += 1
+        return trial, locked, features, value
+
+    def best_move(self, game):
+        """Gibt die Eingabefolge für die am besten bewertete Platzierung des aktuellen Teils zurück."""
+        start = time.perf_counter()
+        filled = board_features(game.grid, game.heights)['filled']
+        best = None
+        best_value = None
+        candidates = self.placements(game)
+        for inputs, landed in candidates:
+            value = self.evaluate(game, landed, filled)
+            if best_value is None or value > best_value:
+                best, best_value = inputs, value
+        self.seconds += time.perf_counter() - start
+        return best
+
+    def placements_per_second(self):
+        """Bewertete Platzierungen pro Sekunde über alle bisherigen best_move-Aufrufe."""
+        return self.evaluated / self.seconds if self.seconds else 0.0
+
+    def __call__(self, game, Input, rng):
+        return self.best_move(game)
+
+
+# Bewertung eines Spielfelds, auf dem das nächste Teil nicht mehr erscheinen kann
+LOSS = -1e6
+
+# Platzhalterfarbe für Teile, deren Farbe noch nicht feststeht
+UNKNOWN_COLOUR = '?'
+
+
+class Zobrist:
+    """
+    Zobrist-Hashing für Raster: Jede Kombination aus Zelle und Farbe bekommt einen zufälligen
+    64-Bit-Schlüssel, der Hash eines Rasters ist das XOR der Schlüssel aller belegten Zellen.
+    Kommen Zellen hinzu oder fallen weg, wird ihr Schlüssel einfach erneut per XOR verrechnet.
+    """
+
+    def __init__(self, seed=0):
+        self._rng = random.Random(seed)
+        self._keys = {}
+
+    def key(self, x, y, color):
+        """Schlüssel der Zelle (x, y) mit der Farbe `color`; wird beim ersten Zugriff erzeugt."""
+        key = self._keys.get((x, y, color))
+        if key is None:
+            key = self._keys[(x, y, color)] = self._rng.getrandbits(64)
+        return key
+
+    def board(self, grid, colours=True):
+        """Berechnet den Hash eines Rasters vollständig; mit colours=False zählt nur die Belegung."""
+        h = 0
+        for y, row in enumerate(grid):
+            for x, color in enumerate(row):
+                if color != background:
+                    h ^= self.key(x, y, color if colours else None)
+        return h
+
+    def toggle(self, h, cells, color):
+        """Nimmt die Zellen mit der Farbe `color` in den Hash auf bzw. entfernt sie wieder."""
+        for (x, y) in cells:
+            h ^= self.key(x, y, color)
+        return h
+
+
+class TranspositionTable:
+    """Begrenzter Cache (LRU) für Bewertungen, die über den Zobrist-Hash gefunden werden."""
+
+    def __init__(self, size=100000):
+        self.size = size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Gibt den gespeicherten Wert zurück (oder None) und markiert ihn als zuletzt verwendet."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Speichert einen Wert; ist die Tabelle voll, fällt der am längsten unbenutzte Eintrag heraus."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+
+class _Timeout(Exception):
+    """Das Zeitbudget eines Zugs ist aufgebraucht."""
+
+
+class LookaheadBot(PlacementBot):
+    """
+    Bot mit Vorausschau über die nächsten `depth` - 1 Teile.
+
+    Die ersten `preview` Folgeteile liest der Bot aus der Vorschau des Spiels (game.preview),
+    so wie ein Spieler die nächsten Teile am Rand sieht. Über alle weiteren wird gemittelt (jede Form
+    gleich wahrscheinlich, wie bei UniformShapes). Auf jeder Ebene werden nur die `beam_width` statisch besten
+    Platzierungen weiter verfolgt. Bewertungen tieferer Ebenen werden in einer Transpositionstabelle
+    unter (Zobrist-Hash, Tiefe, bekannte Teile) gespeichert, die über die Züge hinweg erhalten bleibt. Ist die Farbe
+    für die Regeln der Variante bedeutungslos (colour_rules), hasht der Bot nur die Belegung.
+
+    Mit time_budget (Sekunden) wird iterativ vertieft: Zuerst wird mit Tiefe 1 gesucht, dann mit jeder
+    weiteren Tiefe, solange die Zeit reicht; es gilt das Ergebnis der tiefsten vollständigen Suche.
+    """
+
+    def __init__(self, weights=None, depth=2, beam_width=4, time_budget=None, table_size=100000, preview=0):
+        super().__init__(weights)
+        self.depth = depth
+        self.preview = preview
+        self.beam_width = beam_width
+        self.time_budget = time_budget
+        self.table = TranspositionTable(table_size)
+        self.zobrist = Zobrist()
+        # Tiefe der letzten vollständigen Suche
+        self.reached_depth = 0
+        self._deadline = None
+
+    def best_move(self, game):
+        """Gibt die Eingabefolge für die Platzierung mit der besten Bewertung nach Vorausschau zurück."""
+        start = time.perf_counter()
+        self._deadline = start + self.time_budget if self.time_budget is not None else None
+        filled = board_features(game.grid, game.heights)['filled']
+        h = self.zobrist.board(game.grid, game.colour_rules)
+        children = self._children(game, h, filled, game.current_color)
+        # Bekannte Folgeteile als (Form, Offset, Farbe)
+        upcoming = tuple(game.preview(min(self.preview, self.depth - 1))) if self.preview else ()
+
+        best = children[0][0] if children else [Input.HardDrop]
+        self.reached_depth = 1
+        for depth in range(2, self.depth + 1):
+            try:
+                best = self._best_child(children, depth, upcoming)
+            except _Timeout:
+                break
+            self.reached_depth = depth
+        self.seconds += time.perf_counter() - start
+        return best
+
+    def _best_child(self, children, depth, upcoming=()):
+        """Eingabefolge des Kindes mit dem besten Wert bei `depth` - 1 weiteren Teilen."""
+        best = None
+        best_value = None
+        for inputs, trial, h, filled, _ in children[:self.beam_width]:
+            value = self._expected(trial, h, filled, depth - 1, upcoming[:depth - 1])
+            if best_value is None or value > best_value:
+                best, best_value = inputs, value
+        return best
+
+    def _children(self, game, h, filled, color):
+        """
+        Alle Platzierungen des aktuellen Teils von `game` als
+        (Eingabefolge, Kopie, Hash, belegte Zellen, Bewertung), die beste zuerst.
+        """
+        children = []
+        for inputs, landed in self.placements(game):
+            trial, locked, features, value = self._place(game, landed, filled, color)
+            if features['filled'] == filled + len(locked):
+                # Nichts entfernt: der Hash ändert sich nur um die neuen Zellen
+                child_hash = self.zobrist.toggle(h, locked, color if game.colour_rules else None)
+            else:
+                child_hash = self.zobrist.board(trial.grid, game.colour_rules)
+            children.append((inputs, trial, child_hash, features['filled'], value))
+        children.sort(key=lambda child: child[4], reverse=True)
+        return children
+
+    def _expected(self, game, h, filled, depth, upcoming=()):
+        """
+        Mittlere Bewertung des Spielfelds, wenn noch `depth` Teile gelegt werden. Die ersten davon sind
+        mit `upcoming` als (Form, Offset, Farbe) bekannt, die übrigen unbekannt.
+        """
+        key = (h, depth, upcoming)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        if upcoming:
+            shape, offset, color = upcoming[0]
+            pieces = [(shape, offset, color)]
+        else:
+            pieces = [(shape, None, UNKNOWN_COLOUR) for shape in range(len(ROTATIONS))]
+        total = 0.0
+        for shape, offset, color in pieces:
+            trial = self._spawn(game, shape, offset)
+            if trial is None:
+                total += LOSS
+            elif depth == 1:
+                # Letzte Ebene: nur die beste statische Bewertung zählt, Kopien und Hashes werden nicht gebraucht
+                total += max(self._place(trial, landed, filled, color)[3]
+                             for _, landed in self.placements(trial))
+            else:
+                children = self._children(trial, h, filled, color)
+                total += max(self._expected(child, child_hash, child_filled, depth - 1, upcoming[1:])
+                             for _, child, child_hash, child_filled, _ in children[:self.beam_width])
+        value = total / len(pieces)
+        self.table.put(key, value)
+        return value
+
+    def _spawn(self, game, shape, offset=None):
+        """
+        Kopie von `game` mit einem Teil der Form `shape` am horizontalen `offset` (Standard: oben in der
+        Mitte), oder None, wenn es dort nicht mehr hinpasst.
+        """
+        cells = ROTATIONS[shape][0]
+        if offset is None:
+            xs = [x for (x, _) in cells]
+            offset = max(-min(xs), min(game.columns // 2 - 2, game.columns - 1 - max(xs)))
+        coords = [(x + offset, y) for (x, y) in cells]
+        if not game.fits(coords):
+            return None
+        trial = game.clone()
+        trial._shape = shape
+        trial._rotation = 0
+        trial._current = coords
+        return trial
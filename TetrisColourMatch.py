@@ -1,163 +1,227 @@
-import pygame
-import random
-from enum import Enum
+import TetrisEngine
+from TetrisEngine import background, Change, Input
 
-# Globale Definitionen
-background = 'Black'
-Input = Enum('Input', ['Left', 'Right', 'RotateLeft', 'RotateRight', 'Fall'])
 
+class ColourComponents:
+    """
+    Persistent union-find over neighbouring cells of the same colour.
+
+    Cells are indexed as y * columns + x. parent[y][x] is the parent index of a cell, -1 if it is
+    empty. roots[y] maps every root in row y to (size, cover, cells): cover is a bit mask of the
+    columns the component covers, so a component spans the width as soon as its mask equals the
+    full mask; cells is a tree of nested pairs whose leaves are the member indices.
+
+    Like the rows of the game grid, the rows of parent and roots are shared with snapshots (see
+    share) and copied on their first write, so a snapshot costs O(rows) and a lock only copies the
+    rows it touches. The member trees are never changed, a union just pairs the two trees.
+    """
 
-class MehrsteinTetris:
-    def __init__(self, columns=20, rows=30):
+    def __init__(self, grid, columns, rows):
+        self.grid = grid
         self.columns = columns
         self.rows = rows
-        # Erstelle das Raster (Grid) als Liste von Zeilen, die mit der Hintergrundfarbe gefüllt sind.
-        self.grid = [[background for _ in range(columns)] for _ in range(rows)]
-        # Definiere eine Liste möglicher Farben für die Tetris-Teile.
-        self.colors = ["Purple", "Cyan", "White"]
-        ## "Yellow", "Magenta", "Cyan", "Orange, "Red", "Green","Blue""
-        # Setze current_color beim Start fest
-        self.current_color = random.choice(self.colors)
-        # Initial wird ein Standard-Teil, hier ein I-Teil, in der Mitte des Spielfelds erzeugt.
-        self._current = [(columns // 2 - 2, 0),
-                         (columns // 2 - 1, 0),
-                         (columns // 2, 0),
-                         (columns // 2 + 1, 0)]
-
-    def current(self):
-        """Gibt die aktuellen Koordinaten des fallenden Teils zurück."""
-        return self._current
-
-    def ended(self):
+        self.full = (1 << columns) - 1
+        self.parent = [[-1] * columns for _ in range(rows)]
+        self.roots = [{} for _ in range(rows)]
+        # ids of the rows of parent and roots that belong to this object and may be written directly
+        self._owned = set(map(id, self.parent)) | set(map(id, self.roots))
+        for y in range(rows):
+            for x in range(columns):
+                if grid[y][x] != background:
+                    self.add(x, y)
+
+    def share(self, grid):
         """
-        Das Spiel ist beendet, wenn in der obersten Zeile eine
-        Zelle nicht mehr der Hintergrundfarbe entspricht.
+        Returns a copy that belongs to `grid` (a grid with the same cells) and shares all rows with
+        this object. From now on both copy a row before writing to it.
         """
-        row_zero = [cell for cell in self.grid[0] if cell != background]
-        return len(row_zero) != 0
-
-    def get_new_piece(self):
+        other = object.__new__(ColourComponents)
+        other.grid = grid
+        other.columns = self.columns
+        other.rows = self.rows
+        other.full = self.full
+        other.parent = self.parent[:]
+        other.roots = self.roots[:]
+        other._owned = set()
+        self._owned = set()
+        return other
+
+    def _parent_row(self, y):
+        """Returns row y of parent for writing, copying it first if it may be shared."""
+        row = self.parent[y]
+        if id(row) not in self._owned:
+            row = self.parent[y] = row[:]
+            self._owned.add(id(row))
+        return row
+
+    def _roots_row(self, y):
+        """Returns row y of roots for writing, copying it first if it may be shared."""
+        row = self.roots[y]
+        if id(row) not in self._owned:
+            row = self.roots[y] = dict(row)
+            self._owned.add(id(row))
+        return row
+
+    def all_roots(self):
+        """Returns the roots of all components."""
+        return [root for row in self.roots for root in row]
+
+    def find(self, i):
         """
-        Erzeugt ein neues Tetris-Teil aus einer festgelegten Auswahl an Formen.
-        Die Formen werden als Liste relativer Koordinaten definiert.
-        Anschließend wird ein horizontaler Offset berechnet, sodass das Teil
-        innerhalb der Spielfeldgrenzen platziert werden kann.
+        Returns the root of cell i. There is no path compression, so reading never writes to shared
+        rows; union by size keeps the trees O(log n) deep.
         """
-        shapes = [
-            [(0, 0), (1, 0), (2, 0), (3, 0)],  # I-Form
-            [(0, 0), (0, 1), (1, 0), (1, 1)],  # O-Form
-            [(1, 0), (0, 1), (1, 1), (2, 1)],  # T-Form
-            [(1, 0), (2, 0), (0, 1), (1, 1)],  # S-Form
-            [(0, 0), (1, 0), (1, 1), (2, 1)],  # Z-Form
-            [(0, 0), (0, 1), (1, 1), (2, 1)],  # J-Form
-            [(2, 0), (0, 1), (1, 1), (2, 1)]  # L-Form
-        ]
-        shape = random.choice(shapes)
-        # Bestimme den horizontalen Offset, damit das neue Teil in das Spielfeld passt.
-        xs = [x for (x, y) in shape]
-        min_x = min(xs)
-        max_x = max(xs)
-        offset_min = -min_x
-        offset_max = self.columns - 1 - max_x
-        offset = random.randint(offset_min, offset_max) if offset_max >= offset_min else offset_min
-        new_piece = [(x + offset, y) for (x, y) in shape]
-        # Weise dem neuen Teil eine zufällige Farbe zu.
-        self.current_color = random.choice(self.colors)
-        return new_piece
-
-    def move(self):
-        new_coords = [(x, y + 1) for (x, y) in self._current]
-        can_move = True
-        for (x, y) in new_coords:
-            if x < 0 or x >= self.columns or y >= self.rows or self.grid[y][x] != background:
-                can_move = False
-                break
-        if can_move:
-            self._current = new_coords
-        else:
-            # "Einfrieren" des Teils ins Raster mit der aktuellen Farbe
-            for (x, y) in self._current:
-                if 0 <= x < self.columns and 0 <= y < self.rows:
-                    self.grid[y][x] = self.current_color
-
-            self.remove_connected_lines()
-
-            # Erzeuge ein neues Teil mit zufälliger Farbe.
-            self._current = self.get_new_piece()
-        return self
-
-    def prInput(self, input):
+        columns = self.columns
+        parent = self.parent
+        while True:
+            p = parent[i // columns][i % columns]
+            if p == i:
+                return i
+            i = p
+
+    def union(self, a, b):
+        """Merges the components of cells a and b (smaller into larger)."""
+        columns = self.columns
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        size_a, cover_a, cells_a = self.roots[ra // columns][ra]
+        size_b, cover_b, cells_b = self.roots[rb // columns][rb]
+        if size_a < size_b:
+            ra, rb = rb, ra
+        self._parent_row(rb // columns)[rb % columns] = ra
+        del self._roots_row(rb // columns)[rb]
+        self._roots_row(ra // columns)[ra] = (size_a + size_b, cover_a | cover_b, (cells_a, cells_b))
+        return ra
+
+    def add(self, x, y):
+        """Adds the occupied cell (x, y) and merges it with its same-colour neighbours."""
+        columns = self.columns
+        grid = self.grid
+        parent = self.parent
+        i = y * columns + x
+        self._parent_row(y)[x] = i
+        self._roots_row(y)[i] = (1, 1 << x, i)
+        color = grid[y][x]
+        if x > 0 and parent[y][x - 1] != -1 and grid[y][x - 1] == color:
+            self.union(i, i - 1)
+        if x < columns - 1 and parent[y][x + 1] != -1 and grid[y][x + 1] == color:
+            self.union(i, i + 1)
+        if y > 0 and parent[y - 1][x] != -1 and grid[y - 1][x] == color:
+            self.union(i, i - columns)
+        if y < self.rows - 1 and parent[y + 1][x] != -1 and grid[y + 1][x] == color:
+            self.union(i, i + columns)
+
+    def roots_of(self, cells):
+        """Returns the roots of the components containing the given (x, y) cells."""
+        columns = self.columns
+        parent = self.parent
+        return {self.find(y * columns + x) for (x, y) in cells if parent[y][x] != -1}
+
+    def spanning(self, roots):
+        """Returns the roots whose component covers every column."""
+        columns = self.columns
+        return [root for root in roots if self.roots[root // columns][root][1] == self.full]
+
+    def discard(self, root):
+        """Removes a whole component and returns its cells as (x, y)."""
+        columns = self.columns
+        _, _, tree = self._roots_row(root // columns).pop(root)
+        cells = []
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if type(node) is tuple:
+                stack.extend(node)
+            else:
+                x, y = node % columns, node // columns
+                self._parent_row(y)[x] = -1
+                cells.append((x, y))
+        return cells
+
+    def relocate(self, moved):
         """
-        Verarbeitet die Tastatureingabe.
-         - Mit Input.Left und Input.Right werden alle Blöcke des aktuellen Teils lateral verschoben, falls das Ziel frei ist.
-         - Mit Input.RotateLeft bzw. Input.RotateRight wird das Teil um einen Pivotpunkt (den ersten Block) gedreht.
-         - Mit Input.Fall wird das Teil beschleunigt (Soft Drop) nach unten bewegt,
-           indem pro Eingabe mehrere Schritte ausgeführt werden, ohne sofort alle Zeilen zu überspringen.
+        Rebuilds the components touched by gravity. `moved` holds (x, old_y, new_y) for every
+        cell that fell; the grid must already show the new positions. Every component that
+        contained a moved cell is dissolved and its cells are added again at their current
+        position. Returns the re-added cells as (x, y).
         """
-        if input == Input.Left:
-            proposed = [(x - 1, y) for (x, y) in self._current]
-            if all(0 <= x < self.columns and self.grid[y][x] == background for (x, y) in proposed):
-                self._current = proposed
-
-        elif input == Input.Right:
-            proposed = [(x + 1, y) for (x, y) in self._current]
-            if all(0 <= x < self.columns and self.grid[y][x] == background for (x, y) in proposed):
-                self._current = proposed
-
-        elif input == Input.RotateLeft:
-            # Drehung gegen den Uhrzeigersinn; benutze den ersten Block als Drehpunkt.
-            pivot = self._current[0]
-            new_coords = []
-            for (x, y) in self._current:
-                new_x = pivot[0] - (y - pivot[1])
-                new_y = pivot[1] + (x - pivot[0])
-                new_coords.append((new_x, new_y))
-            if all(0 <= new_x < self.columns and 0 <= new_y < self.rows and self.grid[new_y][new_x] == background
-                   for (new_x, new_y) in new_coords):
-                self._current = new_coords
-
-        elif input == Input.RotateRight:
-            # Drehung im Uhrzeigersinn; benutzte ebenfalls den ersten Block als Drehpunkt.
-            pivot = self._current[0]
-            new_coords = []
-            for (x, y) in self._current:
-                new_x = pivot[0] + (y - pivot[1])
-                new_y = pivot[1] - (x - pivot[0])
-                new_coords.append((new_x, new_y))
-            if all(0 <= new_x < self.columns and 0 <= new_y < self.rows and self.grid[new_y][new_x] == background
-                   for (new_x, new_y) in new_coords):
-                self._current = new_coords
-
-        elif input == Input.Fall:
-            # Hier wird jetzt schrittweise gedroppt und nicht mehr instant nach unten gewarped.
-            steps = 3  # Anzahl der Schritte pro Frame bei gedrückter Leertaste
-            for _ in range(steps):
-                proposed = [(x, y + 1) for (x, y) in self._current]
-                if all((y + 1) < self.rows and self.grid[y + 1][x] == background for (x, y) in self._current):
-                    self._current = proposed
-                else:
-                    # Kann der Block nicht weiterfallen, wird er eingefroren.
-                    self.move()
-                    break
+        new_rows = {(x, old_y): new_y for (x, old_y, new_y) in moved}
+        affected = []
+        for root in self.roots_of([(x, old_y) for (x, old_y, _) in moved]):
+            affected.extend(self.discard(root))
+        cells = [(x, new_rows.get((x, y), y)) for (x, y) in affected]
+        for (x, y) in cells:
+            self.add(x, y)
+        return cells
+
+
+class MehrsteinTetris(TetrisEngine.MehrsteinTetris):
+    """
+    Variant: after a piece is frozen, connected blocks of the same colour that span
+    the whole width of the field are removed and the blocks above fall down.
+    """
+    colors = ["Purple", "Cyan", "White"]
+    colour_rules = True
+    ## "Yellow", "Magenta", "Cyan", "Orange, "Red", "Green","Blue""
+
+    def __init__(self, columns=20, rows=30, seed=None, pieces='uniform'):
+        super().__init__(columns, rows, seed, pieces)
+        # Union-find over the frozen blocks, built on the first lock
+        self._components = None
+        # Cells moved by the last gravity pass; their components are checked at the next lock
+        self._pending = []
+
+    def remove_completed(self, locked):
+        self.remove_connected_lines(locked)
+
+    def recompute_heights(self):
+        # The grid was edited directly: rebuild the union-find now instead of at the next lock,
+        # so that lock already takes the incremental path. Components that span the width in the
+        # edited grid are removed by the next lock that touches them.
+        super().recompute_heights()
+        self._rebuild_components()
+
+    def _rebuild_components(self):
+        self._components = ColourComponents(self.grid, self.columns, self.rows)
+        self._pending = []
+
+    def snapshot(self):
+        # The union-find shares its rows with the snapshot (copy-on-write, like the grid), so
+        # restore and clone keep the incremental path without copying the whole structure
+        components = self._components
+        if components is not None and components.grid is self.grid:
+            components = components.share(None)
+        else:
+            components = None
+        return super().snapshot(), self._pending, components
+
+    def restore(self, snapshot):
+        state, pending, components = snapshot
+        super().restore(state)
+        # Shared again, so the snapshot stays valid for further restores
+        self._components = components.share(self.grid) if components is not None else None
+        self._pending = pending
         return self
 
     def find_connected_blocks(self, grid, color, start_x, start_y, visited):
-        """Helper function to find all connected blocks of the same color using DFS."""
-        if (start_x < 0 or start_x >= self.columns or 
-            start_y < 0 or start_y >= self.rows or 
-            (start_x, start_y) in visited or 
-            grid[start_y][start_x] != color):
-            return set()
-        
-        visited.add((start_x, start_y))
-        connected = {(start_x, start_y)}
-        
-        # Check all 4 directions
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        for dx, dy in directions:
-            new_x, new_y = start_x + dx, start_y + dy
-            connected.update(self.find_connected_blocks(grid, color, new_x, new_y, visited))
-        
+        """Helper function to find all connected blocks of the same color (iterative DFS)."""
+        connected = set()
+        stack = [(start_x, start_y)]
+        while stack:
+            x, y = stack.pop()
+            if (x < 0 or x >= self.columns or
+                y < 0 or y >= self.rows or
+                (x, y) in visited or
+                grid[y][x] != color):
+                continue
+
+            visited.add((x, y))
+            connected.add((x, y))
+
+            # Check all 4 directions
+            stack.extend(((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)))
+
         return connected
 
     def spans_width(self, blocks):
@@ -170,51 +234,85 @@ class MehrsteinTetris:
             columns_covered.add(x)
         return len(columns_covered) == self.columns
 
-    def remove_connected_lines(self):
-        """Find and remove connected blocks of the same color that span the width."""
-        visited = set()
+    def remove_connected_lines(self, locked=None):
+        """
+        Find and remove connected blocks of the same color that span the width.
+
+        With `locked` (the cells of the piece that was just frozen) only the components of
+        these cells and of the cells moved by the last gravity pass are checked, which is all
+        that can have changed since the previous lock. Without it the union-find is rebuilt
+        from the whole grid, e.g. after the grid was edited directly.
+        """
+        components = self._components
+        # A piece frozen on top of existing blocks (overlapping spawn) overwrites their colour,
+        # which the union-find cannot undo; the same holds for a replaced or unknown grid.
+        if (locked is None or components is None or components.grid is not self.grid
+                or any(components.parent[y][x] != -1 for (x, y) in locked)):
+            components = self._components = ColourComponents(self.grid, self.columns, self.rows)
+            candidates = components.all_roots()
+            # The grid may have been edited directly; gravity relies on the column heights.
+            # Only internal state is rebuilt here, so no Change.Reset is emitted.
+            self._recompute_heights()
+        else:
+            for x, y in locked:
+                components.add(x, y)
+            candidates = components.roots_of(locked + self._pending)
+        self._pending = []
+
+        # Remove every component that covers all columns
         all_blocks_to_remove = set()
-        
-        # Find all connected components
-        for y in range(self.rows):
-            for x in range(self.columns):
-                if (x, y) not in visited and self.grid[y][x] != background:
-                    connected = self.find_connected_blocks(self.grid, self.grid[y][x], x, y, visited)
-                    if self.spans_width(connected):
-                        all_blocks_to_remove.update(connected)
-        
+        for root in components.spanning(candidates):
+            all_blocks_to_remove.update(components.discard(root))
+
         # If we found blocks to remove
         if all_blocks_to_remove:
             # Remove the blocks
             for x, y in all_blocks_to_remove:
-                self.grid[y][x] = background
-        
-            # Let blocks above fall down
-            for col in range(self.columns):
-                # Create a temporary column to store non-removed blocks
-                temp_column = []
-            
-                # Collect all non-removed blocks in this column from bottom to top
-                for row in range(self.rows - 1, -1, -1):
-                    if (col, row) not in all_blocks_to_remove and self.grid[row][col] != background:
-                        temp_column.append(self.grid[row][col])
-            
-                # Fill the column from bottom to top
-                row = self.rows - 1
-                # Place collected blocks
-                for color in temp_column:
-                    self.grid[row][col] = color
-                    row -= 1
-                # Fill remaining spaces with a background
-                while row >= 0:
-                    self.grid[row][col] = background
-                    row -= 1
+                self._row(y)[x] = background
 
+            # Let the blocks above fall down, only in the columns that lost blocks
+            moved = self.apply_gravity({x for x, _ in all_blocks_to_remove})
+            if self.events is not None:
+                self.events.append((Change.Removed, list(all_blocks_to_remove)))
+                self.events.append((Change.Gravity, moved))
+
+            # Only components that contained a falling block have to be rebuilt
+            self._pending = components.relocate(moved)
             return True
         return False
 
+    def apply_gravity(self, columns):
+        """
+        Moves the blocks of the given columns down into the gaps left by removed blocks, keeping
+        their order (stable compaction). Only cells that actually change are written; cells below
+        the lowest gap and above the old surface are not touched. Updates the column heights.
 
-def playTetris(tetris, block_size=30, fps=240, drop_speed=10.0):
+        Returns the moved cells as (column, old row, new row).
+        """
+        grid = self.grid
+        # Rows are written through _row, which copies rows shared with a snapshot
+        row = self._row
+        rows = self.rows
+        heights = self.heights
+        moved = []
+        for x in columns:
+            # Above the old surface there is nothing that could fall
+            top = rows - heights[x]
+            write = rows - 1
+            for y in range(rows - 1, top - 1, -1):
+                color = grid[y][x]
+                if color != background:
+                    if y != write:
+                        row(write)[x] = color
+                        row(y)[x] = background
+                        moved.append((x, y, write))
+                    write -= 1
+            heights[x] = rows - 1 - write
+        return moved
+
+
+def playTetris(tetris, block_size=30, fps=240, drop_speed=10.0, render_mode='full', bot=None, step_ms=10,
+               das=100, arr=100, show_profile=False, profile_csv=None):
     """
     Main game loop function for Tetris game.
 
@@ -225,9 +323,30 @@ def playTetris(tetris, block_size=30, fps=240, drop_speed=10.0):
     block_size : int, optional (default=30)
         Size of each tetris block in pixels
     fps : int, optional (default=240)
-        Target frames per second for the game
+        Maximum frames per second that are drawn; it does not affect the game speed
     drop_speed : float, optional (default=10.0)
         Number of downward piece movements per second during normal gameplay
+    render_mode : str, optional (default='full')
+        'full' redraws the whole screen every frame; 'dirty' keeps a persistent board
+        surface, redraws only the cells that changed and pushes them with display.update(rects)
+        'viewport' (chosen automatically when the board would exceed 1280x960 pixels) shows only
+        a window onto the board that follows the piece, plus a minimap; +/- change the zoom
+    bot : PlacementBot, optional (default=None)
+        Computer player (e.g. TetrisBot.PlacementBot()); it plans once per new piece and
+        plays the planned inputs back at one input per logic step
+    step_ms : int, optional (default=10)
+        Length of one logic step in milliseconds
+    das, arr : int, optional (default=100, 100)
+        Delayed auto shift and auto repeat rate of the arrow keys in milliseconds: a held key
+        moves once at once, again after das and then every arr milliseconds
+    show_profile : bool, optional (default=False)
+        Show the frame-time overlay from the start (F3 toggles it at any time)
+    profile_csv : str, optional (default=None)
+        Path of a CSV file that receives the per-frame times when the game is closed
+
+    Returns:
+    --------
+    TetrisLoop.LatencyStats with the delay from each key press to its logic step
 
     Game Controls:
     -------------
@@ -236,187 +355,43 @@ def playTetris(tetris, block_size=30, fps=240, drop_speed=10.0):
     - Up Arrow: Rotate piece counter-clockwise
     - Down Arrow: Rotate piece clockwise
     - Space: Fast fall
+    - Enter: Hard drop (piece lands immediately)
     - ESC: Pause/Unpause game
     - Q: Quit game (during pause or game over)
     - E: Restart game (after game over)
+    - F3: Show/hide frame times (events, update, render, flip; p50/p95/p99 and last lock)
+    - +/-: Zoom in/out (viewport mode only)
 
     Technical Details:
     -----------------
-    The game uses time-based movement instead of frame-based movement to ensure
-    consistent gameplay speed regardless of frame rate. Key timings:
+    The shared loop (TetrisLoop.run) advances the game in fixed logic steps of step_ms,
+    accumulated from the real frame time, and draws at most fps frames per second. A slow
+    frame is followed by several logic steps, so frames are skipped but game time does not
+    slow down. Keys are read as timestamped KEYDOWN/KEYUP events, so even a tap shorter than
+    a frame is applied. Key timings (the first press acts at once, held keys repeat):
     - Normal drop interval: Controlled by drop_speed parameter
     - Fast fall interval: 50ms (20 moves per second)
-    - Movement delay: 100ms between lateral movements
+    - Lateral movement: das/arr, 100ms each by default
     - Rotation delay: 150ms between rotations
 
     Game Features:
     -------------
     - Fail line at 20% from the top (red line)
     - Semi-transparent overlays for pause and game over states
-    - Score counter
     - Game over when blocks reach the fail line
     """
-
-    # Initialize Pygame and create a game window
-    pygame.init()
-    width = tetris.columns * block_size
-    height = tetris.rows * block_size
-    screen = pygame.display.set_mode((width, height))
-    pygame.display.set_caption("Tetris")
-    clock = pygame.time.Clock()
-
-    # Define fail line at 80% from top
-    fail_line_y = int(tetris.rows * 0.2)  # 20% from top (80% of play area below)
-
-    # Initialize fonts
-    large_font = pygame.font.Font(None, 74)
-    small_font = pygame.font.Font(None, 36)
-
-    # Timing control variables
-    drop_interval = 1000 / drop_speed  # Convert drops per second to milliseconds
-    last_drop_time = pygame.time.get_ticks()
-    
-    # Fast fall control variables
-    fast_fall_interval = 50  # Milliseconds between fast fall moves (20 moves/second)
-    last_fast_fall_time = 0
-    
-    # Movement delay controls to prevent too rapid movement when holding keys
-    move_delay = 100    # Milliseconds between lateral movements
-    rotate_delay = 150  # Milliseconds between rotations
-    last_move_time = {
-        'left': 0,
-        'right': 0,
-        'rotate_left': 0,
-        'rotate_right': 0
+    # Pygame is only imported once a window is actually requested
+    from TetrisLoop import run
+
+    timings = {
+        Input.Left: (das, arr),
+        Input.Right: (das, arr),
+        Input.RotateLeft: (150, 150),
+        Input.RotateRight: (150, 150),
+        Input.Fall: (50, 50),
     }
-
-    # Game state variables
-    paused = False
-    game_over = False
-    
-    # Create semi-transparent overlays with different transparencies
-    pause_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    pause_overlay.fill((0, 0, 0, 128))  # 50% transparency for pause
-    
-    game_over_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    game_over_overlay.fill((0, 0, 0, 192))  # 75% transparency for game over
-
-    # Prepare pause texts
-    pause_text = large_font.render("PAUSED", True, (255, 255, 255))
-    pause_rect = pause_text.get_rect(center=(width // 2, height // 2 - 25))
-    pause_continue = small_font.render("Press ESC to continue", True, (255, 255, 255))
-    pause_continue_rect = pause_continue.get_rect(center=(width // 2, height // 2 + 25))
-    pause_quit = small_font.render("Press Q to quit", True, (255, 255, 255))
-    pause_quit_rect = pause_quit.get_rect(center=(width // 2, height // 2 + 60))
-
-    running = True
-    while running:
-        # Maintain a consistent game speed
-        clock.tick(fps)
-        current_time = pygame.time.get_ticks()
-
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE and not game_over:
-                    paused = not paused
-                if event.key == pygame.K_q:
-                    if paused or game_over:  # Can quit from either pause or game over
-                        running = False
-                if event.key == pygame.K_e and game_over:
-                    # Reset game
-                    tetris = MehrsteinTetris(columns=tetris.columns, rows=tetris.rows)
-                    game_over = False
-
-        # Game logic (only process if the game is not paused and not game over)
-        if not paused and not game_over:
-            # Get the current keyboard state
-            keys = pygame.key.get_pressed()
-            
-            # Handle lateral movement
-            if keys[pygame.K_LEFT] and current_time - last_move_time['left'] >= move_delay:
-                tetris.prInput(Input.Left)
-                last_move_time['left'] = current_time
-                
-            if keys[pygame.K_RIGHT] and current_time - last_move_time['right'] >= move_delay:
-                tetris.prInput(Input.Right)
-                last_move_time['right'] = current_time
-                
-            # Handle rotation
-            if keys[pygame.K_UP] and current_time - last_move_time['rotate_left'] >= rotate_delay:
-                tetris.prInput(Input.RotateLeft)
-                last_move_time['rotate_left'] = current_time
-                
-            if keys[pygame.K_DOWN] and current_time - last_move_time['rotate_right'] >= rotate_delay:
-                tetris.prInput(Input.RotateRight)
-                last_move_time['rotate_right'] = current_time
-            
-            # Handle fast fall
-            if keys[pygame.K_SPACE] and current_time - last_fast_fall_time >= fast_fall_interval:
-                tetris.prInput(Input.Fall)
-                last_fast_fall_time = current_time
-
-            # Regular piece dropping
-            if current_time - last_drop_time >= drop_interval:
-                tetris.move()
-                last_drop_time = current_time
-
-            # Check for game over condition
-            for x in range(tetris.columns):
-                if tetris.grid[fail_line_y][x] != background:
-                    game_over = True
-                    break
-
-        # Rendering
-        screen.fill(background)
-        
-        # Draw fail line
-        pygame.draw.line(screen, "Red", 
-                        (0, fail_line_y * block_size), 
-                        (width, fail_line_y * block_size), 
-                        3)
-        
-        # Draw fixed blocks
-        for row in range(tetris.rows):
-            for col in range(tetris.columns):
-                color = tetris.grid[row][col]
-                if color != background:
-                    rect = (col * block_size, row * block_size, block_size, block_size)
-                    pygame.draw.rect(screen, color, rect)
-                    pygame.draw.rect(screen, "Black", rect, 1)
-                    
-        # Draw current falling piece if game is active
-        if not game_over:
-            for (col, row) in tetris.current():
-                rect = (col * block_size, row * block_size, block_size, block_size)
-                pygame.draw.rect(screen, tetris.current_color, rect)
-                pygame.draw.rect(screen, "Black", rect, 1)
-
-        # Draw pause screen
-        if paused and not game_over:
-            screen.blit(pause_overlay, (0, 0))
-            screen.blit(pause_text, pause_rect)
-            screen.blit(pause_continue, pause_continue_rect)
-            screen.blit(pause_quit, pause_quit_rect)
-
-        # Draw game over screen
-        if game_over:
-            screen.blit(game_over_overlay, (0, 0))
-            game_over_text = large_font.render('GAME OVER', True, 'White')
-            game_over_rect = game_over_text.get_rect(center=(width/2, height/2))
-            screen.blit(game_over_text, game_over_rect)
-            
-            continue_text = small_font.render('Press Q to quit or E to play again', True, 'White')
-            continue_rect = continue_text.get_rect(center=(width/2, height/2 + 50))
-            screen.blit(continue_text, continue_rect)
-
-        # Update display
-        pygame.display.flip()
-
-    # Cleanup
-    pygame.quit()
+    return run(tetris, block_size, fps, render_mode, bot, step_ms=step_ms, drop_interval=1000 / drop_speed,
+               timings=timings, show_score=False, show_profile=show_profile, profile_csv=profile_csv)
 
 
 if __name__ == "__main__":
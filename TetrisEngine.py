@@ -0,0 +1,548 @@
+"""
+Spielregeln von MehrsteinTetris ohne Abhängigkeit zu pygame.
+
+Die Varianten (Tetris.py, TetrisHorizontalMatch.py, TetrisColourMatch.py) leiten von
+MehrsteinTetris ab und ersetzen nur die Regel, was nach dem Einfrieren eines Teils entfernt
+wird (remove_completed). pygame wird erst in den playTetris-Funktionen geladen, wenn
+wirklich ein Fenster geöffnet wird.
+
+Wer wissen will, was sich geändert hat, schaltet mit watch() die Änderungsereignisse (Change) ein und
+holt sie mit drain() ab, statt das Raster abzusuchen; changed_rows fasst sie zu betroffenen Zeilen zusammen.
+"""
+import random
+from array import array
+from enum import Enum
+
+# Globale Definitionen
+background = 'Black'
+Input = Enum('Input', ['Left', 'Right', 'RotateLeft', 'RotateRight', 'Fall', 'HardDrop'])
+# Arten der Änderungsereignisse (siehe MehrsteinTetris.watch). Jedes Ereignis ist ein Tupel mit der Art vorne:
+#   (Change.Moved, alte Zellen, neue Zellen)   fallendes Teil verschoben, gedreht oder eine Zeile gefallen
+#   (Change.Spawned, Zellen)                   neues Teil erschienen
+#   (Change.Locked, Zellen, Farbe)             Teil eingefroren
+#   (Change.Cleared, Zeilen)                   volle Zeilen entfernt (Zeilennummern vor dem Entfernen)
+#   (Change.Removed, Zellen)                   Farbfläche entfernt
+#   (Change.Gravity, [(x, alte Zeile, neue Zeile)])  Blöcke nach einer Entfernung gefallen
+#   (Change.Score, Differenz)                  Punkte des letzten Einfrierens
+#   (Change.Reset,)                            Raster unbekannt verändert (restore, recompute_heights)
+Change = Enum('Change', ['Moved', 'Spawned', 'Locked', 'Cleared', 'Removed', 'Gravity', 'Score', 'Reset'])
+
+# Formen als relative Koordinaten in Ausrichtung 0 (so wie sie erscheinen) und Drehpunkt der Form.
+SHAPES = [
+    ([(0, 0), (1, 0), (2, 0), (3, 0)], (1.5, 0.5)),  # I-Form
+    ([(0, 0), (0, 1), (1, 0), (1, 1)], (0.5, 0.5)),  # O-Form
+    ([(1, 0), (0, 1), (1, 1), (2, 1)], (1, 1)),  # T-Form
+    ([(1, 0), (2, 0), (0, 1), (1, 1)], (1, 1)),  # S-Form
+    ([(0, 0), (1, 0), (1, 1), (2, 1)], (1, 1)),  # Z-Form
+    ([(0, 0), (0, 1), (1, 1), (2, 1)], (1, 1)),  # J-Form
+    ([(2, 0), (0, 1), (1, 1), (2, 1)], (1, 1))  # L-Form
+]
+
+# Wall Kicks: Versätze, die nacheinander ausprobiert werden, wenn die Drehung an Ort und Stelle blockiert ist.
+# (0, 1) als letzter Versuch erlaubt es dem I-Teil, sich direkt am oberen Rand aufzurichten.
+KICKS = [(0, 0), (-1, 0), (1, 0), (0, -1), (-2, 0), (2, 0), (0, 1)]
+
+
+def _build_rotations():
+    """
+    Berechnet einmalig beim Import alle vier Ausrichtungen jeder Form.
+    Gedreht wird um den festen Drehpunkt (cx, cy) der Form, Input.RotateLeft bildet
+    (x, y) auf (cx + cy - y, cy - cx + x) ab. Die Reihenfolge der Blöcke bleibt in jeder Ausrichtung
+    erhalten, deshalb lässt sich der Ursprung eines Teils immer aus seinem ersten Block zurückrechnen.
+    """
+    rotations = []
+    for cells, (cx, cy) in SHAPES:
+        orientations = [list(cells)]
+        for _ in range(3):
+            orientations.append([(int(cx + cy - y), int(cy - cx + x)) for (x, y) in orientations[-1]])
+        rotations.append(orientations)
+    return rotations
+
+
+def _build_kicked_rotations():
+    """
+    KICKED[Form][Ausrichtung][Drehrichtung] ist die Liste der Kandidaten (neue Ausrichtung, Blöcke relativ
+    zum Ursprung), bereits um die Kick-Versätze verschoben. Drehrichtung 1 = RotateLeft, -1 = RotateRight.
+    """
+    kicked = []
+    for orientations in ROTATIONS:
+        per_rotation = []
+        for rotation in range(4):
+            per_turn = {}
+            for turn in (1, -1):
+                new_rotation = (rotation + turn) % 4
+                cells = orientations[new_rotation]
+                per_turn[turn] = [(new_rotation, [(x + kx, y + ky) for (x, y) in cells]) for (kx, ky) in KICKS]
+            per_rotation.append(per_turn)
+        kicked.append(per_rotation)
+    return kicked
+
+
+ROTATIONS = _build_rotations()
+KICKED = _build_kicked_rotations()
+# Kleinstes und größtes x jeder Form in Ausrichtung 0, für den Offset beim Erscheinen
+SPAWN_BOUNDS = [(min(x for (x, y) in orientations[0]), max(x for (x, y) in orientations[0]))
+                for orientations in ROTATIONS]
+
+
+def changed_rows(events, rows):
+    """
+    Zeilen des Rasters, die sich durch die Ereignisse `events` (siehe Change) verändert haben können,
+    aufsteigend sortiert. Das fallende Teil zählt nicht dazu. Entfernte volle Zeilen verschieben alles
+    darüber, Change.Reset betrifft das ganze Raster.
+    """
+    changed = set()
+    for event in events:
+        kind = event[0]
+        if kind is Change.Locked or kind is Change.Removed:
+            changed.update(y for _, y in event[1])
+        elif kind is Change.Gravity:
+            for _, old_y, new_y in event[1]:
+                changed.add(old_y)
+                changed.add(new_y)
+        elif kind is Change.Cleared:
+            changed.update(range(max(event[1]) + 1))
+        elif kind is Change.Reset:
+            return list(range(rows))
+    return sorted(changed)
+
+
+class UniformShapes:
+    """Jede Form ist bei jedem Teil gleich wahrscheinlich."""
+
+    def next_shape(self, rng):
+        return rng.randrange(len(SHAPES))
+
+
+class BagShapes:
+    """7-Bag: Alle Formen kommen einmal in zufälliger Reihenfolge, danach wird der nächste Beutel gemischt."""
+
+    def __init__(self):
+        self._bag = []
+
+    def next_shape(self, rng):
+        if not self._bag:
+            self._bag = list(range(len(SHAPES)))
+            rng.shuffle(self._bag)
+        return self._bag.pop()
+
+
+# Name -> Klasse der Regel, nach der die Formen gezogen werden
+SHAPE_POLICIES = {
+    'uniform': UniformShapes,
+    'bag': BagShapes,
+}
+
+
+class PieceGenerator:
+    """
+    Erzeugt die Folge der Teile einer Partie aus deren Zufallsgenerator.
+
+    Die Teile werden blockweise auf Vorrat gezogen und kompakt als drei Arrays (Form, horizontaler
+    Offset, Farbindex) gespeichert. Für jedes Teil werden Form, Offset und Farbe nacheinander gezogen,
+    mit UniformShapes ergibt derselbe Seed deshalb dieselben Teile wie das frühere Ziehen beim Erscheinen.
+
+    Die Folge wird nur verlängert, nie verändert; welches Teil als nächstes kommt, merkt sich das Spiel
+    als Index. Kopien und Schnappschüsse eines Spiels können sich den Generator deshalb teilen.
+    """
+
+    def __init__(self, columns, colors, rng=random, policy='uniform', batch_size=64):
+        self.columns = columns
+        self.colors = colors
+        self.rng = rng
+        self.policy = policy
+        self._shapes = SHAPE_POLICIES[policy]()
+        self.batch_size = batch_size
+        self._shape_ids = array('B')
+        self._offsets = array('H')
+        self._color_ids = array('B')
+
+    def _fill(self, count):
+        """Zieht `count` weitere Teile auf Vorrat."""
+        rng = self.rng
+        for _ in range(count):
+            shape = self._shapes.next_shape(rng)
+            min_x, max_x = SPAWN_BOUNDS[shape]
+            # Der Offset wird auf alle Blöcke der Form angewandt und hält sie innerhalb des Spielfelds
+            offset_min = -min_x
+            offset_max = self.columns - 1 - max_x
+            offset = rng.randint(offset_min, offset_max) if offset_max >= offset_min else offset_min
+            self._shape_ids.append(shape)
+            self._offsets.append(offset)
+            self._color_ids.append(rng.randrange(len(self.colors)))
+
+    def piece(self, index):
+        """Gibt das Teil Nummer `index` der Folge als (Form, Offset, Farbe) zurück."""
+        missing = index + 1 - len(self._shape_ids)
+        if missing > 0:
+            self._fill(max(missing, self.batch_size))
+        return self._shape_ids[index], self._offsets[index], self.colors[self._color_ids[index]]
+
+    def pieces(self, start, count):
+        """Die Teile start .. start+count-1 als Liste von (Form, Offset, Farbe)."""
+        if count:
+            self.piece(start + count - 1)
+        return [self.piece(index) for index in range(start, start + count)]
+
+
+class MehrsteinTetris:
+    # Liste möglicher Farben für die Tetris-Teile.
+    colors = ["Red", "Green", "Blue", "Yellow", "Magenta", "Cyan", "Orange"]
+    # Hängt das Entfernen von Blöcken von ihren Farben ab? (False: nur volle Zeilen zählen)
+    colour_rules = False
+    # Puffer der Änderungsereignisse; None, solange niemand zuhört (siehe watch)
+    events = None
+
+    def __init__(self, columns=20, rows=30, seed=None, pieces='uniform'):
+        self.columns = columns
+        self.rows = rows
+        self.score = 0
+        # Zufallsgenerator der Partie: mit seed ein eigener, reproduzierbarer Strom,
+        # sonst wie bisher das globale random-Modul
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
+        # Erstelle das Raster (Grid) als Liste von Zeilen, die mit der Hintergrundfarbe gefüllt sind.
+        grid = [[background for _ in range(columns)] for _ in range(rows)]
+        # ids der Zeilen, die nur diesem Spiel gehören und direkt beschrieben werden dürfen (siehe _row);
+        # alle anderen werden vielleicht mit einem Schnappschuss geteilt
+        self._owned = set(map(id, grid))
+        self.grid = grid
+        # Höhe der Oberfläche jeder Spalte (Anzahl Zeilen vom Boden bis einschließlich des obersten Blocks)
+        self.heights = [0] * columns
+        # Setze current_color beim Start fest
+        self.current_color = self.rng.choice(self.colors)
+        # Folge der Teile; `pieces` ist die Regel für die Formen (siehe SHAPE_POLICIES).
+        # _piece_index ist das Teil, das als nächstes erscheint.
+        self.pieces = PieceGenerator(columns, self.colors, self.rng, pieces)
+        self._piece_index = 0
+        # Initial wird ein Standard-Teil, hier ein I-Teil, in der Mitte des Spielfelds erzeugt.
+        # _shape und _rotation verweisen in die Drehtabellen (ROTATIONS/KICKED).
+        self._shape = 0
+        self._rotation = 0
+        self._current = [(columns // 2 - 2, 0),
+                         (columns // 2 - 1, 0),
+                         (columns // 2, 0),
+                         (columns // 2 + 1, 0)]
+
+    def current(self):
+        """Gibt die aktuellen Koordinaten des fallenden Teils zurück."""
+        return self._current
+
+    def watch(self):
+        """
+        Schaltet die Änderungsereignisse ein (siehe Change) und gibt den Puffer zurück.
+
+        Ab jetzt hängt das Spiel bei jeder Änderung ein Ereignis an self.events an, statt dass Verbraucher
+        (Renderer, Netzwerk, Auswertungen) das ganze Raster nach Änderungen absuchen müssen; abgeholt
+        werden sie mit drain(). Ohne watch() kostet das nur eine Abfrage von self.events pro Änderung.
+        Kopien (clone) hören nicht mit, damit z.B. die Probezüge eines Bots keine Ereignisse erzeugen.
+        """
+        if self.events is None:
+            self.events = []
+        return self.events
+
+    def drain(self):
+        """Gibt die seit dem letzten Aufruf angefallenen Ereignisse zurück und leert den Puffer."""
+        events = self.events
+        if not events:
+            return []
+        drained = events[:]
+        events.clear()
+        return drained
+
+    def ended(self):
+        """
+        Das Spiel ist beendet, wenn in der obersten Zeile eine
+        Zelle nicht mehr der Hintergrundfarbe entspricht.
+        """
+        row_zero = [cell for cell in self.grid[0] if cell != background]
+        return len(row_zero) != 0
+
+    def row_occupied(self, y):
+        """Prüft, ob in Zeile y mindestens eine Zelle belegt ist (z.B. die Fail-Line)."""
+        return self.grid[y].count(background) != self.columns
+
+    def fits(self, coords):
+        """Prüft, ob alle Koordinaten innerhalb des Spielfelds liegen und die Zellen frei sind."""
+        grid = self.grid
+        columns = self.columns
+        rows = self.rows
+        for (x, y) in coords:
+            if not (0 <= x < columns and 0 <= y < rows) or grid[y][x] != background:
+                return False
+        return True
+
+    def recompute_heights(self):
+        """
+        Berechnet die Säulenhöhen vollständig aus dem Raster neu.
+        Nur nötig, wenn das Raster von außen direkt verändert wurde; meldet deshalb Change.Reset.
+        """
+        self._recompute_heights()
+        if self.events is not None:
+            self.events.append((Change.Reset,))
+
+    def _recompute_heights(self):
+        """Wie recompute_heights, aber ohne Ereignis (für Varianten, die nur interne Strukturen neu aufbauen)."""
+        # Von der obersten Zeile aus nach unten suchen
+        self.heights = [self.rows] * self.columns
+        self._lower_surface()
+
+    def _lower_surface(self, columns=None):
+        """
+        Aktualisiert die Höhen der übergebenen Spalten (Standard: alle), nachdem Blöcke entfernt wurden.
+        Die Oberfläche kann dabei nur sinken, deshalb wird ab der bisherigen Oberfläche nach unten gesucht.
+        """
+        grid = self.grid
+        rows = self.rows
+        heights = self.heights
+        for x in (range(self.columns) if columns is None else columns):
+            y = rows - heights[x]
+            while y < rows and grid[y][x] == background:
+                y += 1
+            heights[x] = rows - y
+
+    def ghost(self, coords=None):
+        """
+        Gibt die Koordinaten zurück, an denen das aktuelle Teil (oder das Teil an `coords`) beim Hard Drop
+        liegen bleibt (Ghost-Piece).
+        Liegt das Teil in allen seinen Spalten über der Oberfläche, ergibt sich die Fallhöhe direkt aus
+        den Säulenhöhen; nur unter einem Überhang wird Zeile für Zeile nach unten geprüft.
+        """
+        if coords is None:
+            coords = self._current
+        rows = self.rows
+        heights = self.heights
+        drop = rows
+        for (x, y) in coords:
+            top = rows - heights[x]
+            if y >= top:
+                break
+            drop = min(drop, top - 1 - y)
+        else:
+            return [(x, y + drop) for (x, y) in coords]
+
+        # Teil steckt unter einem Überhang: schrittweise fallen lassen
+        landed = coords
+        proposed = [(x, y + 1) for (x, y) in landed]
+        while self.fits(proposed):
+            landed = proposed
+            proposed = [(x, y + 1) for (x, y) in landed]
+        return landed
+
+    def preview(self, count):
+        """Die nächsten `count` Teile als Liste von (Form, Offset, Farbe), ohne sie zu verbrauchen."""
+        return self.pieces.pieces(self._piece_index, count)
+
+    def _row(self, y):
+        """
+        Gibt Zeile y zum Beschreiben zurück. Eine Zeile, die vielleicht mit einem Schnappschuss geteilt
+        wird, wird vorher kopiert (Copy-on-Write); alle Änderungen am Raster laufen über diese Methode.
+        """
+        row = self.grid[y]
+        if id(row) not in self._owned:
+            row = self.grid[y] = row[:]
+            self._owned.add(id(row))
+        return row
+
+    def _save_board(self):
+        """Hält das Raster für snapshot() fest: Die Zeilen werden ab jetzt geteilt statt kopiert."""
+        self._owned = set()
+        return self.grid[:]
+
+    def _restore_board(self, board):
+        """Setzt das mit _save_board festgehaltene Raster wieder ein."""
+        self.grid = board[:]
+        self._owned = set()
+
+    def snapshot(self):
+        """
+        Hält den Zustand der Partie fest und gibt ihn für restore() zurück.
+
+        Die Zeilen des Rasters werden nicht kopiert, sondern mit dem Schnappschuss geteilt: Erst wenn das
+        Spiel danach eine Zeile verändert, wird diese eine Zeile kopiert (siehe _row). Ein Schnappschuss
+        kostet deshalb nur die Liste der Zeilenverweise und die Säulenhöhen, unabhängig von der Breite.
+        """
+        return (self._save_board(), self.heights[:], self._current, self._shape, self._rotation,
+                self.current_color, self.score, self._piece_index)
+
+    def restore(self, snapshot):
+        """
+        Setzt die Partie auf einen mit snapshot() festgehaltenen Zustand zurück. Nur die Zeilenverweise
+        werden zurückgesetzt; der Schnappschuss bleibt gültig und kann mehrfach verwendet werden.
+        """
+        (board, heights, self._current, self._shape, self._rotation,
+         self.current_color, self.score, self._piece_index) = snapshot
+        self._restore_board(board)
+        self.heights = heights[:]
+        if self.events is not None:
+            self.events.append((Change.Reset,))
+        return self
+
+    def clone(self):
+        """Gibt eine unabhängige Kopie der Partie zurück, die sich die unveränderten Zeilen mit ihr teilt."""
+        # Wie copy.copy, aber ohne den Umweg über __reduce_ex__
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.events = None
+        other.restore(self.snapshot())
+        return other
+
+    def get_new_piece(self):
+        """
+        Erzeugt ein neues Tetris-Teil aus einer festgelegten Auswahl an Formen (SHAPES).
+        Form, horizontaler Offset und Farbe kommen aus dem PieceGenerator der Partie (self.pieces);
+        die Form erscheint in Ausrichtung 0 und liegt vollständig innerhalb des Spielfelds.
+        """
+        self._shape, offset, self.current_color = self.pieces.piece(self._piece_index)
+        self._piece_index += 1
+        self._rotation = 0
+        # Anmerkung: (x+offset, y) wird auf alle einzelnen Blöcke der Form angewandt
+        return [(x + offset, y) for (x, y) in ROTATIONS[self._shape][0]]
+
+    def move(self):
+        """
+        Bewegt das aktuelle fallende Teil eine Zeile nach unten,
+        sofern alle Felder direkt unter dem Teil frei und innerhalb
+        des Spielfelds liegen.
+
+        Falls mindestens ein Block nicht weiter nach unten bewegt
+        werden kann, wird das Teil "eingefroren" (siehe freeze())
+        und anschließend ein neues fallendes Teil mittels get_new_piece() erzeugt.
+        """
+        # Jeder Block des aktuellen Teils wird eine Zeile tiefer verschoben
+        new_coords = [(x, y + 1) for (x, y) in self._current]
+
+        # Wenn das Teil bewegt werden kann, werden ihm die neuen Koordinaten zugewiesen
+        if self.fits(new_coords):
+            if self.events is not None:
+                self.events.append((Change.Moved, self._current, new_coords))
+            self._current = new_coords
+        # Wenn es sich nicht bewegen kann, werden alle Blöcke des Teils an dieser Stelle eingefroren
+        else:
+            self.freeze()
+            # Erzeuge ein neues Teil mit zufälliger Farbe.
+            self._current = self.get_new_piece()
+            if self.events is not None:
+                self.events.append((Change.Spawned, self._current))
+        return self
+
+    def freeze(self):
+        """
+        Friert das aktuelle Teil ins Raster ein (die Zellen werden mit der Farbe des Teils markiert)
+        und wendet danach die Regel der Variante an (remove_completed).
+        Gibt die eingefrorenen Zellen zurück. Es wird kein neues Teil erzeugt.
+        """
+        locked = self._lock_piece()
+        events = self.events
+        if events is None:
+            self.remove_completed(locked)
+        else:
+            score = self.score
+            events.append((Change.Locked, locked, self.current_color))
+            self.remove_completed(locked)
+            events.append((Change.Score, self.score - score))
+        return locked
+
+    def _lock_piece(self):
+        """Schreibt die Zellen des aktuellen Teils ins Raster und gibt sie zurück (ohne remove_completed)."""
+        locked = []
+        for (x, y) in self._current:
+            if 0 <= x < self.columns and 0 <= y < self.rows:
+                self._row(y)[x] = self.current_color
+                self.heights[x] = max(self.heights[x], self.rows - y)
+                locked.append((x, y))
+        return locked
+
+    def remove_completed(self, locked):
+        """
+        Regel des klassischen Spiels nach dem Einfrieren:
+        Voll belegte Zeilen werden erkannt und entfernt (neue leere Zeilen werden oben eingefügt).
+        """
+        # Entferne volle Zeilen (Zeilen, in denen keine Zelle den Hintergrund mehr enthält)
+        notFull = [row for row in self.grid if background in row]
+        removed_lines = self.rows - len(notFull)
+        if removed_lines and self.events is not None:
+            self.events.append((Change.Cleared, [y for y, row in enumerate(self.grid) if background not in row]))
+        new_rows = [[background for _ in range(self.columns)] for _ in range(removed_lines)]
+        self.grid = new_rows + notFull
+        if removed_lines:
+            self._owned.update(map(id, new_rows))
+            self._lower_surface()
+
+        # Score für entfernte Zeile hinzufügen
+        self.score += removed_lines * 100
+
+        # Punkte für Platzieren eines neuen Blocks
+        self.score += 10
+
+    def rotated(self, coords, shape, rotation, turn):
+        """
+        Dreht ein Teil der Form `shape` in Ausrichtung `rotation` an der Position `coords` um eine
+        Vierteldrehung (turn=1: RotateLeft, turn=-1: RotateRight) um ihren festen Drehpunkt. Die Kandidaten
+        stammen aus der vorberechneten Tabelle KICKED; der erste, der frei ist, gewinnt.
+
+        Returns:
+            (list, int): die neuen Koordinaten und die neue Ausrichtung, oder None, wenn alles blockiert ist
+        """
+        # Ursprung des Teils aus dem ersten Block zurückrechnen
+        dx, dy = ROTATIONS[shape][rotation][0]
+        ox = coords[0][0] - dx
+        oy = coords[0][1] - dy
+        for new_rotation, cells in KICKED[shape][rotation][turn]:
+            new_coords = [(ox + x, oy + y) for (x, y) in cells]
+            if self.fits(new_coords):
+                return new_coords, new_rotation
+        return None
+
+    def prInput(self, input):
+        """
+        Verarbeitet die Tastatureingabe.
+         - Mit Input.Left und Input.Right werden alle Blöcke des aktuellen Teils lateral verschoben, falls das Ziel frei ist.
+         - Mit Input.RotateLeft bzw. Input.RotateRight wird das Teil über die Drehtabelle um den festen Drehpunkt
+           seiner Form gedreht; ist die Drehung blockiert, werden die Wall Kicks ausprobiert.
+         - Mit Input.Fall wird das Teil beschleunigt (Soft Drop) nach unten bewegt,
+           indem pro Eingabe mehrere Schritte ausgeführt werden, ohne sofort alle Zeilen zu überspringen.
+         - Mit Input.HardDrop wird das Teil sofort auf seine Landeposition (ghost()) gesetzt und eingefroren.
+        Eine Eingabe, die das Teil bewegt, ohne es einzufrieren, ergibt genau ein Change.Moved.
+        """
+        old = self._current
+        index = self._piece_index
+        if input == Input.Left:
+            # Alle Koordinaten werden nach links verschoben und in eine Liste "proposed" gesteckt
+            proposed = [(x - 1, y) for (x, y) in self._current]
+            # Es wird geprüft, ob alle neuen Koordinaten gültig sind. Wenn ja, werden sie übernommen
+            if self.fits(proposed):
+                self._current = proposed
+
+        elif input == Input.Right:
+            proposed = [(x + 1, y) for (x, y) in self._current]
+            if self.fits(proposed):
+                self._current = proposed
+
+        elif input == Input.RotateLeft or input == Input.RotateRight:
+            # Drehung per Tabellen-Lookup; RotateLeft dreht in die eine, RotateRight in die andere Richtung.
+            turn = 1 if input == Input.RotateLeft else -1
+            result = self.rotated(self._current, self._shape, self._rotation, turn)
+            if result is not None:
+                self._current, self._rotation = result
+
+        elif input == Input.Fall:
+            # Mit jedem Frame, fällt der aktuelle Block um 3 Schritte
+            steps = 3  # Anzahl der Schritte pro Frame bei gedrückter Leertaste
+            for _ in range(steps):
+                proposed = [(x, y + 1) for (x, y) in self._current]
+                if self.fits(proposed):
+                    self._current = proposed
+                else:
+                    # Kann der Block nicht weiterfallen, wird er eingefroren.
+                    self.move()
+                    break
+
+        elif input == Input.HardDrop:
+            # Landeposition direkt aus den Säulenhöhen, danach friert move() das Teil ein
+            self._current = self.ghost()
+            self.move()
+
+        if self.events is not None and self._current is not old and self._piece_index == index:
+            self.events.append((Change.Moved, old, self._current))
+        return self
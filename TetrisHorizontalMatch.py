@@ -1,96 +1,81 @@
-import pygame
-import random
-from enum import Enum
 from collections import deque
 
-# Globale Definitionen
-background = 'Black'
-Input = Enum('Input', ['Left', 'Right', 'RotateLeft', 'RotateRight', 'Fall'])
+import TetrisEngine
+from TetrisEngine import background, Change, Input
 
 
-class MehrsteinTetris:
-    def __init__(self, columns=20, rows=30):
-        self.columns = columns
-        self.rows = rows
-        self.score = 0
-        # Erstelle das Raster (Grid) als Liste von Zeilen, die mit der Hintergrundfarbe gefüllt sind.
-        self.grid = [[background for _ in range(columns)] for _ in range(rows)]
-        # Definiere eine Liste möglicher Farben für die Tetris-Teile.
-        self.colors = ["Red", "Green", "Blue"]
-        # Setze current_color beim Start fest
-        self.current_color = random.choice(self.colors)
-        # Initial wird ein Standard-Teil, hier ein I-Teil, in der Mitte des Spielfelds erzeugt.
-        self._current = [(columns // 2 - 2, 0),
-                         (columns // 2 - 1, 0),
-                         (columns // 2, 0),
-                         (columns // 2 + 1, 0)]
+class MehrsteinTetris(TetrisEngine.MehrsteinTetris):
+    """
+    Variante: Nach dem Einfrieren eines Teils wird für jede Farbe geprüft, ob eine zusammenhängende
+    Fläche dieser Farbe vom linken bis zum rechten Spielfeldrand reicht.
+    """
+    colors = ["Red", "Green", "Blue"]
+    colour_rules = True
 
-    def current(self):
-        """Gibt die aktuellen Koordinaten des fallenden Teils zurück."""
-        return self._current
+    def remove_completed(self, locked):
+        # Sobald ein Block platziert ist, kann nur die Farbfläche des gerade eingefrorenen Teils
+        # neu vom linken bis zum rechten Rand reichen; alle anderen wurden bereits früher geprüft.
+        self.remove_connected_color_from(locked, self.current_color)
 
-    def ended(self):
-        """
-        Das Spiel ist beendet, wenn in der obersten Zeile eine
-        Zelle nicht mehr der Hintergrundfarbe entspricht.
+        self.score += 10 # +10 Punkte für das Platzieren von Blöcken
+
+    def _flood(self, starts, color, visited):
         """
-        row_zero = [cell for cell in self.grid[0] if cell != background]
-        return len(row_zero) != 0
+        Breitensuche mit einer expliziten Warteschlange ab den Startzellen. Sammelt alle
+        zusammenhängenden Blöcke der Farbe `color`, die noch nicht in `visited` sind, und trägt
+        sie dort ein.
 
-    def get_new_piece(self):
+        Returns:
+            (list, bool, bool): die gefundenen Zellen sowie ob sie den linken bzw. rechten Rand berühren
         """
-        Erzeugt ein neues Tetris-Teil aus einer festgelegten Auswahl an Formen.
-        Die Formen werden als Liste relativer Koordinaten definiert.
-        Anschließend wird ein horizontaler Offset berechnet, sodass das Teil
-        innerhalb der Spielfeldgrenzen platziert werden kann.
+        grid = self.grid
+        columns = self.columns
+        rows = self.rows
+        component = []
+        queue = deque()
+        for (x, y) in starts:
+            if (x, y) not in visited and grid[y][x] == color:
+                visited.add((x, y))
+                queue.append((x, y))
+
+        while queue:
+            x, y = queue.popleft()
+            component.append((x, y))
+            # Suche in alle 4 Richtungen weiter
+            for (nx, ny) in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < columns and 0 <= ny < rows and (nx, ny) not in visited and grid[ny][nx] == color:
+                    visited.add((nx, ny))
+                    queue.append((nx, ny))
+
+        reaches_left = any(x == 0 for (x, _) in component)
+        reaches_right = any(x == columns - 1 for (x, _) in component)
+        return component, reaches_left, reaches_right
+
+    def _remove_component(self, component):
+        """Entfernt alle Blöcke einer Farb-Insel und gibt die dafür vergebenen Punkte zurück."""
+        for (x, y) in component:
+            self._row(y)[x] = background
+        self._lower_surface({x for (x, _) in component})
+        if self.events is not None:
+            self.events.append((Change.Removed, component))
+
+        # Punktevergabe je Block (optional einstellbar)
+        points = len(component) * 50
+        self.score += points
+        return points
+
+    def remove_connected_color_from(self, cells, color):
         """
-        shapes = [
-            [(0, 0), (1, 0), (2, 0), (3, 0)],  # I-Form
-            [(0, 0), (0, 1), (1, 0), (1, 1)],  # O-Form
-            [(1, 0), (0, 1), (1, 1), (2, 1)],  # T-Form
-            [(1, 0), (2, 0), (0, 1), (1, 1)],  # S-Form
-            [(0, 0), (1, 0), (1, 1), (2, 1)],  # Z-Form
-            [(0, 0), (0, 1), (1, 1), (2, 1)],  # J-Form
-            [(2, 0), (0, 1), (1, 1), (2, 1)]  # L-Form
-        ]
-        shape = random.choice(shapes)
-        # Bestimme den horizontalen Offset, damit das neue Teil in das Spielfeld passt.
-        xs = [x for (x, y) in shape]
-        min_x = min(xs)
-        max_x = max(xs)
-        offset_min = -min_x
-        offset_max = self.columns - 1 - max_x
-        offset = random.randint(offset_min, offset_max) if offset_max >= offset_min else offset_min
-        new_piece = [(x + offset, y) for (x, y) in shape]
-        # Weise dem neuen Teil eine zufällige Farbe zu.
-        self.current_color = random.choice(self.colors)
-        return new_piece
-
-    def move(self):
-        new_coords = [(x, y + 1) for (x, y) in self._current]
-        can_move = True
-        for (x, y) in new_coords:
-            if y >= self.rows or self.grid[y][x] != background:
-                can_move = False
-                break
-        if can_move:
-            self._current = new_coords
-        else:
-            # Einfrieren des Teils
-            for (x, y) in self._current:
-                if 0 <= x < self.columns and 0 <= y < self.rows:
-                    self.grid[y][x] = self.current_color
+        Prüft nur die Farbfläche, die die übergebenen Zellen (z.B. das gerade eingefrorene Teil)
+        enthält. Reicht sie vom linken bis zum rechten Spielfeldrand, wird sie vollständig entfernt.
 
-            # Sobald ein Block platziert ist, wird für jede Farbe geprüft,
-            # ob es eine durchgehende Fläche gibt und die Blöcke dieser Farbe entfernt.
-            for color in self.colors:
-                self.remove_connected_color_if_path_exists(color)
-
-            self.score += 10 # +10 Punkte für das Platzieren von Blöcken
-
-            # Neues Teil generieren
-            self._current = self.get_new_piece()
-        return self
+        Returns:
+            (list, int): die entfernten Zellen und die dafür vergebenen Punkte; ([], 0), wenn kein Pfad existiert
+        """
+        component, reaches_left, reaches_right = self._flood(cells, color, set())
+        if reaches_left and reaches_right:
+            return component, self._remove_component(component)
+        return [], 0
 
     def remove_connected_color_if_path_exists(self, color):
         """
@@ -100,261 +85,54 @@ class MehrsteinTetris:
         Falls ja, werden **alle zusammenhängenden Blöcke dieser Farbe**, nicht nur der direkte
         Verbindungspfad, vom Spielfeld entfernt.
         """
-        visited = set()  # Set für bereits besuchte Zellen aus allen Aufrufen
-
-        def dfs(x, y):
-            """
-            Rekursive Tiefensuche ab gegebener Position. Fügt alle zusammenhängenden Blöcke
-            gleicher Farbe zu 'visited' hinzu.
-
-            Args:
-                x (int): Spalte
-                y (int): Zeile
-            """
-            if (x, y) in visited:
-                return
-            if not (0 <= x < self.columns and 0 <= y < self.rows):
-                return
-            if self.grid[y][x] != color:
-                return
-
-            visited.add((x, y))
-
-            # Suche in alle 4 Richtungen weiter
-            dfs(x + 1, y)
-            dfs(x - 1, y)
-            dfs(x, y + 1)
-            dfs(x, y - 1)
+        visited = set()  # Set für bereits besuchte Zellen aus allen Suchen
 
         # Finde alle Farbinseln der gewünschten Farbe, die am linken Rand starten
         for y in range(self.rows):
             if self.grid[y][0] == color and (0, y) not in visited:
-                component = set()
-
-                # speichert den Zustand von visited, bevor er für eine neue Startzelle am linken Rand aufgerufen wird
-                visited_before = visited.copy()
-
-                # dfs wird von der nächsten Zelle aus aufgerufen
-                dfs(0, y)
-
-                # component ist der neu hinzugekommene Bereich, mit dem neusten Aufruf
-                # wird verwendet, um zu prüfen, ob die aktuelle Farbinsel die rechte Seite erreicht.
-                component = visited - visited_before
+                # Jede Suche liefert nur die neu gefundene Farbinsel, visited wird nicht kopiert
+                component, _, reaches_right = self._flood([(0, y)], color, visited)
 
                 # Prüfen, ob eine Zelle in diesem Cluster die rechte Seite berührt
-                reaches_right = any(x == self.columns - 1 for (x, _) in component)
                 if reaches_right:
-                    # Entferne alle Blöcke dieser Farb-Insel
-                    for (x, y) in component:
-                        self.grid[y][x] = background
-
-                    # Punktevergabe je Block (optional einstellbar)
-                    self.score += len(component) * 50
+                    self._remove_component(component)
                     return True  # Pfad erfolgreich entfernt
 
         return False  # Kein vollständiger Pfad gefunden
 
-    def prInput(self, input):
-        """
-        Verarbeitet die Tastatureingabe.
-         - Mit Input.Left und Input.Right werden alle Blöcke des aktuellen Teils lateral verschoben, falls das Ziel frei ist.
-         - Mit Input.RotateLeft bzw. Input.RotateRight wird das Teil um einen Pivotpunkt (den ersten Block) gedreht.
-         - Mit Input.Fall wird das Teil beschleunigt (Soft Drop) nach unten bewegt,
-           indem pro Eingabe mehrere Schritte ausgeführt werden, ohne sofort alle Zeilen zu überspringen.
-        """
-        if input == Input.Left:
-            proposed = [(x - 1, y) for (x, y) in self._current]
-            if all(0 <= x < self.columns and self.grid[y][x] == background for (x, y) in proposed):
-                self._current = proposed
-
-        elif input == Input.Right:
-            proposed = [(x + 1, y) for (x, y) in self._current]
-            if all(0 <= x < self.columns and self.grid[y][x] == background for (x, y) in proposed):
-                self._current = proposed
-
-        elif input == Input.RotateLeft:
-            # Drehung gegen den Uhrzeigersinn; benutze den ersten Block als Drehpunkt.
-            pivot = self._current[0]
-            new_coords = []
-            for (x, y) in self._current:
-                new_x = pivot[0] - (y - pivot[1])
-                new_y = pivot[1] + (x - pivot[0])
-                new_coords.append((new_x, new_y))
-            if all(0 <= new_x < self.columns and 0 <= new_y < self.rows and self.grid[new_y][new_x] == background
-                   for (new_x, new_y) in new_coords):
-                self._current = new_coords
-
-        elif input == Input.RotateRight:
-            # Drehung im Uhrzeigersinn; benutzte ebenfalls den ersten Block als Drehpunkt.
-            pivot = self._current[0]
-            new_coords = []
-            for (x, y) in self._current:
-                new_x = pivot[0] + (y - pivot[1])
-                new_y = pivot[1] - (x - pivot[0])
-                new_coords.append((new_x, new_y))
-            if all(0 <= new_x < self.columns and 0 <= new_y < self.rows and self.grid[new_y][new_x] == background
-                   for (new_x, new_y) in new_coords):
-                self._current = new_coords
 
-        elif input == Input.Fall:
-            # Hier wird jetzt schrittweise gedroppt und nicht mehr instant nach unten gewarped.
-            steps = 3  # Anzahl der Schritte pro Frame bei gedrückter Leertaste
-            for _ in range(steps):
-                proposed = [(x, y + 1) for (x, y) in self._current]
-                if all((y + 1) < self.rows and self.grid[y + 1][x] == background for (x, y) in self._current):
-                    self._current = proposed
-                else:
-                    # Kann der Block nicht weiterfallen, wird er eingefroren.
-                    self.move()
-                    break
-        return self
-
-
-def playTetris(tetris, block_size=30, fps=60):
+def playTetris(tetris, block_size=30, fps=60, render_mode='full', bot=None, step_ms=10, das=170, arr=50,
+               show_profile=False, profile_csv=None):
     """
     Diese Funktion initialisiert Pygame, erstellt ein Fenster entsprechend der
-    Spielfeldgröße von Tetris und startet die Hauptspielschleife.
-    """
-    pygame.init()
-    width = tetris.columns * block_size
-    height = tetris.rows * block_size
-    screen = pygame.display.set_mode((width, height))
-    pygame.display.set_caption("Tetris")
-    clock = pygame.time.Clock()
-
-    # Define fail line at 80% from the top
-    fail_line_y = int(tetris.rows * 0.2)
-
-    # Initialize fonts
-    large_font = pygame.font.Font(None, 74)
-    small_font = pygame.font.Font(None, 36)
-    score_font = pygame.font.Font(None, 40)
-
-    # Game timing
-    drop_time = 0
-    drop_interval = 200  # milliseconds
-
-    # Game state variables
-    game_over = False
-    paused = False
-
-    # Create overlays
-    pause_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    pause_overlay.fill((0, 0, 0, 128))
-    game_over_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
-    game_over_overlay.fill((0, 0, 0, 192))
-
-    running = True
-    while running:
-        dt = clock.tick(fps)
-        drop_time += dt
-
-        # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE and not game_over:
-                    paused = not paused
-                if event.key == pygame.K_q:
-                    if paused or game_over:
-                        running = False
-                if event.key == pygame.K_e and game_over:
-                    tetris = MehrsteinTetris(columns=tetris.columns, rows=tetris.rows)
-                    game_over = False
-
-        # Checks if Game is paused
-        if not paused and not game_over:
-            # Handle input
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
-                tetris.prInput(Input.Left)
-            if keys[pygame.K_RIGHT]:
-                tetris.prInput(Input.Right)
-            if keys[pygame.K_UP]:
-                tetris.prInput(Input.RotateLeft)
-            if keys[pygame.K_DOWN]:
-                tetris.prInput(Input.RotateRight)
-            if keys[pygame.K_SPACE]:
-                tetris.prInput(Input.Fall)
+    Spielfeldgröße von Tetris und startet die Hauptspielschleife (TetrisLoop.run).
 
-            # Automatic drop
-            if drop_time >= drop_interval:
-                tetris.move()
-                drop_time = 0
+    Die Spiellogik läuft mit fester Schrittweite von step_ms Millisekunden, unabhängig von der
+    Bildrate fps: Teile fallen alle 200 ms eine Zeile. Pfeil links/rechts wirken sofort und bei gehaltener
+    Taste nach das Millisekunden alle arr Millisekunden erneut (DAS/ARR); die Leertaste wiederholt alle
+    50 ms, Drehungen werden nicht wiederholt. Gibt die gemessenen Eingabeverzögerungen zurück
+    (TetrisLoop.LatencyStats, z.B. print(playTetris(game).summary())).
 
-            # Check game over
-            for x in range(tetris.columns):
-                if tetris.grid[fail_line_y][x] != background:
-                    game_over = True
-                    break
+    Mit render_mode='dirty' wird das Spielfeld auf einer dauerhaften Oberfläche gehalten und pro
+    Frame nur der geänderte Bereich neu gezeichnet und mit pygame.display.update(rects) ausgegeben.
+    Mit render_mode='viewport' (automatisch bei Spielfeldern, die größer als 1280x960 Pixel wären) zeigt
+    das Fenster nur einen Ausschnitt, der dem Teil folgt, und eine Minimap; Plus/Minus zoomen.
 
-        # Rendering
-        screen.fill(background)
+    Mit bot (z.B. TetrisBot.PlacementBot()) spielt der Computer: Für jedes neue Teil wird einmal die
+    beste Platzierung gesucht und ihre Eingabefolge dann mit einer Eingabe pro Logikschritt abgespielt.
 
-        # Draw fail line
-        pygame.draw.line(screen, "Red",
-                         (0, fail_line_y * block_size),
-                         (width, fail_line_y * block_size),
-                         3)
-
-        # Draw fixed blocks
-        for row in range(tetris.rows):
-            for col in range(tetris.columns):
-                color = tetris.grid[row][col]
-                if color != background:
-                    rect = (col * block_size, row * block_size, block_size, block_size)
-                    pygame.draw.rect(screen, color, rect)
-                    pygame.draw.rect(screen, "Black", rect, 1)
-
-        # Draw current piece
-        if not game_over:
-            for (col, row) in tetris.current():
-                rect = (col * block_size, row * block_size, block_size, block_size)
-                pygame.draw.rect(screen, tetris.current_color, rect)
-                pygame.draw.rect(screen, "Black", rect, 1)
-
-        # Draw score (always visible)
-        score_text = score_font.render(f'Score: {tetris.score}', True, 'White')
-        score_rect = score_text.get_rect(topleft=(10, 10))
-        screen.blit(score_text, score_rect)
-
-        # Draw pause screen
-        if paused and not game_over:
-            screen.blit(pause_overlay, (0, 0))
-            pause_text = large_font.render("PAUSED", True, 'White')
-            pause_rect = pause_text.get_rect(center=(width // 2, height // 2 - 25))
-            screen.blit(pause_text, pause_rect)
-
-            pause_continue = small_font.render("Press ESC to continue", True, 'White')
-            pause_continue_rect = pause_continue.get_rect(center=(width // 2, height // 2 + 25))
-            screen.blit(pause_continue, pause_continue_rect)
-
-            pause_quit = small_font.render("Press Q to quit", True, 'White')
-            pause_quit_rect = pause_quit.get_rect(center=(width // 2, height // 2 + 60))
-            screen.blit(pause_quit, pause_quit_rect)
-
-        # Draw game over screen
-        if game_over:
-            screen.blit(game_over_overlay, (0, 0))
-            game_over_text = large_font.render('GAME OVER', True, 'White')
-            game_over_rect = game_over_text.get_rect(center=(width // 2, height // 2 - 25))
-            screen.blit(game_over_text, game_over_rect)
-
-            final_score = score_font.render(f'Final Score: {tetris.score}', True, 'White')
-            final_score_rect = final_score.get_rect(center=(width // 2, height // 2 + 25))
-            screen.blit(final_score, final_score_rect)
-
-            continue_text = small_font.render('Press Q to quit or E to play again', True, 'White')
-            continue_rect = continue_text.get_rect(center=(width // 2, height // 2 + 75))
-            screen.blit(continue_text, continue_rect)
-
-        pygame.display.flip()
+    F3 blendet die Bildzeiten ein (show_profile=True von Anfang an); mit profile_csv werden sie beim
+    Beenden zusätzlich pro Bild in diese CSV-Datei geschrieben.
+    """
+    # pygame wird erst geladen, wenn wirklich ein Fenster geöffnet wird.
+    from TetrisLoop import run
 
-    pygame.quit()
+    timings = {Input.Left: (das, arr), Input.Right: (das, arr), Input.Fall: (50, 50)}
+    return run(tetris, block_size, fps, render_mode, bot, step_ms=step_ms, drop_interval=200, timings=timings,
+               show_profile=show_profile, profile_csv=profile_csv)
 
 
 if __name__ == "__main__":
     # Erzeuge eine neue Tetris-Partie und starte die Spielschleife.
     game = MehrsteinTetris(columns=20, rows=30)
-    playTetris(game, block_size=30, fps=10)
\ No newline at end of file
+    playTetris(game, block_size=30, fps=60)
\ No newline at end of file
@@ -0,0 +1,540 @@
+"""
+Gemeinsame Spielschleife der playTetris-Funktionen.
+
+Die Spiellogik läuft mit fester Schrittweite (step_ms, Standard 10 ms): Die seit dem letzten Bild
+vergangene Zeit wird in einem Akkumulator gesammelt und in ganze Logikschritte umgesetzt. Gezeichnet
+wird unabhängig davon einmal pro Bild, höchstens mit fps Bildern pro Sekunde. Braucht ein Bild
+länger, laufen im nächsten Durchlauf entsprechend mehr Logikschritte; es werden also Bilder
+ausgelassen, die Spielzeit läuft aber gleich schnell weiter. Fallgeschwindigkeit und
+Tastenwiederholung hängen damit nicht mehr davon ab, wie schnell ein Rechner zeichnet.
+
+Tastatureingaben werden nicht pro Bild abgefragt, sondern als KEYDOWN/KEYUP-Ereignisse mit ihrem
+Zeitpunkt aufgenommen (KeyRepeat). Zwischen zwei Bildern wartet run() auf Ereignisse statt zu schlafen,
+deshalb ist der Zeitstempel auf die Millisekunde genau und auch ein Tastendruck, der kürzer als ein
+Bild ist, geht nicht verloren. Gehaltene Tasten wiederholen sich mit Delayed Auto Shift (DAS) und
+Auto Repeat Rate (ARR) in Millisekunden, unabhängig von Bild- und Logikrate. Wie lange es vom
+Tastendruck bis zur Ausführung in der Spiellogik dauert, sammelt LatencyStats.
+
+Mit F3 wird ein Overlay mit den Bildzeiten ein- und ausgeblendet (TetrisProfiler.FrameProfiler): Jedes
+Bild wird in Ereignisse, Logikschritte, Zeichnen und Ausgabe zerlegt, dazu kommen die Kosten des
+letzten Einfrierens samt Entfernen von Blöcken. Mit profile_csv werden alle Bilder beim Beenden als
+CSV-Datei geschrieben.
+
+Passt das Spielfeld nicht ins Fenster (max_window) oder ist render_mode='viewport', zeigt run() nur einen
+Ausschnitt (Viewport), der dem fallenden Teil folgt, und daneben eine verkleinerte Übersicht (Minimap).
+Gezeichnet werden nur die sichtbaren Zeilen und Spalten, der Aufwand pro Bild hängt damit von der
+Fenstergröße ab und nicht von der Größe des Spielfelds.
+
+FixedTimestep, KeyRepeat, LatencyStats, LogicStepper und Viewport kommen ohne pygame aus; pygame wird
+erst in run() geladen.
+"""
+from collections import deque
+from time import perf_counter
+
+from TetrisEngine import background, Input
+from TetrisProfiler import FrameProfiler, percentile
+
+
+class FixedTimestep:
+    """
+    Akkumulator für feste Logikschritte. advance() nimmt die Dauer eines Bildes auf und gibt zurück,
+    wie viele Schritte fällig sind. Pro Bild werden höchstens max_frame_ms angerechnet, damit das
+    Spiel nach einem langen Stocken (z.B. Fenster verschoben) nicht minutenlang nachholt.
+    """
+
+    def __init__(self, step_ms=10, max_frame_ms=250):
+        self.step_ms = step_ms
+        self.max_frame_ms = max_frame_ms
+        self.accumulator = 0.0
+
+    def advance(self, elapsed_ms):
+        """Rechnet `elapsed_ms` an und gibt die Anzahl der jetzt fälligen Logikschritte zurück."""
+        self.accumulator += min(elapsed_ms, self.max_frame_ms)
+        steps = int(self.accumulator // self.step_ms)
+        self.accumulator -= steps * self.step_ms
+        return steps
+
+    def reset(self):
+        """Verwirft angesammelte Zeit (z.B. während der Pause), damit danach nichts nachgeholt wird."""
+        self.accumulator = 0.0
+
+    def step_times(self, now, steps):
+        """
+        Zeitpunkte der `steps` Schritte, die advance() zum Zeitpunkt `now` geliefert hat: Der letzte liegt
+        um den verbliebenen Akkumulator vor `now`, die übrigen jeweils step_ms davor.
+        """
+        last = now - self.accumulator
+        return [last - (steps - 1 - i) * self.step_ms for i in range(steps)]
+
+
+class KeyRepeat:
+    """
+    Macht aus zeitgestempelten Tastenereignissen Eingaben.
+
+    timings bildet jede Eingabe auf (das, arr) in Millisekunden oder auf None ab. Ein Druck löst die
+    Eingabe sofort aus; wird die Taste gehalten, folgt die erste Wiederholung nach das und jede weitere
+    nach arr Millisekunden (arr muss größer als 0 sein). Bei None wird nicht wiederholt.
+    """
+
+    def __init__(self, timings):
+        self.timings = timings
+        # Gehaltene Eingabe -> Zeitpunkt ihrer nächsten Wiederholung
+        self._held = {}
+        # Ausgelöste, noch nicht abgeholte Eingaben als (Zeitpunkt, Eingabe, Tastendruck?)
+        self._queue = []
+
+    def press(self, input, time):
+        self._queue.append((time, input, True))
+        timing = self.timings.get(input)
+        if timing is not None:
+            self._held[input] = time + timing[0]
+
+    def release(self, input, time):
+        if input in self._held:
+            # Wiederholungen bis zum Loslassen gelten noch, auch wenn sie noch nicht abgeholt wurden
+            self._repeat(input, time - 1)
+            del self._held[input]
+
+    def _repeat(self, input, until):
+        """Reiht die Wiederholungen einer gehaltenen Eingabe bis einschließlich `until` ein."""
+        time = self._held[input]
+        arr = self.timings[input][1]
+        while time <= until:
+            self._queue.append((time, input, False))
+            time += arr
+        self._held[input] = time
+
+    def clear(self):
+        """Vergisst gehaltene Tasten und ausgelöste Eingaben (z.B. bei Pause)."""
+        self._held.clear()
+        self._queue = []
+
+    def due(self, now):
+        """
+        Gibt alle bis zum Zeitpunkt `now` fälligen Eingaben zeitlich sortiert als (Zeitpunkt, Eingabe,
+        Tastendruck?) zurück; Tastendruck ist False bei automatischen Wiederholungen.
+        """
+        for input in self._held:
+            self._repeat(input, now)
+        self._queue.sort(key=lambda action: action[0])
+        split = 0
+        while split < len(self._queue) and self._queue[split][0] <= now:
+            split += 1
+        due, self._queue = self._queue[:split], self._queue[split:]
+        return due
+
+
+class LatencyStats:
+    """Die letzten `size` Verzögerungen vom Tastendruck bis zur Ausführung in der Spiellogik (ms)."""
+
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+
+    def record(self, ms):
+        self.samples.append(ms)
+
+    def percentile(self, p):
+        """p-Perzentil (0-100) der gesammelten Werte, None ohne Werte."""
+        return percentile(self.samples, p)
+
+    def summary(self):
+        if not self.samples:
+            return 'input latency: no key presses'
+        return (f'input latency: {len(self.samples)} presses, p50 {self.percentile(50):.0f} ms, '
+                f'p95 {self.percentile(95):.0f} ms, max {max(self.samples):.0f} ms')
+
+
+class LogicStepper:
+    """
+    Ein Logikschritt des Spiels: die fälligen Eingaben des Spielers, die nächste Eingabe des Bots und
+    die Schwerkraft. drop_interval ist in Millisekunden angegeben und wird in Logikschritte umgerechnet.
+    """
+
+    def __init__(self, tetris, step_ms, drop_interval, bot=None):
+        self.tetris = tetris
+        self.bot = bot
+        self.drop_steps = max(1, round(drop_interval / step_ms))
+        self.fail_line_y = int(tetris.rows * 0.2)
+        # Anzahl ausgeführter Schritte
+        self.steps = 0
+        self._drop = 0
+        # Noch abzuspielende Eingaben des Bots und das Teil (_piece_index), für das sie geplant wurden
+        self.plan = []
+        self.plan_piece = None
+        # Anzahl eingefrorener Teile und Dauer des letzten Aufrufs, der ein Teil eingefroren hat (ms)
+        self.locks = 0
+        self.last_lock = None
+
+    def _timed(self, call, *args):
+        """Ruft prInput bzw. move auf und misst die Dauer, wenn dabei ein Teil eingefroren wurde."""
+        tetris = self.tetris
+        index = tetris._piece_index
+        start = perf_counter()
+        call(*args)
+        if tetris._piece_index != index:
+            self.last_lock = (perf_counter() - start) * 1000
+            self.locks += 1
+
+    def step(self, inputs=()):
+        """
+        Führt einen Logikschritt mit den Eingaben `inputs` aus.
+        Gibt True zurück, wenn das Spiel danach verloren ist (Fail-Line belegt).
+        """
+        tetris = self.tetris
+        for input in inputs:
+            self._timed(tetris.prInput, input)
+
+        # Computer-Spieler
+        if self.bot is not None:
+            # Hat die Schwerkraft das Teil eingefroren, bevor der Plan abgespielt war, gehört der Rest
+            # (z.B. ein HardDrop) nicht zum neuen Teil
+            if not self.plan or self.plan_piece != tetris._piece_index:
+                self.plan = self.bot.best_move(tetris)
+                self.plan_piece = tetris._piece_index
+            if self.plan:
+                self._timed(tetris.prInput, self.plan.pop(0))
+
+        # Schwerkraft
+        self._drop += 1
+        if self._drop >= self.drop_steps:
+            self._timed(tetris.move)
+            self._drop = 0
+
+        self.steps += 1
+        return tetris.row_occupied(self.fail_line_y)
+
+
+class Viewport:
+    """
+    Sichtbarer Ausschnitt eines Spielfelds mit columns x rows Zellen in einem Bereich von width x height
+    Pixeln. left/top ist die erste sichtbare Spalte bzw. Zeile, view_columns/view_rows die Anzahl der
+    sichtbaren Spalten und Zeilen bei der aktuellen Blockgröße (Zoom).
+    """
+
+    def __init__(self, columns, rows, width, height, block_size, margin=4):
+        self.columns = columns
+        self.rows = rows
+        self.width = width
+        self.height = height
+        self.margin = margin
+        self.left = 0
+        self.top = 0
+        self.zoom(block_size)
+
+    def zoom(self, block_size):
+        """Setzt die Blockgröße (mindestens 1 Pixel) und passt den sichtbaren Bereich an."""
+        self.block_size = max(1, block_size)
+        self.view_columns = min(self.columns, max(1, self.width // self.block_size))
+        self.view_rows = min(self.rows, max(1, self.height // self.block_size))
+        self._clamp()
+
+    def _clamp(self):
+        self.left = max(0, min(self.left, self.columns - self.view_columns))
+        self.top = max(0, min(self.top, self.rows - self.view_rows))
+
+    def follow(self, cells, extra=()):
+        """
+        Verschiebt den Ausschnitt so wenig wie möglich, damit die Zellen `cells` (das fallende Teil) mit
+        etwas Rand sichtbar sind. Passen auch die Zellen `extra` (z.B. das Ghost-Piece) mit hinein,
+        werden sie ebenfalls gezeigt; sonst bleibt das Teil oben im Ausschnitt, damit möglichst viel
+        von dem Bereich zu sehen ist, in den es fällt.
+        """
+        xs = [x for x, _ in cells]
+        ys = [y for _, y in cells]
+        if extra:
+            wider_xs = xs + [x for x, _ in extra]
+            wider_ys = ys + [y for _, y in extra]
+            if (max(wider_xs) - min(wider_xs) < self.view_columns - 2 * self.margin and
+                    max(wider_ys) - min(wider_ys) < self.view_rows - 2 * self.margin):
+                xs, ys = wider_xs, wider_ys
+            elif max(wider_ys) > max(ys):
+                ys = ys + [min(ys) + self.view_rows - 2 * self.margin - 1]
+        self.left = self._follow_axis(self.left, self.view_columns, min(xs), max(xs))
+        self.top = self._follow_axis(self.top, self.view_rows, min(ys), max(ys))
+        self._clamp()
+
+    def _follow_axis(self, start, length, low, high):
+        margin = min(self.margin, length // 4)
+        if low < start + margin:
+            return low - margin
+        if high >= start + length - margin:
+            return high - length + margin + 1
+        return start
+
+    def visible(self):
+        """Sichtbarer Bereich als (links, oben, rechts, unten), rechts und unten exklusiv."""
+        return self.left, self.top, self.left + self.view_columns, self.top + self.view_rows
+
+
+def run(tetris, block_size=30, fps=60, render_mode='full', bot=None, step_ms=10, drop_interval=200,
+        timings=None, show_score=True, caption="Tetris", show_profile=False, profile_csv=None,
+        max_window=(1280, 960)):
+    """
+    Öffnet das Fenster und spielt, bis es geschlossen oder mit Q beendet wird. timings ist die
+    Tastenwiederholung je Eingabe für KeyRepeat. Gibt die gesammelten Eingabeverzögerungen
+    (LatencyStats) zurück.
+
+    Tastenbelegung: Pfeil links/rechts verschieben, Pfeil hoch/runter drehen, Leertaste fällt schneller,
+    Enter Hard Drop, ESC Pause, Q beenden (in Pause oder nach Spielende), E neues Spiel (nach Spielende),
+    F3 Overlay mit den Bildzeiten (show_profile blendet es von Anfang an ein).
+
+    Mit profile_csv (Dateipfad) werden die Zeiten aller Bilder beim Beenden als CSV-Datei geschrieben.
+
+    Mit render_mode='dirty' wird das Spielfeld auf einer dauerhaften Oberfläche gehalten und pro
+    Bild nur der geänderte Bereich neu gezeichnet und mit pygame.display.update(rects) ausgegeben.
+
+    Mit render_mode='viewport', oder wenn das Spielfeld größer als max_window (Breite, Höhe in Pixeln)
+    wäre, zeigt das Fenster einen Ausschnitt, der dem Teil folgt, und rechts eine Minimap. Plus und
+    Minus ändern die Blockgröße (Zoom).
+    """
+    # pygame wird erst geladen, wenn wirklich ein Fenster geöffnet wird.
+    import pygame
+    from TetrisRenderer import DirtyRectRenderer, TextCache, ViewportRenderer, draw_blocks, grid_blocks
+
+    if timings is None:
+        timings = {Input.Left: (170, 50), Input.Right: (170, 50), Input.Fall: (50, 50)}
+    # Taste -> Eingabe
+    key_inputs = {pygame.K_LEFT: Input.Left, pygame.K_RIGHT: Input.Right, pygame.K_UP: Input.RotateLeft,
+                  pygame.K_DOWN: Input.RotateRight, pygame.K_SPACE: Input.Fall, pygame.K_RETURN: Input.HardDrop}
+
+    pygame.init()
+    width = tetris.columns * block_size
+    height = tetris.rows * block_size
+    timestep = FixedTimestep(step_ms)
+    stepper = LogicStepper(tetris, step_ms, drop_interval, bot)
+    keys = KeyRepeat(timings)
+    latency = LatencyStats()
+    fail_line_y = stepper.fail_line_y
+
+    # Viewport-Modus: nur ein Ausschnitt des Spielfelds und eine Minimap
+    view = None
+    if render_mode == 'viewport' or width > max_window[0] or height > max_window[1]:
+        minimap_width = min(200, max_window[0] // 4)
+        viewport = Viewport(tetris.columns, tetris.rows, min(width, max_window[0] - minimap_width - 8),
+                            min(height, max_window[1]), block_size)
+        view = ViewportRenderer(viewport, minimap_width, fail_line_y)
+        width = viewport.width + 8 + view.minimap.size[0]
+        height = viewport.height
+        render_mode = 'viewport'
+    zoom_keys = {pygame.K_PLUS: 1, pygame.K_EQUALS: 1, pygame.K_KP_PLUS: 1, pygame.K_MINUS: -1, pygame.K_KP_MINUS: -1}
+
+    screen = pygame.display.set_mode((width, height))
+    pygame.display.set_caption(caption)
+    clock = pygame.time.Clock()
+
+    # Initialize fonts
+    large_font = pygame.font.Font(None, 74)
+    small_font = pygame.font.Font(None, 36)
+    score_font = pygame.font.Font(None, 40)
+
+    # Game state variables
+    game_over = False
+    paused = False
+
+    # Create overlays
+    pause_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+    pause_overlay.fill((0, 0, 0, 128))
+    game_over_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+    game_over_overlay.fill((0, 0, 0, 192))
+
+    # Beschriftungen werden nur neu gerendert, wenn sich ihr Text ändert
+    texts = TextCache()
+
+    # Dirty-Rect-Modus
+    renderer = None
+    if render_mode == 'dirty':
+        renderer = DirtyRectRenderer(tetris.columns, tetris.rows, block_size, fail_line_y)
+    overlay_drawn = False
+
+    # Bildzeiten
+    profiler = FrameProfiler(keep_all=profile_csv is not None)
+    profile_font = pygame.font.SysFont('monospace', 14)
+    profile_label = None
+    locks = stepper.locks
+
+    def render_profile():
+        """Overlay mit den Bildzeiten als halbtransparente Tafel oben rechts."""
+        lines = [profile_font.render(line, True, 'White') for line in profiler.lines()]
+        if not lines:
+            return None
+        surface = pygame.Surface((max(line.get_width() for line in lines) + 12,
+                                  sum(line.get_height() for line in lines) + 12), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 170))
+        y = 6
+        for line in lines:
+            surface.blit(line, (6, y))
+            y += line.get_height()
+        return surface, surface.get_rect(topright=(width - 10, 10))
+
+    frame_ms = 1000 / fps
+    last_frame = pygame.time.get_ticks()
+    events = []
+    running = True
+    while running:
+        # Bis zum nächsten Bild auf Ereignisse warten und jedes mit seinem Eintreffen stempeln
+        while True:
+            remaining = int(last_frame + frame_ms - pygame.time.get_ticks())
+            if remaining <= 0:
+                break
+            event = pygame.event.wait(remaining)
+            if event.type != pygame.NOEVENT:
+                events.append((pygame.time.get_ticks(), event))
+        now = pygame.time.get_ticks()
+        events.extend((now, event) for event in pygame.event.get())
+        # Dauer des letzten Bildes
+        elapsed = now - last_frame
+        last_frame = now
+        profiler.start()
+
+        # Event handling
+        for time, event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.VIDEOEXPOSE:
+                # Fensterinhalt ging verloren, alles neu zeichnen
+                overlay_drawn = False
+                if renderer is not None:
+                    renderer.invalidate()
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE and not game_over:
+                    paused = not paused
+                if event.key == pygame.K_q:
+                    if paused or game_over:
+                        running = False
+                if event.key == pygame.K_e and game_over:
+                    tetris = type(tetris)(columns=tetris.columns, rows=tetris.rows)
+                    stepper = LogicStepper(tetris, step_ms, drop_interval, bot)
+                    locks = stepper.locks
+                    timestep.reset()
+                    game_over = False
+                if event.key == pygame.K_F3:
+                    show_profile = not show_profile
+                    overlay_drawn = False
+                if event.key in zoom_keys and view is not None:
+                    size = view.viewport.block_size
+                    view.viewport.zoom(size + zoom_keys[event.key] * max(1, size // 4))
+                if event.key in key_inputs and not paused and not game_over:
+                    keys.press(key_inputs[event.key], time)
+            if event.type == pygame.KEYUP and event.key in key_inputs:
+                keys.release(key_inputs[event.key], time)
+        events = []
+        profiler.mark('events')
+
+        # Spiellogik mit fester Schrittweite, unabhängig von der Bildrate
+        steps = 0
+        if paused or game_over:
+            timestep.reset()
+            keys.clear()
+        else:
+            steps = timestep.advance(elapsed)
+            for step_time in timestep.step_times(now, steps):
+                # Jeder Schritt führt die Eingaben aus, die bis zu seinem Zeitpunkt ausgelöst wurden
+                due = keys.due(step_time)
+                over = stepper.step([input for _, input, _ in due])
+                applied = pygame.time.get_ticks()
+                for time, _, pressed in due:
+                    if pressed:
+                        latency.record(applied - time)
+                if over:
+                    game_over = True
+                    break
+        lock = stepper.last_lock if stepper.locks != locks else None
+        locks = stepper.locks
+        profiler.mark('update', steps=steps, lock=lock)
+
+        score_text = texts.render('score', score_font, f'Score: {tetris.score}') if show_score else None
+        # Das Overlay wird nur alle 15 Bilder neu erzeugt, damit die Werte lesbar bleiben
+        if not show_profile:
+            profile_label = None
+        elif profile_label is None or profiler.count % 15 == 0:
+            profile_label = render_profile()
+
+        # Dirty-Rect-Modus: solange gespielt wird, werden nur geänderte Zellen neu gezeichnet
+        if renderer is not None:
+            if not paused and not game_over:
+                labels = [(score_text, score_text.get_rect(topleft=(10, 10)))] if show_score else []
+                if profile_label is not None:
+                    labels.append(profile_label)
+                rects = renderer.draw(screen, tetris, labels=labels)
+                profiler.mark('render')
+                if rects:
+                    pygame.display.update(rects)
+                profiler.mark('flip')
+                profiler.end()
+                overlay_drawn = False
+                continue
+            if overlay_drawn:
+                # Pause- bzw. Game-Over-Bildschirm ist bereits zu sehen
+                profiler.end()
+                continue
+            overlay_drawn = True
+            renderer.invalidate()
+
+        # Rendering
+        if view is not None:
+            # Nur der sichtbare Ausschnitt und die Minimap
+            view.draw(screen, tetris, show_piece=not game_over)
+        else:
+            screen.fill(background)
+
+            # Draw fail line
+            pygame.draw.line(screen, "Red",
+                             (0, fail_line_y * block_size),
+                             (width, fail_line_y * block_size),
+                             3)
+
+            # Draw fixed blocks (vorgerenderte Sprites, ein blits-Aufruf)
+            draw_blocks(screen, grid_blocks(tetris.grid), block_size)
+
+            # Draw the current piece
+            if not game_over:
+                draw_blocks(screen, ((col, row, tetris.current_color) for (col, row) in tetris.current()), block_size)
+
+        # Draw score (always visible)
+        if show_score:
+            screen.blit(score_text, score_text.get_rect(topleft=(10, 10)))
+
+        # Draw pause screen
+        if paused and not game_over:
+            screen.blit(pause_overlay, (0, 0))
+            pause_text = texts.render('paused', large_font, "PAUSED")
+            pause_rect = pause_text.get_rect(center=(width // 2, height // 2 - 25))
+            screen.blit(pause_text, pause_rect)
+
+            pause_continue = texts.render('pause_continue', small_font, "Press ESC to continue")
+            pause_continue_rect = pause_continue.get_rect(center=(width // 2, height // 2 + 25))
+            screen.blit(pause_continue, pause_continue_rect)
+
+            pause_quit = texts.render('pause_quit', small_font, "Press Q to quit")
+            pause_quit_rect = pause_quit.get_rect(center=(width // 2, height // 2 + 60))
+            screen.blit(pause_quit, pause_quit_rect)
+
+        # Draw game over screen
+        if game_over:
+            screen.blit(game_over_overlay, (0, 0))
+            game_over_text = texts.render('game_over', large_font, 'GAME OVER')
+            game_over_rect = game_over_text.get_rect(center=(width // 2, height // 2 - 25))
+            screen.blit(game_over_text, game_over_rect)
+
+            if show_score:
+                final_score = texts.render('final_score', score_font, f'Final Score: {tetris.score}')
+                final_score_rect = final_score.get_rect(center=(width // 2, height // 2 + 25))
+                screen.blit(final_score, final_score_rect)
+
+            continue_text = texts.render('continue', small_font, 'Press Q to quit or E to play again')
+            continue_rect = continue_text.get_rect(center=(width // 2, height // 2 + 75))
+            screen.blit(continue_text, continue_rect)
+
+        # Draw frame times
+        if profile_label is not None:
+            screen.blit(*profile_label)
+        profiler.mark('render')
+
+        pygame.display.flip()
+        profiler.mark('flip')
+        profiler.end()
+
+    pygame.quit()
+    if profile_csv is not None:
+        profiler.write_csv(profile_csv)
+    return latency
@@ -0,0 +1,343 @@
+"""
+NumPy-Spielfeld für MehrsteinTetris und seine Varianten.
+
+Statt einer Liste von Zeilen mit Farbnamen liegt das Raster als uint8-Array (Zeilen x Spalten)
+mit Indizes in eine Palette vor (0 = Hintergrund). Volle Zeilen, Farbflächen und die Schwerkraft
+werden damit als Array-Operationen über das ganze Spielfeld berechnet, was sich ab Spielfeldern
+von etwa 200x400 gegenüber den verschachtelten Python-Schleifen lohnt.
+
+numpy ist optional: Dieses Modul wird nur geladen, wenn eine der Klassen hier verwendet wird
+(z.B. über TetrisSimulator --variant numpy).
+"""
+import numpy as np
+
+import TetrisColourMatch
+import TetrisEngine
+import TetrisHorizontalMatch
+from TetrisEngine import background, Change, Input
+
+
+def label_components(cells):
+    """
+    Nummeriert die Farbflächen eines Palettenarrays: benachbarte Zellen (4er-Nachbarschaft) mit
+    gleichem Index ungleich 0 erhalten dasselbe Label. Das Label einer Fläche ist der kleinste
+    flache Index (y * Spalten + x) ihrer Zellen, leere Zellen erhalten cells.size.
+
+    Gleichfarbige Abschnitte einer Zeile (Runs) werden zuerst zu je einem Knoten zusammengefasst.
+    Danach wird das kleinste Label so lange über senkrecht benachbarte Runs verteilt, bis sich
+    nichts mehr ändert; Pointer Jumping (label = label[label]) verkürzt dabei lange Ketten.
+    """
+    rows, columns = cells.shape
+    empty = cells.size
+    occupied = cells != 0
+    # Ein Run beginnt an jeder belegten Zelle, deren linker Nachbar eine andere Farbe hat
+    starts = occupied.copy()
+    starts[:, 1:] &= cells[:, 1:] != cells[:, :-1]
+    run = np.cumsum(starts.ravel()) - 1
+    labels = np.flatnonzero(starts)
+    if not len(labels):
+        return np.full(cells.shape, empty)
+
+    # Senkrecht benachbarte Zellen gleicher Farbe verbinden ihre Runs
+    down = (occupied[:-1] & (cells[:-1] == cells[1:])).ravel()
+    upper = run[:-columns][down]
+    lower = run[columns:][down]
+    while True:
+        new = labels.copy()
+        np.minimum.at(new, upper, labels[lower])
+        np.minimum.at(new, lower, labels[upper])
+        new = new[run[new]]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    return np.where(occupied, labels[run].reshape(rows, columns), empty)
+
+
+def spanning_labels(labels):
+    """
+    Gibt die Labels zurück, deren Fläche den linken und den rechten Rand berührt. Eine zusammenhängende
+    Fläche, die beide Ränder berührt, deckt automatisch jede Spalte ab.
+    """
+    spanning = np.intersect1d(labels[:, 0], labels[:, -1])
+    return spanning[spanning != labels.size]
+
+
+def flood_fill(mask, ys, xs):
+    """
+    Gibt die Maske aller Zellen zurück, die innerhalb von `mask` von den Startzellen (ys, xs) aus über
+    die 4er-Nachbarschaft erreichbar sind. Jeder Schritt erweitert die Fläche um eine Zelle in alle
+    Richtungen, gerechnet wird nur im umgebenden Rechteck, das pro Schritt um eine Zelle wächst.
+    """
+    rows, columns = mask.shape
+    ys = np.asarray(ys)
+    xs = np.asarray(xs)
+    reach = np.zeros(mask.shape, dtype=bool)
+    reach[ys, xs] = mask[ys, xs]
+    y0, y1 = int(ys.min()), int(ys.max()) + 1
+    x0, x1 = int(xs.min()), int(xs.max()) + 1
+    while True:
+        y0, y1 = max(y0 - 1, 0), min(y1 + 1, rows)
+        x0, x1 = max(x0 - 1, 0), min(x1 + 1, columns)
+        window = reach[y0:y1, x0:x1]
+        grown = window.copy()
+        grown[1:] |= window[:-1]
+        grown[:-1] |= window[1:]
+        grown[:, 1:] |= window[:, :-1]
+        grown[:, :-1] |= window[:, 1:]
+        grown &= mask[y0:y1, x0:x1]
+        if np.array_equal(grown, window):
+            return reach
+        reach[y0:y1, x0:x1] = grown
+
+
+class NumpyBoard:
+    """
+    Mixin, das das Raster von MehrsteinTetris durch ein uint8-Palettenarray (self._cells) ersetzt.
+    Muss in der Klassenliste vor der Spielklasse stehen.
+
+    `grid` steht weiterhin als Liste von Zeilen mit Farbnamen zur Verfügung, damit playTetris
+    und andere Verbraucher unverändert funktionieren. Das Raster wird nur bei Bedarf erzeugt und
+    bis zur nächsten Änderung zwischengespeichert; es ist deshalb nur lesend zu verwenden.
+    """
+
+    def __init__(self, columns=20, rows=30, seed=None, pieces='uniform'):
+        # Palette: Index -> Farbname; Index 0 ist immer der Hintergrund.
+        self._palette = [background]
+        self._palette_index = {background: 0}
+        self._grid_cache = None
+        super().__init__(columns, rows, seed, pieces)
+
+    @property
+    def grid(self):
+        """Liefert das Raster als Liste von Zeilen mit Farbnamen (nur lesend)."""
+        if self._grid_cache is None:
+            self._grid_cache = np.array(self._palette, dtype=object)[self._cells].tolist()
+        return self._grid_cache
+
+    @grid.setter
+    def grid(self, grid):
+        """Übernimmt ein Raster (Liste von Zeilen mit Farbnamen) in das Palettenarray."""
+        self._cells = np.array([[self._colour_index(cell) for cell in row] for row in grid],
+                               dtype=np.uint8).reshape(len(grid), -1)
+        self._grid_cache = None
+
+    def _colour_index(self, color):
+        """Gibt den Palettenindex einer Farbe zurück und nimmt neue Farben in die Palette auf."""
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self._palette)
+            if index > 255:
+                raise ValueError('Die Palette eines NumPy-Spielfelds fasst höchstens 255 Farben')
+            self._palette.append(color)
+            self._palette_index[color] = index
+        return index
+
+    def _set_cells(self, cells):
+        """Ersetzt das Palettenarray (z.B. nach entfernten Zeilen) und verwirft das zwischengespeicherte Raster."""
+        self._cells = cells
+        self._grid_cache = None
+
+    def _save_board(self):
+        """Kopie des Palettenarrays für snapshot() (ein zusammenhängender Speicherblock, rows * columns Bytes)."""
+        return self._cells.copy()
+
+    def _restore_board(self, board):
+        self._set_cells(board.copy())
+
+    def fits(self, coords):
+        """Prüft, ob alle Koordinaten innerhalb des Spielfelds liegen und die Zellen frei sind."""
+        cells = self._cells
+        columns = self.columns
+        rows = self.rows
+        for (x, y) in coords:
+            if not (0 <= x < columns and 0 <= y < rows) or cells[y, x]:
+                return False
+        return True
+
+    def ended(self):
+        """Das Spiel ist beendet, wenn in der obersten Zeile eine Zelle belegt ist."""
+        return bool(self._cells[0].any())
+
+    def row_occupied(self, y):
+        """Prüft Zeile y direkt im Palettenarray, ohne das Raster mit Farbnamen zu erzeugen."""
+        return bool(self._cells[y].any())
+
+    def _lower_surface(self, columns=None):
+        """Berechnet die Höhen der übergebenen Spalten (Standard: alle) aus dem Array neu."""
+        columns = list(range(self.columns)) if columns is None else sorted(columns)
+        occupied = self._cells[:, columns] != 0
+        tops = np.where(occupied.any(axis=0), occupied.argmax(axis=0), self.rows)
+        for x, top in zip(columns, tops.tolist()):
+            self.heights[x] = self.rows - top
+
+    def _lock_piece(self):
+        """Schreibt das aktuelle Teil in das Palettenarray (siehe MehrsteinTetris._lock_piece)."""
+        cells = self._cells
+        color = self._colour_index(self.current_color)
+        locked = []
+        for (x, y) in self._current:
+            if 0 <= x < self.columns and 0 <= y < self.rows:
+                cells[y, x] = color
+                self.heights[x] = max(self.heights[x], self.rows - y)
+                locked.append((x, y))
+        self._grid_cache = None
+        return locked
+
+    def _remove_cells(self, mask):
+        """
+        Leert alle Zellen der booleschen Maske, aktualisiert die Höhen der betroffenen Spalten
+        und gibt die entfernten Zellen als (x, y) zurück.
+        """
+        ys, xs = np.nonzero(mask)
+        self._cells[mask] = 0
+        self._grid_cache = None
+        self._lower_surface(set(xs.tolist()))
+        return list(zip(xs.tolist(), ys.tolist()))
+
+
+class NumpyTetris(NumpyBoard, TetrisEngine.MehrsteinTetris):
+    """Klassische Variante (volle Zeilen) auf dem NumPy-Spielfeld."""
+
+    def remove_completed(self, locked):
+        """Volle Zeilen werden mit einem einzigen all() über die Zeilen erkannt und entfernt."""
+        full = (self._cells != 0).all(axis=1)
+        removed_lines = int(full.sum())
+        if removed_lines:
+            if self.events is not None:
+                self.events.append((Change.Cleared, np.flatnonzero(full).tolist()))
+            self._set_cells(np.concatenate((np.zeros((removed_lines, self.columns), dtype=np.uint8),
+                                            self._cells[~full])))
+            self._lower_surface()
+
+        # Score für entfernte Zeilen und das Platzieren des Teils
+        self.score += removed_lines * 100
+        self.score += 10
+
+
+class NumpyHorizontalMatch(NumpyBoard, TetrisHorizontalMatch.MehrsteinTetris):
+    """
+    Variante TetrisHorizontalMatch auf dem NumPy-Spielfeld. Nach dem Einfrieren wird die Fläche des Teils
+    mit flood_fill gesucht, die vollständige Suche (remove_connected_color_if_path_exists) nummeriert alle
+    Flächen der Farbe auf einmal mit label_components.
+    """
+
+    def _remove_mask(self, mask):
+        """Entfernt alle Zellen der Maske und vergibt 50 Punkte je Block."""
+        removed = self._remove_cells(mask)
+        if self.events is not None:
+            self.events.append((Change.Removed, removed))
+        points = len(removed) * 50
+        self.score += points
+        return removed, points
+
+    def remove_connected_color_from(self, cells, color):
+        """Wie TetrisHorizontalMatch.MehrsteinTetris.remove_connected_color_from, aber als Array-Operationen."""
+        index = self._palette_index.get(color)
+        if index is None or not cells:
+            return [], 0
+        xs, ys = zip(*cells)
+        component = flood_fill(self._cells == index, ys, xs)
+        if component[:, 0].any() and component[:, -1].any():
+            return self._remove_mask(component)
+        return [], 0
+
+    def remove_connected_color_if_path_exists(self, color):
+        """Wie TetrisHorizontalMatch.MehrsteinTetris.remove_connected_color_if_path_exists, aber über Array-Labels."""
+        index = self._palette_index.get(color)
+        if index is None:
+            return False
+        labels = label_components((self._cells == index).view(np.uint8))
+        spanning = np.isin(labels[:, 0], spanning_labels(labels))
+        if not spanning.any():
+            return False
+        # Wie bei der Suche von oben nach unten am linken Rand wird die oberste Fläche entfernt
+        self._remove_mask(labels == labels[spanning.argmax(), 0])
+        return True
+
+
+class NumpyColourMatch(NumpyBoard, TetrisColourMatch.MehrsteinTetris):
+    """
+    Variante TetrisColourMatch auf dem NumPy-Spielfeld. Flächen, Breitenprüfung und Schwerkraft sind
+    Array-Operationen; wie beim Union-Find werden nach dem Einfrieren nur die Flächen des Teils und der
+    zuletzt gefallenen Blöcke geprüft.
+    """
+
+    def __init__(self, columns=20, rows=30, seed=None, pieces='uniform'):
+        super().__init__(columns, rows, seed, pieces)
+        # Array, das zuletzt geprüft wurde; ein neues Array (z.B. über den grid-Setter) wird vollständig geprüft
+        self._scanned = None
+
+    def snapshot(self):
+        # Ob das Array schon vollständig geprüft war, gilt auch für die Kopie in restore
+        return super().snapshot(), self._scanned is self._cells
+
+    def restore(self, snapshot):
+        state, scanned = snapshot
+        super().restore(state)
+        self._scanned = self._cells if scanned else None
+        return self
+
+    def _rebuild_components(self):
+        # Statt des Union-Find gilt das Array als vollständig geprüft
+        self._scanned = self._cells
+        self._pending = []
+
+    def remove_connected_lines(self, locked=None):
+        """
+        Entfernt alle gleichfarbigen Flächen, die jede Spalte berühren, und lässt die Blöcke darüber fallen
+        (siehe TetrisColourMatch.MehrsteinTetris.remove_connected_lines).
+        """
+        cells = self._cells
+        if locked is None or self._scanned is not cells:
+            labels = label_components(cells)
+        else:
+            labels = self._seed_labels(locked + self._pending)
+        self._scanned = cells
+        self._pending = []
+        if labels is None:
+            return False
+        spanning = spanning_labels(labels)
+        if not len(spanning):
+            return False
+
+        remove = np.isin(labels, spanning)
+        if self.events is not None:
+            ys, xs = np.nonzero(remove)
+            self.events.append((Change.Removed, list(zip(xs.tolist(), ys.tolist()))))
+        cells[remove] = 0
+
+        # Schwerkraft nur für Spalten, die Blöcke verloren haben: eine stabile Sortierung schiebt die
+        # belegten Zellen jeder Spalte in unveränderter Reihenfolge nach unten
+        lost = np.flatnonzero(remove.any(axis=0))
+        column_cells = cells[:, lost]
+        order = np.argsort(column_cells != 0, axis=0, kind='stable')
+        column_cells = np.take_along_axis(column_cells, order, axis=0)
+        cells[:, lost] = column_cells
+        # Gefallene Blöcke werden beim nächsten Einfrieren mitgeprüft
+        ys, moved_columns = np.nonzero((order != np.arange(self.rows)[:, None]) & (column_cells != 0))
+        self._pending = list(zip(lost[moved_columns].tolist(), ys.tolist()))
+        if self.events is not None:
+            self.events.append((Change.Gravity, list(zip(lost[moved_columns].tolist(),
+                                                         order[ys, moved_columns].tolist(), ys.tolist()))))
+        self._grid_cache = None
+        self._lower_surface(lost.tolist())
+        return True
+
+    def _seed_labels(self, seeds):
+        """
+        Nummeriert nur die Flächen, die eine der Startzellen enthalten (siehe label_components).
+        Gibt None zurück, wenn diese Flächen zusammen nicht beide Ränder berühren und deshalb keine
+        von ihnen die ganze Breite abdecken kann.
+        """
+        if not seeds:
+            return None
+        cells = self._cells
+        xs, ys = (np.array(axis) for axis in zip(*seeds))
+        colours = cells[ys, xs]
+        reach = np.zeros(cells.shape, dtype=bool)
+        for index in np.unique(colours[colours != 0]).tolist():
+            pick = colours == index
+            reach |= flood_fill(cells == index, ys[pick], xs[pick])
+        if not (reach[:, 0].any() and reach[:, -1].any()):
+            return None
+        return label_components(np.where(reach, cells, 0))
@@ -0,0 +1,95 @@
+"""
+Messung der Bildzeiten in playTetris (siehe TetrisLoop.run).
+
+Jedes Bild wird in Phasen zerlegt: events (Ereignisse verarbeiten), update (Logikschritte mit move,
+prInput und dem Entfernen von Blöcken), render (Zeichnen) und flip (display.flip bzw. display.update).
+Die Wartezeit bis zum nächsten Bild zählt nicht dazu. FrameProfiler hält die letzten Bilder für
+gleitende Perzentile (p50/p95/p99) vor, die das Overlay (Taste F3) anzeigt, und kann auf Wunsch
+alle Bilder als CSV-Datei schreiben.
+
+Das Modul kommt ohne pygame aus.
+"""
+import csv
+import time
+from collections import deque
+
+PHASES = ('events', 'update', 'render', 'flip')
+
+
+def percentile(values, p):
+    """p-Perzentil (0-100) einer Folge von Werten (nächster Rang), None ohne Werte."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+class FrameProfiler:
+    """
+    Misst die Phasen jedes Bildes mit time.perf_counter. Ablauf pro Bild: start(), mark(phase) nach jeder
+    Phase (in der Reihenfolge von PHASES, Phasen dürfen fehlen), end(). Zeiten in Millisekunden.
+
+    window ist die Anzahl der Bilder für die Perzentile; mit keep_all=True werden zusätzlich alle Bilder
+    für write_csv aufbewahrt.
+    """
+
+    def __init__(self, window=300, keep_all=False):
+        self.window = deque(maxlen=window)
+        self.frames = [] if keep_all else None
+        self.count = 0
+        # Dauer des zuletzt eingefrorenen Teils samt Entfernen von Blöcken (ms), gesetzt von außen
+        self.last_lock = None
+        self._current = None
+        self._last = 0.0
+
+    def start(self):
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._current['steps'] = 0
+        self._current['lock'] = None
+        self._last = time.perf_counter()
+
+    def mark(self, phase, **values):
+        """Schließt `phase` ab; values (z.B. steps, lock) werden zum Bild gespeichert."""
+        now = time.perf_counter()
+        self._current[phase] += (now - self._last) * 1000
+        self._last = now
+        self._current.update(values)
+
+    def end(self):
+        frame = self._current
+        frame['frame'] = self.count
+        frame['total'] = sum(frame[phase] for phase in PHASES)
+        if frame['lock'] is not None:
+            self.last_lock = frame['lock']
+        self.window.append(frame)
+        if self.frames is not None:
+            self.frames.append(frame)
+        self.count += 1
+
+    def percentiles(self, key, ps=(50, 95, 99)):
+        """Perzentile einer Phase (oder 'total') über das gleitende Fenster."""
+        values = [frame[key] for frame in self.window]
+        return [percentile(values, p) for p in ps]
+
+    def lines(self):
+        """Text des Overlays: eine Zeile je Phase mit p50/p95/p99 und die Kosten des letzten Einfrierens."""
+        if not self.window:
+            return []
+        lines = ['ms       p50    p95    p99']
+        for key in PHASES + ('total',):
+            lines.append('%-7s' % key + ''.join('%7.2f' % value for value in self.percentiles(key)))
+        if self.last_lock is not None:
+            locks = [frame['lock'] for frame in self.window if frame['lock'] is not None]
+            lines.append('lock   %7.2f  max %.2f' % (self.last_lock, max(locks) if locks else self.last_lock))
+        return lines
+
+    def write_csv(self, path):
+        """Schreibt alle aufbewahrten Bilder (keep_all=True) als CSV-Datei."""
+        columns = ('frame',) + PHASES + ('total', 'steps', 'lock')
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(columns)
+            for frame in self.frames:
+                writer.writerow(['' if frame[key] is None else
+                                 round(frame[key], 4) if isinstance(frame[key], float) else frame[key]
+                                 for key in columns])
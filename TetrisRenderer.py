@@ -0,0 +1,321 @@
+"""
+Zeichenhilfen für die playTetris-Funktionen.
+
+Dieses Modul importiert pygame und wird deshalb erst geladen, wenn playTetris ein Fenster öffnet.
+"""
+import pygame
+
+from TetrisEngine import background, changed_rows
+
+
+class BlockSprites:
+    """
+    Cache vorgerenderter Block-Surfaces (gefülltes Quadrat mit 1px schwarzem Rand) je
+    (Farbe, block_size). Die Farbnamen werden so nur einmal pro Sprite von pygame aufgelöst.
+    """
+
+    def __init__(self):
+        self._sprites = {}
+
+    def get(self, color, block_size):
+        sprite = self._sprites.get((color, block_size))
+        if sprite is None:
+            sprite = pygame.Surface((block_size, block_size))
+            sprite.fill(color)
+            pygame.draw.rect(sprite, "Black", sprite.get_rect(), 1)
+            # Im Pixelformat des Fensters blitten die Sprites am schnellsten
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self._sprites[(color, block_size)] = sprite
+        return sprite
+
+
+# Gemeinsamer Sprite-Cache für alle Fenster
+block_sprites = BlockSprites()
+
+
+def draw_blocks(surface, blocks, block_size, sprites=block_sprites):
+    """Zeichnet Blöcke als (Spalte, Zeile, Farbe) mit einem einzigen Surface.blits-Aufruf."""
+    surface.blits([(sprites.get(color, block_size), (col * block_size, row * block_size))
+                   for (col, row, color) in blocks], False)
+
+
+def grid_blocks(grid):
+    """Liefert alle belegten Zellen eines Rasters als (Spalte, Zeile, Farbe)."""
+    return ((col, row, color)
+            for row, cells in enumerate(grid)
+            for col, color in enumerate(cells) if color != background)
+
+
+class SpriteAtlas:
+    """
+    Alle Block-Sprites einer Palette nebeneinander auf einer einzigen Oberfläche. areas[i] ist der Ausschnitt
+    des Sprites für palette[i]; mit (atlas.surface, Position, atlas.areas[i]) lassen sich beliebig viele
+    Blöcke in einem Surface.blits-Aufruf zeichnen. Ab 4 Pixeln bekommt jeder Block einen schwarzen Rand.
+    """
+
+    def __init__(self, palette, block_size):
+        self.block_size = block_size
+        self.surface = pygame.Surface((block_size * len(palette), block_size))
+        self.areas = []
+        for i, color in enumerate(palette):
+            area = pygame.Rect(i * block_size, 0, block_size, block_size)
+            self.surface.fill(color, area)
+            if block_size >= 4:
+                pygame.draw.rect(self.surface, "Black", area, 1)
+            self.areas.append(area)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+
+
+class TextCache:
+    """
+    Cache für Beschriftungen (Score, Pause, Game Over). Ein Label wird nur neu gerendert,
+    wenn sich Schrift, Text oder Farbe gegenüber dem letzten Aufruf mit demselben Namen geändert haben.
+    """
+
+    def __init__(self):
+        self._labels = {}
+
+    def render(self, name, font, text, color='White'):
+        key = (font, text, color)
+        label = self._labels.get(name)
+        if label is None or label[0] != key:
+            label = (key, font.render(text, True, color))
+            self._labels[name] = label
+        return label[1]
+
+
+class DirtyRectRenderer:
+    """
+    Zeichnet das Spielfeld auf eine dauerhafte Oberfläche (board) und zeichnet pro Frame nur die
+    Zellen neu, die sich seit dem letzten Frame geändert haben: das fallende Teil (alte und neue
+    Position), neu eingefrorene Zellen und entfernte oder verschobene Zeilen.
+    Welche Zeilen sich geändert haben können, kommt aus den Änderungsereignissen des Spiels (watch/drain);
+    nur diese Zeilen werden mit dem zuletzt gezeichneten Raster verglichen.
+    draw() gibt die geänderten Bereiche zurück, die mit pygame.display.update(rects) ausgegeben werden.
+    """
+
+    def __init__(self, columns, rows, block_size, fail_line_y=None):
+        self.columns = columns
+        self.rows = rows
+        self.block_size = block_size
+        self.fail_line_y = fail_line_y
+        self.board = pygame.Surface((columns * block_size, rows * block_size))
+        # Zuletzt gezeichnetes Raster (ohne fallendes Teil); None erzwingt ein vollständiges Neuzeichnen
+        self._shown = None
+        # Spiel, dessen Ereignisse zuletzt abgeholt wurden
+        self._game = None
+        # Zuletzt gezeichnetes Teil als {(x, y): Farbe}
+        self._piece = {}
+        # Zuletzt gezeichnete Beschriftungen als Liste von (Surface, Rect)
+        self._labels = []
+
+    def invalidate(self):
+        """Erzwingt beim nächsten draw() ein vollständiges Neuzeichnen (z.B. nach einem Overlay)."""
+        self._shown = None
+
+    def _draw_fail_line(self, clip=None):
+        if self.fail_line_y is None:
+            return
+        y = self.fail_line_y * self.block_size
+        self.board.set_clip(clip)
+        pygame.draw.line(self.board, "Red", (0, y), (self.board.get_width(), y), 3)
+        self.board.set_clip(None)
+
+    def _clear_cell(self, x, y):
+        size = self.block_size
+        rect = pygame.Rect(x * size, y * size, size, size)
+        self.board.fill(background, rect)
+        # Die Fail-Line liegt unter den Blöcken und berührt die Zeilen direkt über und unter ihr
+        if self.fail_line_y is not None and y in (self.fail_line_y - 1, self.fail_line_y):
+            self._draw_fail_line(rect)
+
+    def draw(self, screen, tetris, show_piece=True, labels=()):
+        """
+        Aktualisiert board und screen und gibt die Liste der geänderten Rechtecke zurück.
+        labels ist eine Liste von (Surface, Rect), die über dem Spielfeld liegen (z.B. der Score).
+        """
+        grid = tetris.grid
+        piece = {cell: tetris.current_color for cell in tetris.current()} if show_piece else {}
+        labels = list(labels)
+
+        if self._shown is None or tetris is not self._game:
+            # Vollständiges Neuzeichnen; ab jetzt reichen die Ereignisse des Spiels
+            tetris.watch()
+            tetris.drain()
+            self._game = tetris
+            self.board.fill(background)
+            self._draw_fail_line()
+            draw_blocks(self.board, grid_blocks(grid), self.block_size)
+            draw_blocks(self.board, ((x, y, color) for (x, y), color in piece.items()), self.block_size)
+            self._shown = [row[:] for row in grid]
+            self._piece = piece
+            screen.blit(self.board, (0, 0))
+            for surface, rect in labels:
+                screen.blit(surface, rect)
+            self._labels = labels
+            return [screen.get_rect()]
+
+        # Geänderte Zellen des Rasters: nur Zeilen, die laut den Ereignissen betroffen sind und sich
+        # unterscheiden, werden zellweise verglichen
+        changed = set()
+        shown = self._shown
+        for y in changed_rows(tetris.drain(), self.rows):
+            row = grid[y]
+            if row != shown[y]:
+                old = shown[y]
+                for x, color in enumerate(row):
+                    if color != old[x]:
+                        changed.add((x, y))
+                shown[y] = row[:]
+
+        # Alte und neue Position des Teils
+        if piece != self._piece:
+            changed.update(self._piece)
+            changed.update(piece)
+        self._piece = piece
+
+        # Geänderte Zellen neu zeichnen und pro Zeile zu einem Rechteck zusammenfassen
+        size = self.block_size
+        spans = {}
+        blocks = []
+        for (x, y) in changed:
+            self._clear_cell(x, y)
+            color = piece.get((x, y), grid[y][x])
+            if color != background:
+                blocks.append((x, y, color))
+            low, high = spans.get(y, (x, x))
+            spans[y] = (min(low, x), max(high, x))
+        draw_blocks(self.board, blocks, size)
+        rects = [pygame.Rect(low * size, y * size, (high - low + 1) * size, size) for y, (low, high) in spans.items()]
+        for rect in rects:
+            screen.blit(self.board, rect, rect)
+
+        # Beschriftungen nur neu zeichnen, wenn sie sich geändert haben oder übermalt wurden
+        label_rects = [rect for _, rect in self._labels] + [rect for _, rect in labels]
+        if labels != self._labels or any(rect.collidelist(rects) != -1 for rect in label_rects):
+            for rect in label_rects:
+                screen.blit(self.board, rect, rect)
+            for surface, rect in labels:
+                screen.blit(surface, rect)
+            rects.extend(label_rects)
+        self._labels = labels
+        return rects
+
+
+class Minimap:
+    """
+    Verkleinerte Übersicht des ganzen Spielfelds. Ein Pixel steht für scale x scale Zellen und zeigt die
+    Farbe der ersten belegten Zelle dieses Blocks. Die verkleinerte Oberfläche (cache) wird nur für die
+    Zeilen neu berechnet, die laut den Änderungsereignissen des Spiels betroffen sind und sich geändert haben.
+    """
+
+    def __init__(self, columns, rows, max_width, max_height, fail_line_y=None):
+        self.columns = columns
+        self.rows = rows
+        self.fail_line_y = fail_line_y
+        self.scale = max(1, -(-columns // max_width), -(-rows // max_height))
+        self.cache = pygame.Surface((-(-columns // self.scale), -(-rows // self.scale)))
+        # Ganzzahlige Vergrößerung, damit kleine Übersichten den verfügbaren Platz nutzen
+        self.zoom = max(1, min(max_width // self.cache.get_width(), max_height // self.cache.get_height()))
+        self.size = (self.cache.get_width() * self.zoom, self.cache.get_height() * self.zoom)
+        self.image = None
+        self._game = None
+        self._shown = None
+
+    def update(self, tetris):
+        """
+        Übernimmt die Änderungen des Rasters seit dem letzten Aufruf in den Cache. Welche Zeilen betroffen
+        sein können, kommt aus den Änderungsereignissen des Spiels (watch/drain); nur sie werden verglichen.
+        """
+        if tetris is not self._game:
+            tetris.watch()
+            tetris.drain()
+            rows = range(self.rows)
+            self._shown = [None] * self.rows
+        else:
+            events = tetris.drain()
+            if not events:
+                return
+            rows = changed_rows(events, self.rows)
+        scale = self.scale
+        grid = tetris.grid
+        shown = self._shown
+        bands = set()
+        for y in rows:
+            row = grid[y]
+            if row != shown[y]:
+                shown[y] = row[:]
+                bands.add(y // scale)
+        for band in bands:
+            self._draw_band(grid, band)
+        self._game = tetris
+        if bands or self.image is None:
+            self.image = pygame.transform.scale(self.cache, self.size)
+            if self.fail_line_y is not None:
+                y = self.fail_line_y // scale * self.zoom
+                pygame.draw.line(self.image, "Red", (0, y), (self.image.get_width(), y))
+
+    def _draw_band(self, grid, band):
+        scale = self.scale
+        rows = grid[band * scale:(band + 1) * scale]
+        for bx in range(self.cache.get_width()):
+            color = background
+            for row in rows:
+                for cell in row[bx * scale:(bx + 1) * scale]:
+                    if cell != background:
+                        color = cell
+                        break
+                if color != background:
+                    break
+            self.cache.set_at((bx, band), color)
+
+    def draw(self, screen, position, viewport):
+        """Zeichnet die Übersicht an `position` mit dem sichtbaren Ausschnitt als Rahmen."""
+        screen.blit(self.image, position)
+        left, top, right, bottom = viewport.visible()
+        factor = self.zoom / self.scale
+        frame = pygame.Rect(position[0] + int(left * factor), position[1] + int(top * factor),
+                            max(2, int((right - left) * factor)), max(2, int((bottom - top) * factor)))
+        pygame.draw.rect(screen, "Yellow", frame, 1)
+
+
+class ViewportRenderer:
+    """
+    Zeichnet nur den sichtbaren Ausschnitt (TetrisLoop.Viewport) eines großen Spielfelds und rechts
+    daneben die Minimap. Pro Bild werden nur die Zeilen und Spalten des Ausschnitts gelesen.
+    """
+
+    def __init__(self, viewport, minimap_width=200, fail_line_y=None):
+        self.viewport = viewport
+        self.fail_line_y = fail_line_y
+        self.minimap = Minimap(viewport.columns, viewport.rows, minimap_width, viewport.height, fail_line_y)
+
+    def draw(self, screen, tetris, show_piece=True):
+        viewport = self.viewport
+        if show_piece:
+            viewport.follow(tetris.current(), tetris.ghost())
+        left, top, right, bottom = viewport.visible()
+        size = viewport.block_size
+
+        screen.fill(background)
+        if self.fail_line_y is not None and top <= self.fail_line_y < bottom:
+            y = (self.fail_line_y - top) * size
+            pygame.draw.line(screen, "Red", (0, y), ((right - left) * size, y), 3)
+
+        # Nur die sichtbaren Zellen, relativ zum Ausschnitt
+        grid = tetris.grid
+        blocks = [(x - left, y - top, color)
+                  for y in range(top, bottom)
+                  for x, color in enumerate(grid[y][left:right], left) if color != background]
+        if show_piece:
+            blocks.extend((x - left, y - top, tetris.current_color) for (x, y) in tetris.current()
+                          if left <= x < right and top <= y < bottom)
+        draw_blocks(screen, blocks, size)
+
+        # Trennlinie und Minimap
+        edge = viewport.width
+        pygame.draw.line(screen, "Gray", (edge + 3, 0), (edge + 3, screen.get_height()))
+        self.minimap.update(tetris)
+        self.minimap.draw(screen, (edge + 8, 0), viewport)
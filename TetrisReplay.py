@@ -0,0 +1,305 @@
+"""
+Kompakte, deterministische Wiederholungen (Replays) von MehrsteinTetris-Partien.
+
+Ein Replay besteht aus Variante, Spielfeldgröße, Seed, Regel für die Teilefolge und dem Eingabestrom
+der Partie. Jeder Tick
+ist ein Byte, in dem Bit (Input.value - 1) für eine Eingabe und GRAVITY für einen move()-Aufruf
+steht; die Bits eines Ticks werden in aufsteigender Reihenfolge angewandt. Kommen die Aufrufe eines
+Ticks in anderer Reihenfolge oder mehrfach (z.B. mehrere Input.Left eines Bots), trägt das Byte
+SEQUENCE und die Aufrufe folgen ihm als Liste (Input.value, 0 für move()). Ein Tick des Replays ist
+so immer genau ein Tick der Partie. Gleiche aufeinander folgende Ticks werden lauflängenkodiert.
+
+Abgespielt wird kopflos mit voller Geschwindigkeit. Der ReplayPlayer legt dabei in festen
+Abständen Keyframes (Schnappschüsse des Spiels, siehe MehrsteinTetris.snapshot) an, über die sich lange Replays schnell vor- und
+zurückspulen lassen.
+
+Beispiel:
+    python TetrisSimulator.py --variant colour --games 10 --record replays
+    python TetrisReplay.py replays/colour-3.mtr --seek 5000
+"""
+import argparse
+import bisect
+import time
+
+from TetrisEngine import Input
+from TetrisSimulator import load_variant
+
+MAGIC = b'MTRP'
+VERSION = 4
+
+# Bit für einen move()-Aufruf (Schwerkraft); es wird nach allen Eingaben des Ticks angewandt.
+GRAVITY = 1 << len(Input)
+# Tick mit ausdrücklicher Folge von Aufrufen (Input.value, MOVE für move())
+SEQUENCE = GRAVITY << 1
+MOVE = 0
+
+
+def write_varint(out, value):
+    """Schreibt eine nicht-negative Ganzzahl mit 7 Bit pro Byte (LEB128)."""
+    if value < 0:
+        raise ValueError('varint kann keine negative Zahl speichern: %d (zigzag verwenden)' % value)
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def read_varint(data, pos):
+    """Liest eine mit write_varint geschriebene Zahl und gibt (Wert, neue Position) zurück."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    """Bildet eine Ganzzahl mit Vorzeichen auf eine nicht-negative ab (0, -1, 1, -2, ... -> 0, 1, 2, 3, ...)."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    """Umkehrung von zigzag."""
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class Replay:
+    """
+    Eingabestrom einer Partie als Liste von Läufen [Tick-Byte, Anzahl] bzw. [SEQUENCE, Anzahl, Aufrufe]
+    für Ticks mit ausdrücklicher Folge (Aufrufe als Tupel von Input.value bzw. MOVE).
+    """
+
+    def __init__(self, variant, columns, rows, seed, pieces='uniform', runs=None):
+        self.variant = variant
+        self.columns = columns
+        self.rows = rows
+        self.seed = seed
+        self.pieces = pieces
+        self.runs = runs if runs is not None else []
+
+    @property
+    def ticks(self):
+        """Anzahl der aufgezeichneten Ticks."""
+        return sum(run[1] for run in self.runs)
+
+    def append(self, mask, count=1, actions=None):
+        """Hängt `count` Ticks mit dem Tick-Byte `mask` an (bei SEQUENCE mit der Folge `actions`)."""
+        run = [mask, count] if actions is None else [mask, count, actions]
+        last = self.runs[-1] if self.runs else None
+        if last is not None and last[0] == mask and last[2:] == run[2:]:
+            last[1] += count
+        else:
+            self.runs.append(run)
+
+    def new_game(self):
+        """Erzeugt die Partie im Ausgangszustand (gleiche Variante, Größe, Seed und Teilefolge)."""
+        _, game_class = load_variant(self.variant)
+        return game_class(columns=self.columns, rows=self.rows, seed=self.seed, pieces=self.pieces)
+
+    def to_bytes(self):
+        """Serialisiert das Replay (Kopf und Läufe)."""
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        for name in (self.variant, self.pieces):
+            name = name.encode('utf-8')
+            write_varint(out, len(name))
+            out += name
+        # Der Seed darf negativ sein und wird deshalb zigzag-kodiert
+        for value in (self.columns, self.rows, zigzag(self.seed), len(self.runs)):
+            write_varint(out, value)
+        for mask, count, *actions in self.runs:
+            out.append(mask)
+            if mask & SEQUENCE:
+                write_varint(out, len(actions[0]))
+                out += bytes(actions[0])
+            write_varint(out, count)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Liest ein mit to_bytes serialisiertes Replay."""
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError('kein MehrsteinTetris-Replay (Version %d)' % VERSION)
+        names = []
+        pos = 5
+        for _ in range(2):
+            length, pos = read_varint(data, pos)
+            names.append(data[pos:pos + length].decode('utf-8'))
+            pos += length
+        variant, pieces = names
+        header = []
+        for _ in range(4):
+            value, pos = read_varint(data, pos)
+            header.append(value)
+        columns, rows, seed, run_count = header
+        seed = unzigzag(seed)
+        runs = []
+        for _ in range(run_count):
+            mask = data[pos]
+            pos += 1
+            if mask & SEQUENCE:
+                length, pos = read_varint(data, pos)
+                actions = tuple(data[pos:pos + length])
+                count, pos = read_varint(data, pos + length)
+                runs.append([mask, count, actions])
+            else:
+                count, pos = read_varint(data, pos)
+                runs.append([mask, count])
+        return cls(variant, columns, rows, seed, pieces, runs)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayRecorder:
+    """
+    Zeichnet die Eingaben einer Partie auf. prInput und move werden an das Spiel weitergereicht
+    und für den aktuellen Tick gesammelt; tick() schließt einen Tick ab. Passen die Aufrufe in
+    aufsteigender Reihenfolge der Bits in ein Tick-Byte, wird nur dieses gespeichert, sonst
+    (z.B. Input.Left nach Input.HardDrop) der Tick als SEQUENCE mit seiner Folge von Aufrufen.
+
+    Das Spiel muss mit einem Seed erzeugt worden sein, sonst ist die Partie nicht reproduzierbar.
+    """
+
+    def __init__(self, game, variant):
+        if game.seed is None:
+            raise ValueError('nur Partien mit Seed lassen sich aufzeichnen')
+        self.game = game
+        self.replay = Replay(variant, game.columns, game.rows, game.seed, game.pieces.policy)
+        # Aufrufe des aktuellen Ticks als Input.value bzw. MOVE
+        self._actions = []
+
+    def prInput(self, input):
+        self._actions.append(input.value)
+        self.game.prInput(input)
+
+    def move(self):
+        self._actions.append(MOVE)
+        self.game.move()
+        return self
+
+    def tick(self):
+        """Schließt den aktuellen Tick ab (auch ein Tick ohne Eingaben wird gespeichert)."""
+        mask = 0
+        for action in self._actions:
+            bit = GRAVITY if action == MOVE else 1 << (action - 1)
+            # Die Bits eines Ticks werden aufsteigend angewandt; sonst wird die Folge gespeichert
+            if mask >= bit:
+                self.replay.append(SEQUENCE, actions=tuple(self._actions))
+                break
+            mask |= bit
+        else:
+            self.replay.append(mask)
+        self._actions = []
+
+    def finish(self):
+        """Schließt einen angefangenen Tick ab und gibt das Replay zurück."""
+        if self._actions:
+            self.tick()
+        return self.replay
+
+
+class ReplayPlayer:
+    """
+    Spielt ein Replay kopflos ab. Alle `keyframe_interval` Ticks wird ein Schnappschuss des Spiels als
+    Keyframe abgelegt; seek() springt über den nächstgelegenen Keyframe zu einem beliebigen Tick.
+    """
+
+    def __init__(self, replay, keyframe_interval=1000):
+        self.replay = replay
+        self.keyframe_interval = keyframe_interval
+        self.game = replay.new_game()
+        self.tick = 0
+        self._keyframes = {0: self.game.snapshot()}
+        # Erster Tick jedes Laufs, für die Suche nach dem Lauf eines Ticks
+        self._starts = []
+        start = 0
+        for _, count, *_ in replay.runs:
+            self._starts.append(start)
+            start += count
+        self.ticks = start
+        # Tick-Byte bzw. Folge -> Aufrufe eines Ticks
+        self._actions = {}
+
+    def _decode(self, run):
+        """Gibt die Aufrufe (gebundene Methoden des Spiels) eines Ticks aus dem Lauf `run` zurück."""
+        key = run[2] if run[0] & SEQUENCE else run[0]
+        calls = self._actions.get(key)
+        if calls is None:
+            game = self.game
+            if run[0] & SEQUENCE:
+                actions = [(game.move, None) if action == MOVE else (game.prInput, Input(action))
+                           for action in run[2]]
+            else:
+                mask = run[0]
+                actions = [(game.prInput, input) for input in Input if mask & 1 << (input.value - 1)]
+                if mask & GRAVITY:
+                    actions.append((game.move, None))
+            calls = self._actions[key] = actions
+        return calls
+
+    def advance(self, ticks=None):
+        """Spielt `ticks` Ticks (Standard: bis zum Ende) mit voller Geschwindigkeit ab und gibt das Spiel zurück."""
+        target = self.ticks if ticks is None else min(self.tick + ticks, self.ticks)
+        game = self.game
+        interval = self.keyframe_interval
+        while self.tick < target:
+            index = bisect.bisect_right(self._starts, self.tick) - 1
+            run = self.replay.runs[index]
+            end = min(self._starts[index] + run[1], target, (self.tick // interval + 1) * interval)
+            if run[0]:
+                calls = self._decode(run)
+                for _ in range(end - self.tick):
+                    for call, argument in calls:
+                        if argument is None:
+                            call()
+                        else:
+                            call(argument)
+            self.tick = end
+            if end % interval == 0 and end not in self._keyframes:
+                self._keyframes[end] = game.snapshot()
+        return game
+
+    def seek(self, tick):
+        """Springt zum Zustand nach `tick` Ticks und gibt das Spiel zurück."""
+        tick = max(0, min(tick, self.ticks))
+        keyframe = max(t for t in self._keyframes if t <= tick)
+        if tick < self.tick or keyframe > self.tick:
+            self.game.restore(self._keyframes[keyframe])
+            self.tick = keyframe
+        return self.advance(tick - self.tick)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Spielt ein MehrsteinTetris-Replay kopflos ab')
+    parser.add_argument('replay', help='Replay-Datei')
+    parser.add_argument('--seek', type=int, default=None, help='nur bis zu diesem Tick abspielen')
+    parser.add_argument('--keyframes', type=int, default=1000, help='Abstand der Keyframes in Ticks')
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.replay)
+    player = ReplayPlayer(replay, args.keyframes)
+    start = time.perf_counter()
+    game = player.seek(args.seek) if args.seek is not None else player.advance()
+    elapsed = time.perf_counter() - start
+    print(f'replay:     {replay.variant} {replay.columns}x{replay.rows} seed {replay.seed} pieces {replay.pieces}')
+    print(f'ticks:      {player.tick} of {player.ticks} in {elapsed:.3f}s ({player.tick / max(elapsed, 1e-9):.0f}/sec)')
+    print(f'score:      {game.score}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,522 @@
+"""
+Autoritativer Mehrspieler-Server für MehrsteinTetris über TCP (asyncio).
+
+Die Clients schicken nur ihre Eingaben, das Spiel läuft ausschließlich auf dem Server. Je players
+verbundene Clients bilden eine Partie (Match); alle Spieler einer Partie bekommen denselben Seed und
+damit dieselbe Teilefolge. Ein gemeinsamer Takt (tick_ms) rechnet alle Partien: Eingaben anwenden,
+alle drop_ticks Ticks ein move(), danach bekommt jeder Spieler die Zellen aller Spielfelder seiner
+Partie, die sich seit dem letzten Tick geändert haben (fallendes Teil eingerechnet), statt des ganzen
+Rasters.
+
+Protokoll:
+    Client -> Server: ein Byte je Eingabe (Input.value).
+    Server -> Client: Nachrichten aus Typ-Byte, Länge (varint) und Inhalt; alle Zahlen als varint
+    (siehe TetrisReplay.write_varint).
+        HELLO    'H': Match, eigener Spieler, Spieler, Spalten, Zeilen, Palette (Anzahl, je Länge + UTF-8)
+        DELTA    'D': Tick, Anzahl Spielfelder, je Spielfeld: Spieler, Score, Anzahl Zellen,
+                      je Zelle x, y und Palettenindex (ein Byte)
+        GAMEOVER 'O': Spieler, dessen Spielfeld die Fail-Line erreicht hat
+        END      'E': Gewinner (Spieler, oder Anzahl Spieler ohne Gewinner), dann alle Scores
+
+Der Server zählt die gesendeten Bytes und die Rechenzeit; stats() schätzt daraus die Bytes pro Tick und
+Spielfeld und wie viele Partien ein Kern tragen würde.
+
+Beispiel:
+    python TetrisServer.py serve --port 7777 --players 2
+    python TetrisServer.py bench --matches 200 --seconds 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from collections import deque
+
+from TetrisEngine import background, changed_rows, Input
+from TetrisReplay import read_varint, write_varint
+from TetrisSimulator import VARIANTS, game_over, load_variant
+
+HELLO = ord('H')
+DELTA = ord('D')
+GAMEOVER = ord('O')
+END = ord('E')
+
+# Höchstens so viele Eingaben eines Spielers werden pro Tick angewandt, der Rest wartet auf den nächsten
+MAX_INPUTS_PER_TICK = 8
+
+INPUTS = {input.value: input for input in Input}
+
+
+def frame(kind, payload):
+    """Nachricht aus Typ-Byte, Länge und Inhalt."""
+    out = bytearray([kind])
+    write_varint(out, len(payload))
+    return bytes(out + payload)
+
+
+class Player:
+    """Ein verbundener Client mit seinem Spiel und dem zuletzt gesendeten Stand seines Spielfelds."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.index = None
+        self.game = None
+        self.inputs = deque()
+        # Zuletzt gesendete Ansicht (Raster mit fallendem Teil) als Liste von Zeilen mit Palettenindizes
+        self.shown = None
+        self.over = False
+        self.connected = True
+        # Zeilen des fallenden Teils beim letzten Senden
+        self.piece_rows = set()
+
+
+class Match:
+    """Eine Partie: die Spiele der Spieler und ihr gemeinsamer Takt."""
+
+    def __init__(self, match_id, players, game_class, columns, rows, seed, palette, drop_ticks, max_ticks):
+        self.match_id = match_id
+        self.players = players
+        self.columns = columns
+        self.rows = rows
+        self.palette = palette
+        self.palette_index = {color: i for i, color in enumerate(palette)}
+        self.drop_ticks = drop_ticks
+        self.max_ticks = max_ticks
+        self.fail_line_y = int(rows * 0.2)
+        self.ticks = 0
+        self.ended = False
+        for index, player in enumerate(players):
+            player.index = index
+            player.game = game_class(columns=columns, rows=rows, seed=seed)
+            player.game.watch()
+            player.shown = [[0] * columns for _ in range(rows)]
+
+    def hello(self, player):
+        out = bytearray()
+        for value in (self.match_id, player.index, len(self.players), self.columns, self.rows, len(self.palette)):
+            write_varint(out, value)
+        for color in self.palette:
+            name = color.encode('utf-8')
+            write_varint(out, len(name))
+            out += name
+        return frame(HELLO, out)
+
+    def view(self, player):
+        """Ansicht eines Spielfelds als Zeilen mit Palettenindizes, das fallende Teil eingerechnet."""
+        index = self.palette_index
+        rows = [[index[cell] for cell in row] for row in player.game.grid]
+        if not player.over:
+            color = index.get(player.game.current_color, 1)
+            for (x, y) in player.game.current():
+                if 0 <= x < self.columns and 0 <= y < self.rows:
+                    rows[y][x] = color
+        return rows
+
+    def _delta(self, player):
+        """
+        Geänderte Zellen seit dem letzten Tick als Liste (x, y, Palettenindex); aktualisiert shown.
+        Verglichen werden nur die Zeilen, die das fallende Teil vorher oder jetzt berührt, und die Zeilen,
+        die laut den Änderungsereignissen des Spiels (Einfrieren, Entfernen, Schwerkraft) betroffen sind.
+        """
+        index = self.palette_index
+        game = player.game
+        piece = {}
+        if not player.over:
+            color = index.get(game.current_color, 1)
+            piece = {(x, y): color for (x, y) in game.current() if 0 <= x < self.columns and 0 <= y < self.rows}
+        piece_rows = {y for _, y in piece}
+        rows = sorted(piece_rows.union(player.piece_rows, changed_rows(game.drain(), self.rows)))
+        player.piece_rows = piece_rows
+
+        grid = game.grid
+        shown = player.shown
+        changed = []
+        for y in rows:
+            new = [index[cell] for cell in grid[y]]
+            if y in piece_rows:
+                for (x, py), color in piece.items():
+                    if py == y:
+                        new[x] = color
+            old = shown[y]
+            if new != old:
+                changed.extend((x, y, new[x]) for x in range(self.columns) if new[x] != old[x])
+                shown[y] = new
+        return changed
+
+    def tick(self):
+        """
+        Rechnet einen Tick und gibt die Nachrichten für die Spieler zurück: DELTA (falls sich etwas
+        geändert hat), danach gegebenenfalls GAMEOVER und END.
+        """
+        self.ticks += 1
+        messages = []
+        gravity = self.ticks % self.drop_ticks == 0
+        for player in self.players:
+            if player.over:
+                continue
+            game = player.game
+            for _ in range(min(len(player.inputs), MAX_INPUTS_PER_TICK)):
+                game.prInput(player.inputs.popleft())
+            if gravity:
+                game.move()
+            if game_over(game, self.fail_line_y) or not player.connected:
+                player.over = True
+                out = bytearray()
+                write_varint(out, player.index)
+                messages.append(frame(GAMEOVER, out))
+
+        out = bytearray()
+        write_varint(out, self.ticks)
+        boards = bytearray()
+        count = 0
+        for player in self.players:
+            changed = self._delta(player)
+            if not changed:
+                continue
+            count += 1
+            write_varint(boards, player.index)
+            write_varint(boards, player.game.score)
+            write_varint(boards, len(changed))
+            for x, y, color in changed:
+                write_varint(boards, x)
+                write_varint(boards, y)
+                boards.append(color)
+        if count:
+            write_varint(out, count)
+            messages.insert(0, frame(DELTA, out + boards))
+
+        alive = [player for player in self.players if not player.over]
+        if not alive or (len(self.players) > 1 and len(alive) <= 1) or self.ticks >= self.max_ticks:
+            self.ended = True
+            winner = alive[0].index if len(alive) == 1 and len(self.players) > 1 else len(self.players)
+            out = bytearray()
+            write_varint(out, winner)
+            for player in self.players:
+                write_varint(out, player.game.score)
+            messages.append(frame(END, out))
+        return messages
+
+
+class TetrisServer:
+    """
+    Nimmt Clients an, fasst je `players` zu einer Partie zusammen und rechnet alle Partien in einem
+    gemeinsamen Takt. Partien enden, wenn nur noch ein Spieler (allein: keiner) übrig ist oder nach
+    max_ticks Ticks; danach werden die Verbindungen geschlossen.
+    """
+
+    def __init__(self, variant='classic', columns=10, rows=20, players=2, tick_ms=50, drop_ticks=4, seed=0,
+                 max_ticks=10 ** 9, max_buffer=1 << 20):
+        self.variant = variant
+        _, self.game_class = load_variant(variant)
+        self.palette = [background] + list(self.game_class.colors)
+        self.columns = columns
+        self.rows = rows
+        self.players = players
+        self.tick_ms = tick_ms
+        self.drop_ticks = drop_ticks
+        self.seed = seed
+        self.max_ticks = max_ticks
+        # Clients, die mehr als so viele Bytes nicht abholen, werden getrennt
+        self.max_buffer = max_buffer
+        self.matches = []
+        # Zuletzt beendete Partien (z.B. für Tests)
+        self.finished = deque(maxlen=100)
+        self._waiting = []
+        self._next_match = 0
+        self._server = None
+        self._ticker = None
+        # Laufende Verbindungen (eine Aufgabe je Client)
+        self._handlers = set()
+        # Zähler für stats()
+        self.ticks = 0
+        self.match_ticks = 0
+        self.board_ticks = 0
+        self.bytes_sent = 0
+        self._started = None
+
+    async def start(self, host='127.0.0.1', port=0):
+        """Startet Server und Takt; gibt den Port zurück (port=0: ein freier Port)."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._started = (time.perf_counter(), time.process_time())
+        self._ticker = asyncio.create_task(self._run())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Beendet den Takt, trennt alle Clients und wartet, bis ihre Verbindungen abgebaut sind."""
+        self._ticker.cancel()
+        self._server.close()
+        for match in self.matches:
+            for player in match.players:
+                player.writer.close()
+        for player in self._waiting:
+            player.writer.close()
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        player = Player(reader, writer)
+        self._waiting.append(player)
+        if len(self._waiting) >= self.players:
+            players, self._waiting = self._waiting[:self.players], self._waiting[self.players:]
+            match = Match(self._next_match, players, self.game_class, self.columns, self.rows,
+                          self.seed + self._next_match, self.palette, self.drop_ticks, self.max_ticks)
+            self._next_match += 1
+            self.matches.append(match)
+            for member in players:
+                self._send(member, match.hello(member))
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                player.inputs.extend(INPUTS[byte] for byte in data if byte in INPUTS)
+        except ConnectionError:
+            pass
+        player.connected = False
+        if player in self._waiting:
+            self._waiting.remove(player)
+        writer.close()
+        self._handlers.discard(handler)
+
+    def _send(self, player, data):
+        if not player.connected:
+            return 0
+        writer = player.writer
+        if writer.is_closing() or writer.transport.get_write_buffer_size() > self.max_buffer:
+            player.connected = False
+            writer.close()
+            return 0
+        writer.write(data)
+        return len(data)
+
+    def tick(self):
+        """Rechnet einen Tick aller Partien und verschickt die Nachrichten."""
+        self.ticks += 1
+        for match in self.matches:
+            messages = match.tick()
+            self.match_ticks += 1
+            self.board_ticks += len(match.players)
+            data = b''.join(messages)
+            if data:
+                for player in match.players:
+                    self.bytes_sent += self._send(player, data)
+            if match.ended:
+                for player in match.players:
+                    player.writer.close()
+                self.finished.append(match)
+        self.matches = [match for match in self.matches if not match.ended]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = self.tick_ms / 1000
+        next_tick = loop.time()
+        while True:
+            self.tick()
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < -1:
+                # Der Server kommt nicht hinterher; nicht endlos nachholen
+                next_tick = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+    def stats(self):
+        """
+        Kennzahlen seit dem Start: mittlere Anzahl laufender Partien, Bytes pro Tick und Spielfeld,
+        Auslastung (Rechenzeit / Laufzeit, 1.0 = ein Kern) und daraus geschätzte Partien pro Kern.
+        """
+        wall = time.perf_counter() - self._started[0]
+        cpu = time.process_time() - self._started[1]
+        matches = self.match_ticks / self.ticks if self.ticks else 0.0
+        load = cpu / wall if wall else 0.0
+        return {
+            'matches': matches,
+            'hosted': self._next_match,
+            'ticks': self.ticks,
+            'bytes_per_tick': self.bytes_sent / self.ticks if self.ticks else 0.0,
+            'bytes_per_board_tick': self.bytes_sent / self.board_ticks if self.board_ticks else 0.0,
+            'load': load,
+            'matches_per_core': matches / load if load else 0.0,
+        }
+
+
+def format_stats(stats):
+    return (f"matches {stats['matches']:.1f} (hosted {stats['hosted']}), ticks {stats['ticks']}, "
+            f"{stats['bytes_per_tick']:.0f} bytes/tick ({stats['bytes_per_board_tick']:.1f} per board), "
+            f"load {stats['load']:.0%}, ~{stats['matches_per_core']:.0f} matches/core")
+
+
+class MatchClient:
+    """
+    Client für TetrisServer. Spiegelt die Spielfelder der Partie aus den DELTA-Nachrichten: boards[Spieler]
+    ist das Raster mit Farbnamen (fallendes Teil eingerechnet), scores[Spieler] der Score.
+    """
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.match_id = None
+        self.player = None
+        self.palette = None
+        self.boards = None
+        self.scores = None
+        self.over = set()
+        self.winner = None
+        self.tick = 0
+        self.bytes_received = 0
+
+    async def connect(self, host, port):
+        """Verbindet sich und wartet auf den Beginn der Partie (HELLO)."""
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        while self.palette is None:
+            await self.receive()
+        return self
+
+    def send(self, input):
+        self.writer.write(bytes([input.value]))
+
+    async def _varint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = (await self.reader.readexactly(1))[0]
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    async def receive(self):
+        """Liest eine Nachricht, wendet sie an und gibt ihren Typ zurück (None: Verbindung beendet)."""
+        try:
+            kind = (await self.reader.readexactly(1))[0]
+            length = await self._varint()
+            data = await self.reader.readexactly(length)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return None
+        self.bytes_received += length + 2
+        pos = 0
+        if kind == HELLO:
+            values = []
+            for _ in range(6):
+                value, pos = read_varint(data, pos)
+                values.append(value)
+            self.match_id, self.player, players, columns, rows, colours = values
+            self.palette = []
+            for _ in range(colours):
+                size, pos = read_varint(data, pos)
+                self.palette.append(data[pos:pos + size].decode('utf-8'))
+                pos += size
+            self.boards = [[[background] * columns for _ in range(rows)] for _ in range(players)]
+            self.scores = [0] * players
+        elif kind == DELTA:
+            self.tick, pos = read_varint(data, pos)
+            count, pos = read_varint(data, pos)
+            for _ in range(count):
+                player, pos = read_varint(data, pos)
+                self.scores[player], pos = read_varint(data, pos)
+                cells, pos = read_varint(data, pos)
+                board = self.boards[player]
+                for _ in range(cells):
+                    x, pos = read_varint(data, pos)
+                    y, pos = read_varint(data, pos)
+                    board[y][x] = self.palette[data[pos]]
+                    pos += 1
+        elif kind == GAMEOVER:
+            player, _ = read_varint(data, pos)
+            self.over.add(player)
+        elif kind == END:
+            self.winner, pos = read_varint(data, pos)
+            for player in range(len(self.scores)):
+                self.scores[player], pos = read_varint(data, pos)
+        return kind
+
+    async def close(self):
+        self.writer.close()
+
+
+async def _random_client(host, port, seed, stop_time):
+    """Lastclient für bench: drückt im Mittel alle 100 ms eine zufällige Taste, bis die Partie endet."""
+    rng = random.Random(seed)
+    client = await MatchClient().connect(host, port)
+    inputs = list(Input)
+
+    async def press():
+        while time.monotonic() < stop_time:
+            await asyncio.sleep(rng.uniform(0.05, 0.15))
+            if client.writer.is_closing():
+                return
+            client.send(rng.choice(inputs))
+
+    presser = asyncio.create_task(press())
+    while await client.receive() not in (None, END):
+        pass
+    presser.cancel()
+    await client.close()
+
+
+def _bench_server(options, port_pipe, seconds):
+    """Server-Prozess für bench; schickt den Port und am Ende die Kennzahlen über die Pipe."""
+    async def serve():
+        server = TetrisServer(**options)
+        port_pipe.send(await server.start())
+        await asyncio.sleep(seconds)
+        port_pipe.send(server.stats())
+        await server.close()
+    asyncio.run(serve())
+
+
+async def _bench_clients(port, clients, seconds):
+    stop_time = time.monotonic() + seconds
+    tasks = [asyncio.create_task(_random_client('127.0.0.1', port, i, stop_time)) for i in range(clients)]
+    await asyncio.wait(tasks, timeout=seconds)
+    for task in tasks:
+        task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Autoritativer Mehrspieler-Server für MehrsteinTetris')
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help in (('serve', 'Server starten'),
+                       ('bench', 'Server in eigenem Prozess mit lokalen Zufalls-Clients messen')):
+        command = commands.add_parser(name, help=help)
+        command.add_argument('--variant', choices=sorted(VARIANTS), default='classic')
+        command.add_argument('--columns', type=int, default=10)
+        command.add_argument('--rows', type=int, default=20)
+        command.add_argument('--players', type=int, default=2, help='Spieler pro Partie')
+        command.add_argument('--tick-ms', type=int, default=50, help='Länge eines Ticks in Millisekunden')
+        command.add_argument('--drop-ticks', type=int, default=4, help='alle so viele Ticks fällt das Teil')
+    commands.choices['serve'].add_argument('--host', default='127.0.0.1')
+    commands.choices['serve'].add_argument('--port', type=int, default=7777)
+    commands.choices['serve'].add_argument('--report', type=float, default=10, help='Kennzahlen alle so viele Sekunden')
+    commands.choices['bench'].add_argument('--matches', type=int, default=100)
+    commands.choices['bench'].add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args(argv)
+
+    options = dict(variant=args.variant, columns=args.columns, rows=args.rows, players=args.players,
+                   tick_ms=args.tick_ms, drop_ticks=args.drop_ticks)
+    if args.command == 'serve':
+        async def serve():
+            server = TetrisServer(**options)
+            port = await server.start(args.host, args.port)
+            print(f'listening on {args.host}:{port}')
+            while True:
+                await asyncio.sleep(args.report)
+                print(format_stats(server.stats()), flush=True)
+        asyncio.run(serve())
+        return
+
+    # bench: der Server läuft in einem eigenen Prozess, damit die Clients seine Rechenzeit nicht verfälschen
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_bench_server, args=(options, child, args.seconds))
+    process.start()
+    port = parent.recv()
+    asyncio.run(_bench_clients(port, args.matches * args.players, args.seconds))
+    print(format_stats(parent.recv()))
+    process.join()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Kopfloser Batch-Simulator für alle Tetris-Varianten.
+
+Spielt N Partien mit festen Seeds ohne Fenster, steuert jede Partie über eine
+austauschbare Eingabe-Strategie (Policy) und verteilt die Partien auf einen Prozesspool.
+
+Beispiel:
+    python TetrisSimulator.py --variant colour --games 200 --workers 4 --policy random
+"""
+import argparse
+import importlib
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from TetrisBot import LookaheadBot, PlacementBot
+from TetrisEngine import SHAPE_POLICIES
+
+# Variantenname -> (Modul, Klasse)
+VARIANTS = {
+    'classic': ('Tetris', 'MehrsteinTetris'),
+    'horizontal': ('TetrisHorizontalMatch', 'MehrsteinTetris'),
+    'colour': ('TetrisColourMatch', 'MehrsteinTetris'),
+    'bitboard': ('TetrisBitboard', 'BitboardTetris'),
+    # NumPy-Spielfeld (numpy wird erst beim Laden der Variante importiert)
+    'numpy': ('TetrisNumpy', 'NumpyTetris'),
+    'numpy-horizontal': ('TetrisNumpy', 'NumpyHorizontalMatch'),
+    'numpy-colour': ('TetrisNumpy', 'NumpyColourMatch'),
+}
+
+
+def load_variant(name):
+    """Gibt (Modul, Spielklasse) einer Variante zurück; das Modul wird erst hier importiert."""
+    module_name, class_name = VARIANTS[name]
+    module = importlib.import_module(module_name)
+    return module, getattr(module, class_name)
+
+
+# Policies bekommen das Spiel, das Input-Enum der Variante und einen eigenen Zufallsgenerator
+# und geben die Eingaben für den aktuellen Tick zurück.
+
+def idle_policy(game, Input, rng):
+    """Keine Eingaben, die Teile fallen nur durch die Schwerkraft."""
+    return ()
+
+
+def fall_policy(game, Input, rng):
+    """Drückt in jedem Tick die Leertaste (Soft Drop)."""
+    return (Input.Fall,)
+
+
+def random_policy(game, Input, rng):
+    """Wählt in jedem zweiten Tick im Mittel eine zufällige Eingabe."""
+    if rng.random() < 0.5:
+        return (rng.choice(list(Input)),)
+    return ()
+
+
+POLICIES = {
+    'idle': idle_policy,
+    'fall': fall_policy,
+    'random': random_policy,
+    'bot': PlacementBot,
+    'lookahead': LookaheadBot,
+}
+
+
+def load_policy(name):
+    """
+    Gibt eine eingebaute Policy zurück oder lädt eine eigene im Format 'modul:funktion'.
+    Ist die Policy eine Klasse (z.B. PlacementBot), wird für jede Partie ein neues Objekt erzeugt.
+    """
+    if name in POLICIES:
+        policy = POLICIES[name]
+    else:
+        module_name, _, function_name = name.partition(':')
+        policy = getattr(importlib.import_module(module_name), function_name)
+    if isinstance(policy, type):
+        policy = policy()
+    return policy
+
+
+def game_over(game, fail_line_y):
+    """
+    Gleiche Regel wie in playTetris: Spielende, sobald die Fail-Line belegt ist.
+    Gefragt wird das Spiel selbst (row_occupied), damit Bitboard und NumPy-Spielfeld dafür nicht das
+    ganze Raster mit Farbnamen erzeugen müssen.
+    """
+    return game.row_occupied(fail_line_y)
+
+
+def play_game(variant, seed, columns=20, rows=30, policy='random', max_ticks=100000, pieces='uniform',
+              record=False):
+    """
+    Spielt eine Partie kopflos bis zum Spielende (oder max_ticks) und gibt ihre Kennzahlen zurück.
+    Pro Tick werden die Eingaben der Policy verarbeitet und danach einmal move() aufgerufen.
+    `pieces` ist die Regel, nach der die Formen gezogen werden ('uniform' oder 'bag').
+    Mit record=True enthält das Ergebnis unter 'replay' die Partie als serialisiertes Replay.
+    """
+    module, game_class = load_variant(variant)
+    policy_function = load_policy(policy)
+
+    # Spiel und Policy bekommen je einen eigenen, vom Seed abgeleiteten Zufallsstrom.
+    rng = random.Random(f'{seed}:policy')
+    game = game_class(columns=columns, rows=rows, seed=seed, pieces=pieces)
+    fail_line_y = int(rows * 0.2)
+
+    # Eingaben laufen über den Recorder, die Policy sieht weiterhin das Spiel selbst.
+    driver = game
+    if record:
+        from TetrisReplay import ReplayRecorder
+        driver = ReplayRecorder(game, variant)
+
+    ticks = 0
+    moves = 0
+    start = time.perf_counter()
+    while ticks < max_ticks and not game_over(game, fail_line_y):
+        for input in policy_function(game, module.Input, rng):
+            driver.prInput(input)
+            moves += 1
+        driver.move()
+        moves += 1
+        ticks += 1
+        if record:
+            driver.tick()
+
+    result = {
+        'seed': seed,
+        'score': getattr(game, 'score', 0),
+        'ticks': ticks,
+        'moves': moves,
+        'seconds': time.perf_counter() - start,
+    }
+    # Bots zählen die bewerteten Platzierungen mit
+    if hasattr(policy_function, 'evaluated'):
+        result['placements'] = policy_function.evaluated
+        result['search_seconds'] = policy_function.seconds
+    if record:
+        result['replay'] = driver.finish().to_bytes()
+    return result
+
+
+def _play_game(task):
+    return play_game(*task)
+
+
+def simulate(variant, games, columns=20, rows=30, policy='random', max_ticks=100000, seed=0, workers=None,
+             pieces='uniform', record=False):
+    """
+    Spielt `games` Partien mit den Seeds seed .. seed+games-1 und gibt die Ergebnisse
+    sowie die Gesamtlaufzeit zurück. Mit workers=1 wird ohne Prozesspool im eigenen Prozess gespielt.
+    """
+    tasks = [(variant, seed + i, columns, rows, policy, max_ticks, pieces, record) for i in range(games)]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_play_game(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_play_game, tasks, chunksize=max(1, games // 64)))
+    return results, time.perf_counter() - start
+
+
+def report(results, elapsed):
+    """Fasst die Ergebnisse als Text zusammen (Durchsatz, Scores und Spiellängen)."""
+    scores = [r['score'] for r in results]
+    ticks = [r['ticks'] for r in results]
+    moves = sum(r['moves'] for r in results)
+    lines = [
+        f'games:      {len(results)} in {elapsed:.2f}s',
+        f'games/sec:  {len(results) / elapsed:.1f}',
+        f'moves/sec:  {moves / elapsed:.0f}',
+        f'score:      mean {statistics.mean(scores):.1f}  min {min(scores)}  max {max(scores)}',
+        f'length:     mean {statistics.mean(ticks):.1f}  min {min(ticks)}  max {max(ticks)} ticks',
+    ]
+    if all('placements' in r for r in results):
+        placements = sum(r['placements'] for r in results)
+        search_seconds = sum(r['search_seconds'] for r in results)
+        lines.append(f'placements: {placements} evaluated, {placements / search_seconds:.0f}/sec')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Kopfloser Batch-Simulator für MehrsteinTetris')
+    parser.add_argument('--variant', choices=sorted(VARIANTS), default='classic')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=30)
+    parser.add_argument('--policy', default='random',
+                        help="eingebaute Policy (%s) oder 'modul:funktion'" % ', '.join(sorted(POLICIES)))
+    parser.add_argument('--max-ticks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0, help='Seed der ersten Partie')
+    parser.add_argument('--workers', type=int, default=None, help='Anzahl Prozesse (Standard: alle Kerne)')
+    parser.add_argument('--pieces', choices=sorted(SHAPE_POLICIES), default='uniform',
+                        help='Regel für die Folge der Formen')
+    parser.add_argument('--record', metavar='DIR', default=None,
+                        help='jede Partie als Replay <variante>-<seed>.mtr in DIR speichern')
+    args = parser.parse_args(argv)
+
+    results, elapsed = simulate(args.variant, args.games, args.columns, args.rows, args.policy,
+                                args.max_ticks, args.seed, args.workers, args.pieces, args.record is not None)
+    print(report(results, elapsed))
+    if args.record is not None:
+        os.makedirs(args.record, exist_ok=True)
+        for result in results:
+            path = os.path.join(args.record, f"{args.variant}-{result['seed']}.mtr")
+            with open(path, 'wb') as file:
+                file.write(result['replay'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""
+Zuschaueransicht für Bot-Turniere: viele kopflose Partien in einem Fenster.
+
+Die Partien laufen in Worker-Prozessen, jede mit ihrer eigenen Geschwindigkeit (Ticks pro Sekunde). Ein
+Tick ist wie in TetrisSimulator.play_game: die Eingaben der Policy, danach ein move(); gleiche Seeds
+ergeben also dieselben Partien wie im Simulator. Die Worker schicken höchstens updates_per_second
+Mal pro Sekunde den Zustand jeder geänderten Partie (Teil, Score und die Zeilen des Rasters als
+Palettenindizes) über eine Queue. Nach dem ersten, vollständigen Zustand werden nur die Zeilen geschickt,
+die laut den Änderungsereignissen des Spiels (watch/drain) betroffen sind. Das Fenster liest die Queue ohne zu warten und bleibt dadurch bedienbar, auch wenn die
+Worker ausgelastet sind.
+
+Jede Partie hat eine eigene Kachel. Alle Kacheln zeichnen ihre Blöcke aus einem gemeinsamen Sprite-Atlas
+(TetrisRenderer.SpriteAtlas), Blöcke und Beschriftungen aller Kacheln gehen in einem einzigen
+Surface.blits-Aufruf pro Bild auf den Bildschirm.
+
+Beispiel:
+    python TetrisSpectator.py --variant classic --games 36 --policy bot --speeds 2,30
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+from TetrisEngine import background, changed_rows, SHAPE_POLICIES
+from TetrisSimulator import POLICIES, VARIANTS, game_over, load_policy, load_variant
+
+
+def palette_of(game_class):
+    """Palette einer Variante: Index 0 ist der Hintergrund, danach die Farben der Teile."""
+    return [background] + list(game_class.colors)
+
+
+def encode_board(game, palette_index):
+    """Raster einer Partie als bytes (Palettenindex je Zelle, zeilenweise)."""
+    return b''.join(cells for _, cells in encode_rows(game, palette_index, range(game.rows)))
+
+
+def encode_rows(game, palette_index, rows):
+    """Die Zeilen `rows` des Rasters als Liste von (y, bytes) mit einem Palettenindex je Zelle."""
+    grid = game.grid
+    return [(y, bytes(palette_index[cell] for cell in grid[y])) for y in rows]
+
+
+def tile_layout(count, columns, rows, max_window, gap=4):
+    """
+    Ordnet `count` Spielfelder mit columns x rows Zellen in einem Raster von Kacheln an, so dass die
+    Blöcke möglichst groß werden und alles in max_window (Breite, Höhe) passt.
+    Gibt (Blockgröße, Fenstergröße, Liste der Kachel-Ursprünge (x, y)) zurück.
+    """
+    best = None
+    for tile_columns in range(1, count + 1):
+        tile_rows = math.ceil(count / tile_columns)
+        block_size = min((max_window[0] - gap * (tile_columns + 1)) // (tile_columns * columns),
+                         (max_window[1] - gap * (tile_rows + 1)) // (tile_rows * rows))
+        if best is None or block_size > best[0]:
+            best = (block_size, tile_columns, tile_rows)
+    block_size, tile_columns, tile_rows = best
+    block_size = max(1, block_size)
+    tile_width = columns * block_size + gap
+    tile_height = rows * block_size + gap
+    origins = [(gap + (i % tile_columns) * tile_width, gap + (i // tile_columns) * tile_height)
+               for i in range(count)]
+    return block_size, (gap + tile_columns * tile_width, gap + tile_rows * tile_height), origins
+
+
+class _Watched:
+    """Eine Partie im Worker mit ihrer Policy und ihrem Takt."""
+
+    def __init__(self, game_id, game, policy, rng, speed):
+        self.game_id = game_id
+        self.game = game
+        self.policy = policy
+        self.rng = rng
+        self.interval = 1 / speed
+        self.next_tick = 0.0
+        self.ticks = 0
+        self.over = False
+        self.dirty = True
+        # Der erste Zustand enthält alle Zeilen, danach nur die laut den Ereignissen geänderten
+        self.sent = False
+        game.watch()
+
+
+def _spectator_worker(tasks, variant, columns, rows, policy, pieces, max_ticks, updates, stop, paused,
+                      updates_per_second):
+    """
+    Spielt die Partien `tasks` (game_id, seed, speed) bis stop gesetzt ist und legt ihre Zustände als
+    (game_id, ticks, score, over, geänderte Zeilen (siehe encode_rows), Teil, Farbindex) in die Queue `updates`.
+    """
+    module, game_class = load_variant(variant)
+    palette_index = {color: i for i, color in enumerate(palette_of(game_class))}
+    fail_line_y = int(rows * 0.2)
+    watched = [_Watched(game_id, game_class(columns=columns, rows=rows, seed=seed, pieces=pieces),
+                        load_policy(policy), random.Random(f'{seed}:policy'), speed)
+               for game_id, seed, speed in tasks]
+    send_interval = 1 / updates_per_second
+    start = time.perf_counter()
+    for entry in watched:
+        entry.next_tick = start
+    last_send = 0.0
+
+    while not stop.is_set():
+        now = time.perf_counter()
+        if paused.is_set():
+            for entry in watched:
+                entry.next_tick = now
+            time.sleep(0.05)
+            continue
+
+        for entry in watched:
+            # Wer nicht mehr mithält (z.B. ein langsamer Bot), holt höchstens eine Sekunde nach
+            entry.next_tick = max(entry.next_tick, now - 1.0)
+            game = entry.game
+            while not entry.over and entry.next_tick <= now:
+                for input in entry.policy(game, module.Input, entry.rng):
+                    game.prInput(input)
+                game.move()
+                entry.ticks += 1
+                entry.next_tick += entry.interval
+                entry.over = entry.ticks >= max_ticks or game_over(game, fail_line_y)
+                entry.dirty = True
+
+        if now - last_send >= send_interval:
+            for entry in watched:
+                if entry.dirty:
+                    game = entry.game
+                    events = game.drain()
+                    rows = changed_rows(events, game.rows) if entry.sent else range(game.rows)
+                    updates.put((entry.game_id, entry.ticks, game.score, entry.over,
+                                 encode_rows(game, palette_index, rows), tuple(game.current()),
+                                 palette_index.get(game.current_color, 1)))
+                    entry.dirty = False
+                    entry.sent = True
+            last_send = now
+
+        running = [entry.next_tick for entry in watched if not entry.over]
+        wake = min(running + [last_send + send_interval])
+        time.sleep(max(0.0, min(wake - time.perf_counter(), 0.05)))
+
+
+def spectate(variant='classic', games=16, columns=10, rows=20, policy='bot', seed=0, speeds=(2, 30),
+             workers=None, fps=30, pieces='uniform', max_ticks=100000, updates_per_second=20,
+             max_window=(1600, 1000)):
+    """
+    Öffnet das Zuschauerfenster mit `games` Partien (Seeds seed .. seed+games-1). Jede Partie bekommt eine
+    zufällige, aber vom Seed abhängige Geschwindigkeit zwischen speeds[0] und speeds[1] Ticks pro Sekunde.
+    Die Partien werden auf `workers` Prozesse (Standard: alle Kerne) verteilt.
+
+    Tasten: Leertaste hält alle Partien an bzw. setzt sie fort, Q oder ESC beendet.
+    Gibt die letzten Zustände als Liste von {'game', 'seed', 'speed', 'ticks', 'score', 'over'} zurück.
+    """
+    _, game_class = load_variant(variant)
+    palette = palette_of(game_class)
+    game_speeds = [random.Random(f'{seed + i}:speed').uniform(*speeds) for i in range(games)]
+    tasks = [(i, seed + i, game_speeds[i]) for i in range(games)]
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+
+    # Die Worker starten vor pygame, damit sie nichts vom Fenster erben
+    context = multiprocessing.get_context()
+    updates = context.Queue()
+    stop = context.Event()
+    paused = context.Event()
+    processes = [context.Process(target=_spectator_worker, daemon=True,
+                                 args=(tasks[w::workers], variant, columns, rows, policy, pieces, max_ticks,
+                                       updates, stop, paused, updates_per_second))
+                 for w in range(workers)]
+    for process in processes:
+        process.start()
+
+    # pygame wird erst geladen, wenn wirklich ein Fenster geöffnet wird.
+    import pygame
+    from TetrisRenderer import SpriteAtlas, TextCache
+
+    block_size, size, origins = tile_layout(games, columns, rows, max_window)
+    pygame.init()
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(f'Tetris spectator: {games} x {variant} ({policy})')
+    clock = pygame.time.Clock()
+    atlas = SpriteAtlas(palette, block_size)
+    font = pygame.font.Font(None, max(12, min(24, block_size * 2)))
+    texts = TextCache()
+    tile_size = (columns * block_size, rows * block_size)
+    finished = pygame.Surface(tile_size, pygame.SRCALPHA)
+    finished.fill((0, 0, 0, 150))
+    fail_line_y = int(rows * 0.2) * block_size
+
+    # Letzter Zustand je Partie und ihr Raster als Palettenindizes (zeilenweise)
+    states = [None] * games
+    boards = [bytearray(columns * rows) for _ in range(games)]
+    changed = True
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_q, pygame.K_ESCAPE):
+                    running = False
+                if event.key == pygame.K_SPACE:
+                    if paused.is_set():
+                        paused.clear()
+                    else:
+                        paused.set()
+
+        # Alle bis jetzt eingetroffenen Zustände übernehmen, ohne zu warten
+        try:
+            while True:
+                state = updates.get_nowait()
+                states[state[0]] = state
+                board = boards[state[0]]
+                for y, cells in state[4]:
+                    board[y * columns:(y + 1) * columns] = cells
+                changed = True
+        except queue.Empty:
+            pass
+
+        if changed:
+            screen.fill((40, 40, 40))
+            surface = atlas.surface
+            areas = atlas.areas
+            blits = []
+            for game_id, (ox, oy) in enumerate(origins):
+                screen.fill(background, (ox, oy, *tile_size))
+                pygame.draw.line(screen, "Red", (ox, oy + fail_line_y), (ox + tile_size[0] - 1, oy + fail_line_y))
+                state = states[game_id]
+                if state is None:
+                    continue
+                _, ticks, score, over, _, piece, piece_colour = state
+                for i, index in enumerate(boards[game_id]):
+                    if index:
+                        blits.append((surface, (ox + i % columns * block_size, oy + i // columns * block_size),
+                                      areas[index]))
+                if not over:
+                    blits.extend((surface, (ox + x * block_size, oy + y * block_size), areas[piece_colour])
+                                 for (x, y) in piece if 0 <= x < columns and 0 <= y < rows)
+                else:
+                    blits.append((finished, (ox, oy)))
+                blits.append((texts.render(game_id, font, f'#{game_id} {score}'), (ox + 3, oy + 3)))
+            # Blöcke und Beschriftungen aller Kacheln in einem Aufruf
+            screen.blits(blits, False)
+            pygame.display.flip()
+            changed = False
+        clock.tick(fps)
+
+    pygame.quit()
+
+    # Worker beenden; die Queue wird dabei geleert, damit sie sich beenden können
+    stop.set()
+    deadline = time.monotonic() + 5
+    while any(process.is_alive() for process in processes) and time.monotonic() < deadline:
+        try:
+            while True:
+                updates.get_nowait()
+        except queue.Empty:
+            pass
+        for process in processes:
+            process.join(0.05)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+    return [{'game': game_id, 'seed': seed + game_id, 'speed': game_speeds[game_id],
+             'ticks': state[1] if state else 0, 'score': state[2] if state else 0,
+             'over': state[3] if state else False}
+            for game_id, state in enumerate(states)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Zuschaueransicht für viele kopflose MehrsteinTetris-Partien')
+    parser.add_argument('--variant', choices=sorted(VARIANTS), default='classic')
+    parser.add_argument('--games', type=int, default=16)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--policy', default='bot',
+                        help="eingebaute Policy (%s) oder 'modul:funktion'" % ', '.join(sorted(POLICIES)))
+    parser.add_argument('--seed', type=int, default=0, help='Seed der ersten Partie')
+    parser.add_argument('--speeds', default='2,30', help='kleinste und größte Geschwindigkeit in Ticks pro Sekunde')
+    parser.add_argument('--workers', type=int, default=None, help='Anzahl Prozesse (Standard: alle Kerne)')
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--pieces', choices=sorted(SHAPE_POLICIES), default='uniform',
+                        help='Regel für die Folge der Formen')
+    args = parser.parse_args(argv)
+
+    low, high = (float(speed) for speed in args.speeds.split(','))
+    results = spectate(args.variant, args.games, args.columns, args.rows, args.policy, args.seed, (low, high),
+                       args.workers, args.fps, args.pieces)
+    for result in sorted(results, key=lambda result: -result['score']):
+        print(f"#{result['game']:<3} seed {result['seed']:<5} speed {result['speed']:5.1f}/s  "
+              f"ticks {result['ticks']:<7} score {result['score']}{'  (over)' if result['over'] else ''}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,23 @@
+import asyncio
+import os
+import random
+import subprocess
+import sys
 import unittest
 
 from Tetris import *
-
-import xmlrunner 
+from TetrisBenchmark import compare, run_benchmarks
+from TetrisBitboard import BitboardTetris
+from TetrisBot import LookaheadBot, PlacementBot, Zobrist
+from TetrisEngine import Change, changed_rows, ROTATIONS
+from TetrisLoop import FixedTimestep, KeyRepeat, LogicStepper, Viewport
+from TetrisProfiler import FrameProfiler
+from TetrisReplay import Replay, ReplayPlayer
+from TetrisServer import END, MatchClient, TetrisServer
+from TetrisSimulator import play_game, simulate
+from TetrisSpectator import encode_board, palette_of, tile_layout
+import TetrisColourMatch
+import TetrisHorizontalMatch
 
 class TetrisTest(unittest.TestCase):
 
@@ -12,8 +27,479 @@ class TetrisTest(unittest.TestCase):
 
     self.assertTrue(any([f!=background for f in mehr.grid[mehr.rows-1]]),"unterste Zeile nicht belegt, da sollten nich 25 move Steine liegen")
 
+  def testBitboardGleichesErgebnis(self):
+    inputs = list(Input)
+    results = []
+    for cls in (MehrsteinTetris, BitboardTetris):
+      random.seed(7)
+      mehr = cls(columns=10, rows=20)
+      for i in range(0,2000):
+        mehr.prInput(inputs[i % len(inputs)])
+        mehr.move()
+        self.assertEqual(mehr.row_occupied(4), any(cell != background for cell in mehr.grid[4]))
+      results.append((mehr.score, mehr.grid, mehr.current()))
+    self.assertEqual(results[0], results[1], "Bitboard liefert ein anderes Spielergebnis")
+
+  def testNumpyGleichesErgebnis(self):
+    try:
+      import TetrisNumpy
+    except ImportError:
+      self.skipTest("numpy ist nicht installiert")
+    inputs = list(Input)
+    pairs = [(MehrsteinTetris, TetrisNumpy.NumpyTetris),
+             (TetrisHorizontalMatch.MehrsteinTetris, TetrisNumpy.NumpyHorizontalMatch),
+             (TetrisColourMatch.MehrsteinTetris, TetrisNumpy.NumpyColourMatch)]
+    for pair in pairs:
+      results = []
+      for cls in pair:
+        random.seed(11)
+        mehr = cls(columns=6, rows=12)
+        for i in range(0,1500):
+          mehr.prInput(inputs[i % len(inputs)])
+          mehr.move()
+        results.append((mehr.score, mehr.grid, mehr.current(), mehr.heights,
+                        [mehr.row_occupied(y) for y in range(mehr.rows)]))
+      self.assertEqual(results[0], results[1], "NumPy-Spielfeld liefert ein anderes Spielergebnis: " + pair[1].__name__)
+
+  def testSimulatorReproduzierbar(self):
+    first, _ = simulate('classic', 3, columns=10, rows=20, workers=1)
+    second, _ = simulate('classic', 3, columns=10, rows=20, workers=1)
+    strip = lambda results: [(r['seed'], r['score'], r['ticks'], r['moves']) for r in results]
+    self.assertEqual(strip(first), strip(second), "gleiche Seeds müssen gleiche Partien ergeben")
+
+  def testReplayReproduziertPartie(self):
+    result = play_game('colour', 4, columns=10, rows=20, policy='random', record=True)
+    replay = Replay.from_bytes(result['replay'])
+    self.assertEqual(replay.ticks, result['ticks'])
+    player = ReplayPlayer(replay, keyframe_interval=25)
+    self.assertEqual(player.advance().score, result['score'], "Replay ergibt einen anderen Score")
+    middle = ReplayPlayer(replay, keyframe_interval=10 ** 6).advance(replay.ticks // 2)
+    self.assertEqual(player.seek(replay.ticks // 2).grid, middle.grid, "Zurückspulen über Keyframes weicht ab")
+
+  def testReplayMitNegativemSeed(self):
+    result = play_game('classic', -3, columns=10, rows=20, policy='random', record=True)
+    replay = Replay.from_bytes(result['replay'])
+    self.assertEqual(replay.seed, -3)
+    self.assertEqual(ReplayPlayer(replay).advance().score, result['score'], "Replay mit negativem Seed weicht ab")
+
+  def testReplayZaehltTicksDerPartie(self):
+    # Bots drücken pro Tick mehrere Eingaben, auch mehrfach und außerhalb der Bit-Reihenfolge
+    result = play_game('classic', 2, columns=10, rows=20, policy='bot', max_ticks=300, record=True)
+    replay = Replay.from_bytes(result['replay'])
+    self.assertEqual(replay.ticks, result['ticks'], "ein Tick der Partie muss ein Tick des Replays sein")
+    player = ReplayPlayer(replay, keyframe_interval=40)
+    self.assertEqual(player.advance().score, result['score'], "Replay eines Bots ergibt einen anderen Score")
+    middle = ReplayPlayer(replay, keyframe_interval=10 ** 6).advance(replay.ticks // 2)
+    self.assertEqual(player.seek(replay.ticks // 2).grid, middle.grid)
+
+  def testTeilefolgeMitVorschau(self):
+    mehr = MehrsteinTetris(columns=10, rows=20, seed=3, pieces='bag')
+    preview = mehr.preview(7)
+    self.assertEqual(sorted(shape for shape, _, _ in preview), list(range(7)), "7-Bag enthält nicht jede Form genau einmal")
+    spawned = []
+    for _ in range(7):
+      mehr.prInput(Input.HardDrop)
+      spawned.append((mehr._shape, mehr.current()[0][0] - ROTATIONS[mehr._shape][0][0][0], mehr.current_color))
+    self.assertEqual(spawned, preview, "erschienene Teile weichen von der Vorschau ab")
+    other = MehrsteinTetris(columns=10, rows=20, seed=3, pieces='bag')
+    self.assertEqual(other.preview(50)[:7], preview, "gleicher Seed muss dieselbe Teilefolge ergeben")
+
+  def testSchnappschussTeiltZeilen(self):
+    mehr = MehrsteinTetris(columns=10, rows=20, seed=2)
+    mehr.prInput(Input.HardDrop)
+    before = [row[:] for row in mehr.grid]
+    snapshot = mehr.snapshot()
+    rows = mehr.grid[:]
+    locked = mehr.freeze()
+    changed = [y for y in range(20) if mehr.grid[y] is not rows[y]]
+    self.assertEqual(changed, sorted({y for _, y in locked}), "nur die veränderten Zeilen dürfen kopiert werden")
+    for _ in range(30): mehr.move()
+    mehr.restore(snapshot)
+    self.assertEqual(mehr.grid, before, "restore stellt das Raster nicht wieder her")
+    clone = mehr.clone()
+    clone.prInput(Input.HardDrop)
+    self.assertEqual(mehr.grid, before, "Änderungen an der Kopie verändern das Original")
+
+  def testKopieBehaeltFarbflaechen(self):
+    mehr = TetrisColourMatch.MehrsteinTetris(columns=8, rows=16, seed=4)
+    for _ in range(5): mehr.prInput(Input.HardDrop)
+    clone = mehr.clone()
+    self.assertIsNotNone(clone._components, "die Kopie muss das Union-Find übernehmen statt es neu aufzubauen")
+    self.assertIsNot(clone._components.parent, mehr._components.parent)
+    for game in (mehr, clone):
+      for i in range(40):
+        game.prInput((Input.Left, Input.Right, Input.RotateLeft)[i % 3])
+        game.prInput(Input.HardDrop)
+    self.assertEqual((clone.score, clone.grid), (mehr.score, mehr.grid), "Kopie spielt anders weiter als das Original")
+
+  def testSchnappschussKopiertFarbflaechenNicht(self):
+    mehr = TetrisColourMatch.MehrsteinTetris(columns=8, rows=16, seed=4)
+    for _ in range(5): mehr.prInput(Input.HardDrop)
+    before = mehr._components
+    snapshot = mehr.snapshot()
+    mehr.restore(snapshot)
+    components = mehr._components
+    self.assertTrue(all(a is b for a, b in zip(components.parent, before.parent)), "restore kopiert das Union-Find")
+    self.assertTrue(all(a is b for a, b in zip(components.roots, before.roots)), "restore kopiert das Union-Find")
+    mehr.prInput(Input.HardDrop)
+    copied = [y for y in range(mehr.rows) if components.parent[y] is not before.parent[y]]
+    self.assertTrue(0 < len(copied) <= 4, "nur die Zeilen des eingefrorenen Teils dürfen kopiert werden")
+    mehr.restore(snapshot)
+    self.assertTrue(all(a is b for a, b in zip(mehr._components.parent, before.parent)), "Schnappschuss wurde verändert")
+
+  def testEreignisseBildenRasterNach(self):
+    inputs = list(Input)
+    for cls in (MehrsteinTetris, TetrisColourMatch.MehrsteinTetris):
+      random.seed(5)
+      mehr = cls(columns=6, rows=14, seed=5)
+      mehr.watch()
+      mirror = [row[:] for row in mehr.grid]
+      piece, score = mehr.current(), 0
+      for i in range(1500):
+        before = [row[:] for row in mehr.grid]
+        mehr.prInput(inputs[random.randrange(len(inputs))])
+        mehr.move()
+        if mehr.ended():
+          # Neu anfangen: ein von außen gesetztes Raster meldet recompute_heights als Change.Reset
+          mehr.grid = [[background] * 6 for _ in range(14)]
+          mehr.recompute_heights()
+        events = mehr.drain()
+        rows = changed_rows(events, mehr.rows)
+        self.assertEqual([y for y in range(mehr.rows) if before[y] != mehr.grid[y]],
+                         [y for y in rows if before[y] != mehr.grid[y]], "geänderte Zeile fehlt in changed_rows")
+        for event in events:
+          if event[0] is Change.Moved:
+            self.assertEqual(event[1], piece)
+            piece = event[2]
+          elif event[0] is Change.Spawned: piece = event[1]
+          elif event[0] is Change.Locked:
+            for x, y in event[1]: mirror[y][x] = event[2]
+          elif event[0] is Change.Cleared:
+            mirror = [[background] * 6 for _ in event[1]] + [row for y, row in enumerate(mirror) if y not in event[1]]
+          elif event[0] is Change.Removed:
+            for x, y in event[1]: mirror[y][x] = background
+          elif event[0] is Change.Gravity:
+            falling = [(x, new_y, mirror[old_y][x]) for x, old_y, new_y in event[1]]
+            for x, old_y, _ in event[1]: mirror[old_y][x] = background
+            for x, y, color in falling: mirror[y][x] = color
+          elif event[0] is Change.Score: score += event[1]
+          elif event[0] is Change.Reset: mirror = [row[:] for row in mehr.grid]
+      self.assertEqual(mirror, mehr.grid, "Ereignisse ergeben ein anderes Raster: " + cls.__module__)
+      self.assertEqual((piece, score), (mehr.current(), mehr.score))
+      self.assertIsNone(mehr.clone().events, "Kopien dürfen keine Ereignisse sammeln")
+
+  def testNeuaufbauMeldetKeinReset(self):
+    mehr = TetrisColourMatch.MehrsteinTetris(columns=8, rows=16, seed=4)
+    mehr.watch()
+    for _ in range(4): mehr.prInput(Input.HardDrop)
+    mehr._components = None
+    mehr.prInput(Input.HardDrop)
+    kinds = {event[0] for event in mehr.drain()}
+    self.assertIn(Change.Locked, kinds)
+    self.assertNotIn(Change.Reset, kinds, "der Neuaufbau des Union-Find darf kein ganzes Raster melden")
+
+  def testSpielzeitUnabhaengigVonBildrate(self):
+    results = []
+    for frame_ms in (7, 33, 110, 210):
+      mehr = MehrsteinTetris(columns=10, rows=20, seed=1)
+      timestep = FixedTimestep(step_ms=10)
+      stepper = LogicStepper(mehr, 10, drop_interval=200)
+      keys = KeyRepeat({Input.Left: (100, 100)})
+      keys.press(Input.Left, 0)
+      now = 0
+      for _ in range(2310 // frame_ms):
+        now += frame_ms
+        for step_time in timestep.step_times(now, timestep.advance(frame_ms)):
+          stepper.step([input for _, input, _ in keys.due(step_time)])
+      results.append((stepper.steps, mehr.current(), mehr.grid))
+    self.assertEqual(results[0][0], 231)
+    for result in results[1:]:
+      self.assertEqual(result, results[0], "Spielverlauf hängt von der Bildrate ab")
+
+  def testBotPlantNeuNachEinfrieren(self):
+    class Planer:
+      def __init__(self): self.pieces = []
+      def best_move(self, tetris):
+        self.pieces.append(tetris._piece_index)
+        return [Input.Left] * 40 + [Input.HardDrop]
+    mehr = MehrsteinTetris(columns=10, rows=20, seed=1)
+    planer = Planer()
+    stepper = LogicStepper(mehr, 10, drop_interval=10, bot=planer)
+    for _ in range(150):
+      if stepper.step(): break
+    self.assertGreater(len(planer.pieces), 3)
+    self.assertEqual(planer.pieces, list(range(planer.pieces[0], planer.pieces[-1] + 1)),
+                     "nach dem Einfrieren durch die Schwerkraft muss für das neue Teil neu geplant werden")
+
+  def testTastenwiederholungMitDasUndArr(self):
+    keys = KeyRepeat({Input.Left: (100, 20)})
+    keys.press(Input.Left, 0)
+    keys.press(Input.HardDrop, 5)
+    keys.release(Input.Left, 170)
+    self.assertEqual([(time, input) for time, input, _ in keys.due(1000)],
+                     [(0, Input.Left), (5, Input.HardDrop), (100, Input.Left), (120, Input.Left),
+                      (140, Input.Left), (160, Input.Left)])
+    # Ein Druck kürzer als ein Bild geht nicht verloren
+    keys.press(Input.Right, 1003)
+    keys.release(Input.Right, 1006)
+    self.assertEqual(keys.due(1016), [(1003, Input.Right, True)])
+
+  def testBildzeitenMitLetztemEinfrieren(self):
+    stepper = LogicStepper(MehrsteinTetris(columns=10, rows=20, seed=1), step_ms=10, drop_interval=1000)
+    profiler = FrameProfiler()
+    for _ in range(10):
+      profiler.start()
+      locks = stepper.locks
+      stepper.step([Input.HardDrop])
+      profiler.mark('update', steps=1, lock=stepper.last_lock if stepper.locks != locks else None)
+      profiler.end()
+    self.assertEqual(stepper.locks, 10, "Jeder Hard Drop friert ein Teil ein")
+    self.assertEqual(profiler.last_lock, stepper.last_lock)
+    p50, p95, p99 = profiler.percentiles('update')
+    self.assertTrue(0 < p50 <= p95 <= p99)
+    self.assertEqual(profiler.percentiles('render'), [0.0, 0.0, 0.0])
+    self.assertEqual(len(profiler.lines()), 7)
+
+  def testViewportFolgtTeil(self):
+    mehr = MehrsteinTetris(columns=100, rows=2000, seed=1)
+    viewport = Viewport(100, 2000, width=600, height=400, block_size=20)
+    self.assertEqual(viewport.visible(), (0, 0, 30, 20))
+    for _ in range(500): mehr.move()
+    viewport.follow(mehr.current(), mehr.ghost())
+    left, top, right, bottom = viewport.visible()
+    self.assertTrue(all(left <= x < right and top <= y < bottom for x, y in mehr.current()), "Teil liegt außerhalb des Ausschnitts")
+    self.assertEqual(top, 500 - viewport.margin, "Teil soll oben im Ausschnitt bleiben, solange der Boden weit weg ist")
+    viewport.zoom(5)
+    self.assertEqual(viewport.view_rows, 80)
+    viewport.follow([(99, 1999)])
+    self.assertEqual(viewport.visible()[2:], (100, 2000), "Ausschnitt darf nicht über das Spielfeld hinausragen")
+
+  def testZuschauerKachelnPassenInsFenster(self):
+    block_size, size, origins = tile_layout(36, 10, 20, (1600, 1000))
+    self.assertEqual(len(set(origins)), 36)
+    self.assertTrue(size[0] <= 1600 and size[1] <= 1000, "Kacheln passen nicht ins Fenster")
+    self.assertTrue(all(x + 10 * block_size <= size[0] and y + 20 * block_size <= size[1] for x, y in origins))
+    mehr = MehrsteinTetris(columns=10, rows=20, seed=5)
+    mehr.prInput(Input.HardDrop)
+    palette = palette_of(MehrsteinTetris)
+    cells = encode_board(mehr, {color: i for i, color in enumerate(palette)})
+    self.assertEqual([[palette[i] for i in cells[y * 10:(y + 1) * 10]] for y in range(20)], mehr.grid)
+
+  def _pygame(self):
+    # Zeichentests laufen ohne Fenster über den Dummy-Videotreiber von SDL
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    try:
+      import pygame
+    except ImportError:
+      self.skipTest("pygame ist nicht installiert")
+    pygame.display.init()
+    pygame.font.init()
+    return pygame
+
+  def testDirtyRectWieNeuzeichnen(self):
+    pygame = self._pygame()
+    from TetrisRenderer import DirtyRectRenderer
+    screen = pygame.display.set_mode((60, 140))
+    inputs = list(Input)
+    for cls in (MehrsteinTetris, TetrisHorizontalMatch.MehrsteinTetris, TetrisColourMatch.MehrsteinTetris):
+      mehr = cls(columns=6, rows=14, seed=2)
+      renderer = DirtyRectRenderer(6, 14, 10, fail_line_y=2)
+      renderer.draw(screen, mehr)
+      for i in range(0,600):
+        mehr.prInput(inputs[i % len(inputs)])
+        mehr.move()
+        renderer.draw(screen, mehr)
+        if i % 50 == 0:
+          voll = DirtyRectRenderer(6, 14, 10, fail_line_y=2)
+          voll.draw(pygame.Surface((60, 140)), mehr.clone())
+          self.assertTrue(pygame.image.tostring(renderer.board, "RGB") == pygame.image.tostring(voll.board, "RGB"),
+                          "Dirty-Rect-Bild weicht vom Neuzeichnen ab: " + cls.__module__)
+      self.assertEqual(renderer.draw(screen, mehr), [], "ohne Änderung darf nichts neu gezeichnet werden")
+
+  def testSpritesUndBeschriftungenGecacht(self):
+    pygame = self._pygame()
+    from TetrisRenderer import BlockSprites, TextCache, draw_blocks
+    sprites = BlockSprites()
+    sprite = sprites.get("Red", 10)
+    self.assertIs(sprites.get("Red", 10), sprite, "Sprite wurde neu gerendert")
+    self.assertIsNot(sprites.get("Red", 12), sprite)
+    self.assertEqual(sprite.get_at((5, 5))[:3], (255, 0, 0))
+    self.assertEqual(sprite.get_at((0, 5))[:3], (0, 0, 0), "Sprite hat keinen schwarzen Rand")
+    surface = pygame.Surface((30, 10))
+    draw_blocks(surface, [(0, 0, "Red"), (2, 0, "Blue")], 10, sprites)
+    self.assertEqual([surface.get_at((x, 5))[:3] for x in (5, 15, 25)], [(255, 0, 0), (0, 0, 0), (0, 0, 255)])
+
+    texts = TextCache()
+    font = pygame.font.Font(None, 20)
+    label = texts.render("score", font, "Score: 0")
+    self.assertIs(texts.render("score", font, "Score: 0"), label, "unveränderte Beschriftung wurde neu gerendert")
+    self.assertIsNot(texts.render("score", font, "Score: 10"), label)
+    self.assertIsNot(texts.render("score", font, "Score: 10", "Red"), texts.render("score", font, "Score: 10"))
+
+  def testSnakeKoerperBleibtKonsistent(self):
+    self._pygame()
+    from Snake import SnakeBody
+    snake = SnakeBody()
+    # Nach rechts, dabei viermal fressen, dann im Kreis zurück auf den eigenen Körper
+    path = [(x, 0) for x in range(0, 60, 10)] + [(50, 10), (40, 10), (40, 0)]
+    for i, head in enumerate(path[:-1]):
+      tail, collided = snake.step(head)
+      self.assertFalse(collided)
+      if i in (1, 2, 3, 4):
+        snake.grow()
+      self.assertEqual(set(snake.blocks), snake.cells)
+      self.assertEqual(len(snake.blocks), len(snake.cells))
+      self.assertEqual(snake.blocks[-1], head)
+    self.assertEqual(list(snake.blocks), [(30, 0), (40, 0), (50, 0), (50, 10), (40, 10)])
+    tail, collided = snake.step(path[-1])
+    self.assertTrue(collided, "Kollision mit sich selbst nicht erkannt")
+    self.assertEqual(tail, (30, 0))
+    self.assertEqual(set(snake.blocks), snake.cells)
+    self.assertEqual(len(snake.blocks), len(snake.cells))
+    # Das Feld des Schwanzes darf der Kopf im selben Schritt betreten
+    snake = SnakeBody(length=4)
+    for head in [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]:
+      tail, collided = snake.step(head)
+      self.assertFalse(collided, "Kopf auf dem frei werdenden Schwanzfeld gilt als Kollision")
+    self.assertEqual(tail, (0, 0))
+    self.assertEqual(set(snake.blocks), snake.cells)
+
+  def testServerSpiegeltPartieUeberDeltas(self):
+    async def partie():
+      server = TetrisServer(players=2, tick_ms=2, drop_ticks=2, seed=3, max_ticks=120)
+      port = await server.start()
+      clients = await asyncio.gather(MatchClient().connect('127.0.0.1', port), MatchClient().connect('127.0.0.1', port))
+      for input in (Input.Left, Input.Left, Input.RotateLeft, Input.HardDrop, Input.Right, Input.HardDrop):
+        clients[0].send(input)
+      clients[1].send(Input.HardDrop)
+      for client in clients:
+        while await client.receive() not in (None, END): pass
+        await client.close()
+      await server.close()
+      return server, clients
+    server, clients = asyncio.run(partie())
+    match = server.finished[0]
+    for client in clients:
+      for player in match.players:
+        self.assertEqual(client.boards[player.index], [[match.palette[i] for i in row] for row in match.view(player)],
+                         "Spiegel des Clients weicht vom Server ab")
+      self.assertEqual(client.scores, [player.game.score for player in match.players])
+    self.assertLess(server.stats()['bytes_per_board_tick'], 10 * 20 / 4, "Server schickt zu viel pro Tick")
+
+  def testBenchmarkMeldetRegression(self):
+    baseline = run_benchmarks(['classic', 'horizontal'], ['mono'], [(10, 20)], min_time=0)
+    self.assertIn('classic/mono/10x20/clear_rows', baseline)
+    self.assertNotIn('horizontal/mono/10x20/clear_rows', baseline, "clear_rows gilt nur für klassische Regeln")
+    self.assertIn('horizontal/mono/10x20/remove_connected_color_if_path_exists', baseline)
+    slower = {key: dict(result, median_us=result['median_us'] * 2) for key, result in baseline.items()}
+    self.assertEqual({status for *_, status in compare(baseline, baseline)}, {'ok'})
+    self.assertEqual({status for *_, status in compare(baseline, slower, threshold=0.5)}, {'regression'})
+
+  def testBenchmarkMisstEingesetztesSpielfeld(self):
+    import TetrisBenchmark
+    seen = []
+    time_operation = TetrisBenchmark.time_operation
+    def recording(game, operation, *args, **kwargs):
+      seen.append((type(game).__module__, sum(cell != background for row in game.grid for cell in row),
+                   getattr(game, "_components", None) is not None))
+      return time_operation(game, operation, *args, **kwargs)
+    TetrisBenchmark.time_operation = recording
+    try:
+      run_benchmarks(['classic', 'colour'], ['mono', 'checker'], [(10, 20)], ['freeze'], min_time=0)
+    finally:
+      TetrisBenchmark.time_operation = time_operation
+    self.assertEqual([cells for _, cells, _ in seen], [100] * 4, "das Spielfeld wurde vor der Messung verändert")
+    self.assertEqual([built for module, _, built in seen if module == "TetrisColourMatch"], [True, True],
+                     "die Farbflächen müssen vor der Messung aufgebaut sein")
+
+  def testHardDropUndGhost(self):
+    mehr = MehrsteinTetris(columns=10, rows=20)
+    color = mehr.current_color
+    self.assertEqual(mehr.ghost(), [(3, 19), (4, 19), (5, 19), (6, 19)], "Ghost-Piece liegt nicht am Boden")
+    mehr.prInput(Input.HardDrop)
+    self.assertEqual(mehr.grid[19][3:7], [color] * 4, "Hard Drop hat das Teil nicht am Boden eingefroren")
+    self.assertEqual(mehr.heights, [0, 0, 0, 1, 1, 1, 1, 0, 0, 0])
+
+  def testDrehungMitWallKick(self):
+    mehr = MehrsteinTetris(columns=10, rows=20)
+    mehr.prInput(Input.RotateLeft)
+    self.assertEqual(mehr.current(), [(5, 0), (5, 1), (5, 2), (5, 3)], "I-Teil hat sich am oberen Rand nicht aufgerichtet")
+    for _ in range(5): mehr.prInput(Input.Left)
+    mehr.prInput(Input.RotateRight)
+    self.assertEqual(mehr.current(), [(0, 1), (1, 1), (2, 1), (3, 1)], "Drehung an der Wand wurde nicht verschoben")
+
+  def testBotFuelltLuecke(self):
+    mehr = MehrsteinTetris(columns=4, rows=6)
+    mehr.grid[4][0:3] = ["Red", "Red", "Red"]
+    mehr.grid[5][0:3] = ["Red", "Red", "Red"]
+    mehr.recompute_heights()
+    bot = PlacementBot()
+    for input in bot.best_move(mehr):
+      mehr.prInput(input)
+    self.assertEqual(mehr.score, 210, "Bot hat die Lücke nicht mit dem I-Teil gefüllt")
+    self.assertEqual(mehr.heights, [0, 0, 0, 2])
+    self.assertGreater(bot.placements_per_second(), 0)
+
+  def testLookaheadBotMitTranspositionstabelle(self):
+    random.seed(5)
+    mehr = MehrsteinTetris(columns=6, rows=12)
+    bot = LookaheadBot(depth=2, table_size=20)
+    for _ in range(5):
+      for input in bot.best_move(mehr):
+        mehr.prInput(input)
+    self.assertEqual(bot.reached_depth, 2)
+    self.assertLessEqual(len(bot.table), 20, "Transpositionstabelle wächst über ihre Größe hinaus")
+    zobrist = Zobrist()
+    before = zobrist.board(mehr.grid)
+    mehr.grid[0][0] = "Red"
+    self.assertEqual(zobrist.toggle(before, [(0, 0)], "Red"), zobrist.board(mehr.grid))
+
+  def testColourMatchEntferntBreiteKomponente(self):
+    mehr = TetrisColourMatch.MehrsteinTetris(columns=4, rows=6)
+    mehr.grid[5][0:3] = ["Cyan", "Cyan", "Cyan"]
+    mehr.grid[4][0] = "White"
+    mehr._current = [(3, 2), (3, 3), (3, 4), (3, 5)]
+    mehr.current_color = "Cyan"
+    mehr.move()
+    expected = [[background] * 4 for _ in range(6)]
+    expected[5][0] = "White"
+    self.assertEqual(mehr.grid, expected, "Cyan-Komponente über die ganze Breite wurde nicht entfernt")
+
+  def testColourMatchSchwerkraftMeldetGefalleneBloecke(self):
+    mehr = TetrisColourMatch.MehrsteinTetris(columns=4, rows=6)
+    mehr.grid[3][1] = "White"
+    mehr.grid[5][1] = "Purple"
+    mehr.recompute_heights()
+    moved = mehr.apply_gravity([1])
+    self.assertEqual(moved, [(1, 3, 4)], "nur der Block über der Lücke darf fallen")
+    self.assertEqual([mehr.grid[y][1] for y in range(6)], [background] * 4 + ["White", "Purple"])
+    self.assertEqual(mehr.heights, [0, 2, 0, 0])
+
+  def testHorizontalMatchEntferntPfadDesTeils(self):
+    mehr = TetrisHorizontalMatch.MehrsteinTetris(columns=4, rows=6)
+    mehr.grid[5][0:3] = ["Red", "Red", "Red"]
+    mehr.grid[4][0] = "Green"
+    mehr._current = [(3, 2), (3, 3), (3, 4), (3, 5)]
+    mehr.current_color = "Red"
+    mehr.move()
+    expected = [[background] * 4 for _ in range(6)]
+    expected[4][0] = "Green"
+    self.assertEqual(mehr.grid, expected, "roter Pfad von links nach rechts wurde nicht entfernt")
+    self.assertEqual(mehr.score, 7 * 50 + 10)
+
+  def testEngineOhnePygame(self):
+    # Die Spielregeln müssen ohne pygame/SDL importierbar sein und schnell starten (Ziel: < 50 ms).
+    code = ("import sys, time; start = time.perf_counter(); "
+            "import Tetris, TetrisHorizontalMatch, TetrisColourMatch; "
+            "print(time.perf_counter() - start, 'pygame' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+    self.assertEqual(output[1], "False", "pygame wurde beim Import der Spielregeln geladen")
+    self.assertLess(float(output[0]), 0.05, "Import der Spielregeln dauert zu lange")
+
 
 if __name__ == '__main__':
+    import xmlrunner
     suite = unittest.TestLoader().loadTestsFromTestCase(TetrisTest)
     xmlrunner.XMLTestRunner(output=".").run(suite)
     